@@ -0,0 +1,352 @@
+import re
+import sys
+import time
+import math
+import contextlib
+from datetime import datetime
+
+import numpy as np
+
+try:
+    import sympy
+    SYMPY_OK = True
+    SYMPY_VERSION = sympy.__version__
+except ImportError:
+    SYMPY_OK = False
+    SYMPY_VERSION = "NOT INSTALLED"
+
+from trail import Trail, NullTrail, Step, Timings
+from stages import Budget, finish_timings
+from profiling import Profile, header as profile_header
+from context import get_context
+from lambda_cache import get_lambda
+from numerical_engine import ORDER_MIN, ORDER_MAX, MODES, _validate, _ridders
+from taylor import UnsupportedExpression, derivatives
+
+SPOT_OFFSETS = (-1.0, -0.5, 0.5, 1.0)
+VALUE_TOL    = 1e-10    # c₀ against f(x₀), relative
+FD_TOL       = 1e-6     # AD against Ridders, relative (or 10× Ridders' own error estimate)
+FD_COARSE    = 1e-4     # Ridders error estimate above which the comparison says nothing
+
+
+def _cross_check(ad, fd, err, adrift=False):
+    """Status of one AD vs finite-difference comparison: pass, warn or info."""
+    scale = max(1.0, abs(ad))
+    if adrift or not (np.isfinite(ad) and np.isfinite(fd) and err <= FD_COARSE * scale):
+        return "info"
+    return "pass" if abs(ad - fd) <= max(10 * err, FD_TOL * scale) else "warn"
+
+
+def _autodiff_verify(f, program, x0, order, coeffs, budget=None):
+    """
+    Verification for the automatic-differentiation engine:
+      1. c₀ against f(x₀) from the lambdified expression
+      2. Ridders' extrapolated central difference at x₀
+      3. Spot checks at x₀ ± 0.5, ± 1: the Taylor program and Ridders each
+         run once over all four points
+
+    Finite differences of high order are themselves inexact; a comparison
+    whose Ridders error estimate exceeds FD_COARSE is reported as "info".
+    Time spent in each strategy is added to `budget` (a stages.Budget).
+    Returns list of (label, value, status).
+    """
+    results    = []
+    budget     = budget or Budget()
+    consistent = True
+    value      = coeffs[order] * math.factorial(order)
+
+    with budget.measure("verify_value"):
+        try:
+            with np.errstate(all="ignore"):
+                f0 = float(f(x0))
+            delta = abs(f0 - coeffs[0])
+            ok    = delta <= VALUE_TOL * max(1.0, abs(f0))
+            consistent = consistent and ok
+            results.append(("f(x₀) vs c₀  Δ", f"{f0:.12g}   Δ={delta:.2e}",
+                            "pass" if ok else "warn"))
+        except Exception as exc:
+            results.append(("f(x₀) vs c₀", f"error: {exc}", "warn"))
+
+    with budget.measure("verify_cross_check"):
+        fd, _h, err, _evals, _cols, adrift = _ridders(f, np.asarray(x0, dtype=float), order,
+                                                      "central")
+        fd, err = float(fd), float(err)
+        status  = _cross_check(value, fd, err, bool(adrift))
+        consistent = consistent and status != "warn"
+        results.append(("AD vs Ridders  Δ",
+                        f"{fd:.10g}   Δ={abs(value - fd):.2e}   (FD error ≈ {err:.1e})", status))
+
+    with budget.measure("verify_spot_checks"):
+        xs   = x0 + np.array(SPOT_OFFSETS)
+        ad   = derivatives(program(xs, order))[order]
+        fds, _h, errs, _evals, _cols, adrift = _ridders(f, xs, order, "central")
+        for xv, a, b, e, u in zip(xs, ad, fds, errs, adrift):
+            if not np.isfinite(a):
+                results.append((f"Spot x={xv:.2g}", "f not defined here", "info"))
+                continue
+            status = _cross_check(a, b, e, u)
+            consistent = consistent and status != "warn"
+            results.append((f"Spot x={xv:.2g}  AD vs FD",
+                            f"AD={a:.8g}  FD={b:.8g}  Δ={abs(a - b):.2e}", status))
+
+    overall = "PASS — agrees with f and with finite differences ✔" if consistent \
+              else "WARN — disagrees with finite differences ⚠"
+    results.append(("Overall Status", overall, "pass" if consistent else "warn"))
+    return results
+
+
+class AutoDiffEngine:
+    """
+    Derivatives by forward-mode automatic differentiation.
+
+    f is compiled once (taylor.py) into a program over its distinct
+    subexpressions, and the truncated Taylor series x₀ + t is pushed
+    through it: every operation maps the coefficients of its inputs to
+    those of its output, so f⁽ⁿ⁾(x₀) = n!·cₙ comes out exact to rounding
+    without building any derivative expression.
+    """
+
+    def validate_and_compute(
+        self,
+        raw_fx:    str,
+        raw_var:   str,
+        raw_order: str,
+        raw_point: str,
+        trail:     bool = True,
+        mode:      str = "full",
+        show_timings: bool = False,
+        profile:   str = None,
+    ) -> dict:
+        """
+        result["log"] is a trail.Trail rendered on first read; trail=False
+        leaves it empty. mode="answer" skips the verification and returns as
+        soon as the derivative is known.
+
+        result["coefficients"] holds the Taylor coefficients c₀ … cₙ at the
+        point and result["derivatives"] f, f′, …, f⁽ⁿ⁾ there.
+
+        result["timings"] maps each stage (validation, parse, compile,
+        taylor, verify_value, verify_cross_check, verify_spot_checks, total)
+        to milliseconds; show_timings=True also lists them in SUMMARY.
+
+        profile="path/stem" writes a cProfile dump and an allocation report
+        (profiling.py); result["profile"] holds their paths.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        clock    = Budget()
+        profiler = Profile(profile) if profile else None
+        started  = time.perf_counter()
+        with profiler or contextlib.nullcontext():
+            result = self._compute(raw_fx, raw_var, raw_order, raw_point, clock, trail, mode,
+                                   show_timings)
+        finish_timings("automatic", result, clock, started)
+        if profiler:
+            result["profile"] = profiler.save(profile_header("automatic", result))
+        return result
+
+    def _compute(self, raw_fx, raw_var, raw_order, raw_point, clock, trail, mode,
+                 show_timings) -> dict:
+        raw_fx = _normalise(raw_fx)
+        result = self._base_result(raw_fx, raw_var, raw_order, raw_point)
+        result["mode"] = mode
+        log    = (Trail(kv_width=30, outcome_width=34) if trail and mode == "full"
+                  else NullTrail())
+        w       = log.text
+        section = log.section
+        kv      = log.kv
+        blank   = log.blank
+
+        # ── header ────────────────────────────────────────────────────────────
+        w("╔" + "═" * 62 + "╗\n", "header")
+        w("║   SD SOLVER  —  SOLUTION TRAIL" + " " * 30 + "║\n", "header")
+        w("╚" + "═" * 62 + "╝\n\n", "header")
+
+        w("   ┌─────────────────────────────────────────────┐\n", "dim")
+        w("   │  METHOD :  Automatic Differentiation        │\n", "header")
+        w("   │  ENGINE  :  Forward Mode (Taylor Series)    │\n", "dim")
+        w("   └─────────────────────────────────────────────┘\n\n", "dim")
+
+        section("GIVEN")
+        var_label = raw_var if raw_var else "x"
+        kv(f"f({var_label})", raw_fx if raw_fx else "(empty)")
+        kv("Variable",        raw_var   if raw_var   else "(empty)")
+        kv("Order (n)",       raw_order if raw_order else "(empty)")
+        kv("Evaluate at",     raw_point if raw_point else "⚠  Required for automatic")
+        blank()
+
+        # ── validation ────────────────────────────────────────────────────────
+        point_val = _validate(raw_fx, raw_var, raw_order, raw_point, result, clock, "automatic")
+
+        section("VALIDATION", "⓪")
+        for check in result["validation_steps"]:
+            log.check(check["num"], check["label"], check["status"], check.get("detail"))
+
+        if not result["ok"]:
+            w("   ✘  Computation aborted — correct errors and retry.\n", "fail")
+            log.close()
+            result["log"] = log
+            return result
+
+        w("   ✔  All checks passed — proceeding to computation.\n\n", "pass")
+
+        # ── compute ───────────────────────────────────────────────────────────
+        order = result["order"]
+        try:
+            with clock.measure("compile"):
+                program = get_context(raw_fx, result["var"]).taylor
+            with clock.measure("taylor"):
+                coeffs = program(point_val, order)
+                derivs = derivatives(coeffs)
+            value = float(derivs[order])
+            if not np.isfinite(derivs).all():
+                raise ValueError(f"f is not real and finite at {result['var']} = {raw_point}")
+            result["answer"]       = f"{value:.12g}"
+            result["point_value"]  = result["answer"]
+            result["coefficients"] = [float(c) for c in coeffs]
+            result["derivatives"]  = [float(d) for d in derivs]
+            result["program_size"] = len(program)
+            result["ad_steps"]     = self._steps(program, point_val, order, coeffs, derivs)
+        except UnsupportedExpression as exc:
+            result["ok"]     = False
+            result["answer"] = "Computation error"
+            result["field_errors"]["fx"] = f"Not supported by automatic differentiation: {exc}"
+            w(f"   ✘  Error: {str(exc)[:120]}\n", "fail")
+            result["log"] = log
+            return result
+        except Exception as exc:
+            result["ok"]     = False
+            result["answer"] = "Computation error"
+            w(f"   ✘  Error: {str(exc)[:120]}\n", "fail")
+            result["log"] = log
+            return result
+
+        result["timestamp"] = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
+        if mode == "answer":
+            result["log"] = log
+            return result
+
+        # ── METHOD section ────────────────────────────────────────────────────
+        section("METHOD")
+        kv("Name",          "Automatic Differentiation (Forward Mode)")
+        kv("Arithmetic",    "Truncated Taylor series in t, x = x₀ + t")
+        kv("Result",        "f⁽ᵏ⁾(x₀) = k!·cₖ   → exact to rounding")
+        kv("Program",       f"{len(program)} instructions, shared subexpressions once")
+        blank()
+
+        # ── STEPS section ─────────────────────────────────────────────────────
+        section("STEPS")
+        for ad_step in result["ad_steps"]:
+            log.add(ad_step)
+
+        blank()
+
+        # ── FINAL ANSWER ──────────────────────────────────────────────────────
+        section("FINAL ANSWER")
+        w(f"   d^{order}/d{result['var']}^{order}"
+          f" [{raw_fx}]  at  {result['var']} = {raw_point}"
+          f"  =  {result['answer']}\n", "answer")
+        blank()
+
+        # ── VERIFICATION ──────────────────────────────────────────────────────
+        section("VERIFICATION")
+        kv("Strategy A", "c₀ against f(x₀)")
+        kv("Strategy B", "Ridders' extrapolated central difference at x₀")
+        kv("Strategy C", "4-point spot-check against Ridders  (x₀ ± 0.5, ± 1)")
+        blank()
+
+        with clock.measure("compile"):
+            fx_lambda = get_lambda(raw_fx, result["var"])
+        ver_checks = _autodiff_verify(fx_lambda, program, point_val, order, coeffs, clock)
+        result["verification"] = ver_checks
+
+        for label, value, status in ver_checks:
+            log.outcome(label, value, status)
+
+        blank()
+
+        # ── SUMMARY ───────────────────────────────────────────────────────────
+        section("SUMMARY")
+        kv("Timestamp",   result["timestamp"])
+        kv("Python",      result["python_version"])
+        kv("SymPy",       result["sympy_version"])
+        if show_timings:
+            log.add(Timings(result["timings"]))
+        log.close()
+
+        result["log"] = log
+        return result
+
+    def evaluate_batch(self, raw_fx: str, raw_var: str, order: int, points) -> np.ndarray:
+        """
+        f⁽ⁿ⁾ at every x in `points` (any array-like), from one pass of the
+        Taylor program over the whole array. Returns a float64 array with the
+        shape of `points`; NaN where f is not real/finite. No trail is built.
+        Raises ValueError on invalid input (UnsupportedExpression when f
+        cannot be compiled).
+        """
+        raw_fx  = _normalise(raw_fx)
+        var_str = raw_var if raw_var else "x"
+        if not raw_fx:
+            raise ValueError("f(x) cannot be empty.")
+        if not (len(var_str) == 1 and var_str.isalpha()):
+            raise ValueError(f"'{var_str}' is not a single letter.")
+        if not ORDER_MIN <= int(order) <= ORDER_MAX:
+            raise ValueError(f"Order must be between {ORDER_MIN} and {ORDER_MAX}.")
+
+        order   = int(order)
+        program = get_context(raw_fx, var_str).taylor
+        xs      = np.asarray(points, dtype=float)
+        out     = derivatives(program(xs, order))[order]
+        return np.where(np.isfinite(out), out, np.nan)
+
+    @staticmethod
+    def _steps(program, x0, order, coeffs, derivs):
+        """trail.Step records for STEPS: the program, the coefficients, the answer."""
+        ops   = ", ".join(f"{op}×{n}" for op, n in program.op_counts().most_common())
+        steps = [
+            Step("step",   "Compile f to a Taylor program  ({} instructions)", len(program)),
+            Step("detail", "{}", ops or "constant"),
+            Step("step",   "Propagate x = {} + t, series truncated after t^{}", x0, order),
+        ]
+        for k, (c, dk) in enumerate(zip(coeffs, derivs)):
+            steps.append(Step("detail", "c{:<2} = {:+.12e}     f^({}) = {}!·c{} = {:.12g}",
+                              k, c, k, k, k, dk))
+        steps.append(Step("step", "f^({})({}) = {}! · c{}", order, x0, order, order))
+        steps.append(Step("answer", "=  {:.12g}", derivs[order]))
+        return steps
+
+    @staticmethod
+    def _base_result(raw_fx, raw_var, raw_order, raw_point):
+        return {
+            "ok":               True,
+            "raw_fx":           raw_fx,
+            "raw_var":          raw_var,
+            "raw_order":        raw_order,
+            "raw_point":        raw_point,
+            "var":              raw_var if raw_var else "x",
+            "order":            1,
+            "mode":             "full",
+            "answer":           "—",
+            "point_value":      None,
+            "ad_steps":         [],
+            "coefficients":     [],
+            "derivatives":      [],
+            "program_size":     0,
+            "validation_steps": [],
+            "field_errors":     {},
+            "log":              [],
+            "verification":     [],
+            "timings":          {},
+            "profile":          None,
+            "timestamp":        datetime.now().strftime("%Y-%m-%d  %H:%M:%S"),
+            "python_version":   sys.version.split()[0],
+            "sympy_version":    SYMPY_VERSION,
+        }
+
+
+def _normalise(raw_fx: str) -> str:
+    """The input rewriting the other engines apply (^ → **, 2x → 2*x, )( → )*( )."""
+    raw_fx = raw_fx.replace("^", "**")
+    raw_fx = re.sub(r'(\d)([a-zA-Z])', r'\1*\2', raw_fx)
+    return re.sub(r'\)\s*\(', r')*(', raw_fx)
@@ -0,0 +1,174 @@
+"""
+Multi-process batch executor.
+
+SymPy is single-threaded, so large batches are spread over N long-lived
+child processes (the same worker._serve loop the GUI uses). Each child keeps
+its own context / derivative / lambdify caches. Each job goes to the least
+loaded worker; a hash of the expression only breaks ties (or `slack` lets
+it be up to that many jobs ahead), so repeats of one f(x) tend to land on
+the worker that has it warm without ever leaving a core idle.
+"""
+import multiprocessing
+import os
+import time
+import zlib
+from multiprocessing.connection import wait
+
+from worker import _serve
+
+
+def route_key(raw_fx: str) -> int:
+    """Stable (cross-process) routing hash of an expression, whitespace-insensitive."""
+    return zlib.crc32("".join(str(raw_fx).split()).encode("utf-8"))
+
+
+class BatchExecutor:
+    """
+    executor.map(jobs) takes (key, method, kwargs, route) tuples and yields
+    (key, ok, payload) — payload is the engine result dict, or an error
+    message when ok is False. A job whose method is None is not sent
+    anywhere and comes back as (key, False, None), keeping its place in the
+    output order. Results come back in input order by default, or as they
+    complete with ordered=False. At most workers × prefetch jobs are in
+    flight, so input is consumed lazily.
+    """
+
+    def __init__(self, workers: int = None, prefetch: int = 4, slack: int = 0):
+        self.workers  = max(1, workers or os.cpu_count() or 1)
+        self.prefetch = max(1, prefetch)
+        # capped below prefetch: with only workers × prefetch jobs in flight, a
+        # larger slack can keep every job of a batch on its hashed worker
+        self.slack    = max(0, min(slack, self.prefetch - 1))
+        self._ctx     = multiprocessing.get_context("spawn")
+        self._procs   = [None] * self.workers
+        self._conns   = [None] * self.workers
+        self.stats    = {}
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def start(self):
+        for i in range(self.workers):
+            if self._procs[i] is None:
+                self._spawn(i)
+
+    def close(self):
+        for i in range(self.workers):
+            self._stop(i, kill=False)
+
+    def map(self, jobs, ordered: bool = True):
+        self.start()
+        jobs      = iter(jobs)
+        inflight  = [dict() for _ in range(self.workers)]   # job_id → key
+        pending   = {}                                      # job_id → finished result
+        per_proc  = [0] * self.workers
+        next_id   = 0
+        next_out  = 0
+        exhausted = False
+        started   = time.perf_counter()
+        limit     = self.workers * self.prefetch
+
+        while True:
+            # ── fill the pipeline ──────────────────────────────────────────────
+            while (not exhausted and sum(map(len, inflight)) < limit
+                   and next_id - next_out < 4 * limit):
+                job = next(jobs, None)
+                if job is None:
+                    exhausted = True
+                    break
+                key, method, kwargs, route = job
+                if method is None:
+                    pending[next_id] = (key, False, None)
+                    next_id += 1
+                    continue
+                i = self._pick(route, inflight)
+                inflight[i][next_id] = key
+                try:
+                    self._conns[i].send((next_id, method, kwargs))
+                except (OSError, ValueError) as exc:
+                    self._fail(i, inflight, pending, f"Worker connection lost: {exc}")
+                next_id += 1
+
+            if ordered:
+                while next_out in pending:
+                    yield pending.pop(next_out)
+                    next_out += 1
+            else:
+                for job_id in list(pending):
+                    yield pending.pop(job_id)
+                next_out = next_id
+
+            if exhausted and not any(inflight) and not pending:
+                break
+
+            # ── collect whatever is ready ──────────────────────────────────────
+            ready = wait([c for c, jobs_i in zip(self._conns, inflight) if jobs_i])
+            for conn in ready:
+                i = self._conns.index(conn)
+                try:
+                    job_id, ok, payload = conn.recv()
+                except (EOFError, OSError):
+                    self._fail(i, inflight, pending, "Worker process exited unexpectedly.")
+                    continue
+                key = inflight[i].pop(job_id)
+                pending[job_id] = (key, ok, payload)
+                per_proc[i] += 1
+
+        elapsed    = time.perf_counter() - started
+        self.stats = {
+            "rows":         next_id,
+            "workers":      self.workers,
+            "seconds":      round(elapsed, 3),
+            "rows_per_sec": round(next_id / elapsed, 2) if elapsed > 0 else None,
+            "per_worker":   per_proc,
+        }
+
+    # ── internals ─────────────────────────────────────────────────────────────
+    def _pick(self, route: int, inflight) -> int:
+        preferred = route % self.workers
+        loads     = [len(j) for j in inflight]
+        least     = loads.index(min(loads))
+        return least if loads[preferred] - loads[least] > self.slack else preferred
+
+    def _fail(self, i, inflight, pending, message):
+        """Report every job on a dead worker as failed and start a replacement."""
+        for job_id, key in inflight[i].items():
+            pending[job_id] = (key, False, message)
+        inflight[i].clear()
+        self._stop(i, kill=True)
+        self._spawn(i)
+
+    def _spawn(self, i):
+        parent, child = self._ctx.Pipe()
+        proc = self._ctx.Process(target=_serve, args=(child,), daemon=True,
+                                 name=f"sdsolver-batch-{i}")
+        proc.start()
+        child.close()
+        self._procs[i] = proc
+        self._conns[i] = parent
+
+    def _stop(self, i, kill: bool):
+        proc, conn     = self._procs[i], self._conns[i]
+        self._procs[i] = None
+        self._conns[i] = None
+        if proc is None:
+            return
+        try:
+            if kill:
+                proc.terminate()
+            else:
+                conn.send(None)
+            proc.join(timeout=1.0)
+            if proc.is_alive():
+                proc.kill()
+        except Exception:
+            pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass
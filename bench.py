@@ -0,0 +1,252 @@
+"""
+Benchmark harness for the engines.
+
+    python -m sdsolver bench --out bench.json
+    python -m sdsolver bench --families polynomial,rational --orders 1-3 --repeat 5
+    python -m sdsolver bench --compare baseline.json
+
+Every (target, expression, order) cell is timed `repeat` times with
+time.perf_counter; setup (fresh caches, pre-built contexts, compiled f) is
+not timed. Results are written as JSON with min / median / p90 / p95 / max
+per cell and a per-target, per-family summary, so two runs can be diffed.
+
+Targets
+    engine.full        DerivativeEngine.validate_and_compute, caches cleared
+    engine.answer      the same with mode="answer"
+    rules.trail        differentiate_with_trail, derivatives already built
+    verify.symbolic    _symbolic_verify, derivatives already built
+    numerical.full     NumericalEngine.validate_and_compute, caches cleared
+    numerical.fd       NumericalEngine._finite_difference
+    numerical.verify   _numerical_verify
+    automatic.full     AutoDiffEngine.validate_and_compute, caches cleared
+    automatic.taylor   TaylorProgram run at the point, program already compiled
+"""
+import json
+import math
+import platform
+import re
+import sys
+import time
+from datetime import datetime
+
+CORPUS = {
+    "polynomial":  ["x^3 + 2x^2 - 5x + 1", "3x^7 - x^4 + 2x - 9"],
+    "product":     ["x^2*sin(x)", "x*exp(x)*cos(x)"],
+    "composition": ["sin(x^2)", "exp(sin(x))", "sqrt(1 + x^2)"],
+    "rational":    ["(x^2 + 1)/(x - 3)", "1/(1 + x^2)"],
+    "nested":      ["log(cos(x) + 2)", "exp(tan(x)/2)", "sin(exp(x))*log(x + 2)"],
+}
+TARGETS = ("engine.full", "engine.answer", "rules.trail", "verify.symbolic",
+           "numerical.full", "numerical.fd", "numerical.verify",
+           "automatic.full", "automatic.taylor")
+ORDERS  = tuple(range(1, 11))
+POINT   = 0.7
+# symbolic stages are capped so one pathological cell cannot stall the run
+BUDGETS = {"simplify": 10.0, "trail": 10.0, "verify": 10.0}
+
+
+# ── targets ───────────────────────────────────────────────────────────────────
+def _clear_caches():
+    from context import invalidate_context
+    from lambda_cache import invalidate_lambdas
+    invalidate_context()
+    invalidate_lambdas()
+
+
+def _prepare(target: str, expr: str, order: int, budgets: dict):
+    """Do the untimed setup for one sample and return the callable to time."""
+    from engine import DerivativeEngine, _symbolic_verify
+    from numerical_engine import NumericalEngine, _numerical_verify, H_DEFAULT
+    from autodiff_engine import AutoDiffEngine
+    from context import DerivativeContext
+    from rules import differentiate_with_trail
+    from stages import Budget
+
+    fx = _normalise(expr)
+    if target in ("engine.full", "engine.answer"):
+        _clear_caches()
+        mode = target.split(".")[1]
+        return lambda: DerivativeEngine().validate_and_compute(
+            expr, "x", str(order), str(POINT), budgets=budgets, mode=mode)
+    if target == "numerical.full":
+        _clear_caches()
+        return lambda: NumericalEngine().validate_and_compute(expr, "x", str(order), str(POINT))
+    if target == "automatic.full":
+        _clear_caches()
+        return lambda: AutoDiffEngine().validate_and_compute(expr, "x", str(order), str(POINT))
+    if target == "automatic.taylor":
+        program = DerivativeContext(fx, "x").taylor
+        return lambda: program(POINT, order)
+    if target in ("rules.trail", "verify.symbolic"):
+        ctx = DerivativeContext(fx, "x")
+        ctx.derivative(order, Budget(budgets))
+        if target == "rules.trail":
+            return lambda: differentiate_with_trail(fx, "x", order, ctx)
+        answer = ctx.answer(order)
+        return lambda: _symbolic_verify(fx, "x", order, answer, ctx, Budget(budgets))
+
+    engine = NumericalEngine()
+    f      = engine._make_lambda(fx, "x")
+    if target == "numerical.fd":
+        return lambda: engine._finite_difference(f, POINT, order, "central", H_DEFAULT)
+    approx, _ = engine._finite_difference(f, POINT, order, "central", H_DEFAULT)
+    return lambda: _numerical_verify(f, POINT, order, "central", H_DEFAULT, approx)
+
+
+def _warm_up():
+    """Pay module imports and SymPy's first-call costs before anything is timed."""
+    from engine import DerivativeEngine
+    from numerical_engine import NumericalEngine
+    from autodiff_engine import AutoDiffEngine
+    DerivativeEngine().validate_and_compute("sin(x)*x", "x", "2", "1")
+    NumericalEngine().validate_and_compute("sin(x)*x", "x", "2", "1")
+    AutoDiffEngine().validate_and_compute("sin(x)*x", "x", "2", "1")
+    _clear_caches()
+
+
+def _normalise(expr: str) -> str:
+    """The input rewriting validate_and_compute applies (^ → **, 2x → 2*x, )( → )*( )."""
+    expr = expr.replace("^", "**")
+    expr = re.sub(r'(\d)([a-zA-Z])', r'\1*\2', expr)
+    return re.sub(r'\)\s*\(', r')*(', expr)
+
+
+# ── statistics ────────────────────────────────────────────────────────────────
+def percentile(sorted_values: list, q: float) -> float:
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return math.nan
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples: list) -> dict:
+    """min / median / p90 / p95 / max / mean of samples, in milliseconds."""
+    ms = sorted(s * 1e3 for s in samples)
+    n  = len(ms)
+    return {
+        "n":      n,
+        "min":    round(ms[0], 4) if n else None,
+        "median": _median(ms),
+        "p90":    round(percentile(ms, 90), 4) if n else None,
+        "p95":    round(percentile(ms, 95), 4) if n else None,
+        "max":    round(ms[-1], 4) if n else None,
+        "mean":   round(sum(ms) / n, 4) if n else None,
+    }
+
+
+# ── runner ────────────────────────────────────────────────────────────────────
+def run(families=None, orders=ORDERS, targets=TARGETS, repeat: int = 3,
+        budgets: dict = None, progress=None) -> dict:
+    """
+    Time every (target, expression, order) cell and return the report dict.
+    `progress(cell)` is called after each cell, e.g. to print a line.
+    """
+    budgets  = dict(BUDGETS if budgets is None else budgets)
+    families = list(families or CORPUS)
+    cells    = []
+    _warm_up()
+    for target in targets:
+        for family in families:
+            for expr in CORPUS[family]:
+                for order in orders:
+                    samples, error, out = [], None, None
+                    for _ in range(repeat):
+                        try:
+                            fn    = _prepare(target, expr, order, budgets)
+                            start = time.perf_counter()
+                            out   = fn()
+                            samples.append(time.perf_counter() - start)
+                        except Exception as exc:
+                            error = f"{type(exc).__name__}: {exc}"
+                            break
+                    cell = {"target": target, "family": family, "expr": expr,
+                            "order": order, **summarize(samples)}
+                    if isinstance(out, dict) and out.get("timed_out"):
+                        cell["timed_out"] = out["timed_out"]
+                    if error:
+                        cell["error"] = error
+                    cells.append(cell)
+                    if progress:
+                        progress(cell)
+    return {"meta": _meta(families, orders, targets, repeat, budgets),
+            "cells": cells, "summary": _summary(cells)}
+
+
+def _summary(cells: list) -> dict:
+    """Median of cell medians per target and family, plus per target overall."""
+    groups = {}
+    for cell in cells:
+        if cell["median"] is None:
+            continue
+        groups.setdefault(cell["target"], {}).setdefault(cell["family"], []).append(cell["median"])
+    out = {}
+    for target, fams in groups.items():
+        every = sorted(m for ms in fams.values() for m in ms)
+        out[target] = {"all": _median(every)}
+        out[target].update({fam: _median(sorted(ms)) for fam, ms in fams.items()})
+    return out
+
+
+def _median(sorted_values: list) -> float:
+    n = len(sorted_values)
+    if not n:
+        return None
+    mid = sorted_values[n // 2] if n % 2 else (sorted_values[n // 2 - 1] + sorted_values[n // 2]) / 2
+    return round(mid, 4)
+
+
+def _meta(families, orders, targets, repeat, budgets) -> dict:
+    import numpy
+    import sympy
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python":    sys.version.split()[0],
+        "sympy":     sympy.__version__,
+        "numpy":     numpy.__version__,
+        "platform":  platform.platform(),
+        "machine":   platform.machine(),
+        "families":  list(families),
+        "orders":    list(orders),
+        "targets":   list(targets),
+        "repeat":    repeat,
+        "budgets":   budgets,
+        "unit":      "ms",
+    }
+
+
+# ── comparison ────────────────────────────────────────────────────────────────
+def compare(current: dict, baseline: dict, threshold: float = 0.25) -> list:
+    """
+    Cells whose median grew by more than `threshold` (fraction) against the
+    baseline report, as dicts with both medians and the ratio, worst first.
+    """
+    def key(cell):
+        return cell["target"], cell["expr"], cell["order"]
+
+    base  = {key(c): c for c in baseline.get("cells", []) if c.get("median")}
+    worse = []
+    for cell in current.get("cells", []):
+        old = base.get(key(cell))
+        if old is None or not cell.get("median"):
+            continue
+        ratio = cell["median"] / old["median"]
+        if ratio > 1 + threshold:
+            worse.append({"target": cell["target"], "expr": cell["expr"], "order": cell["order"],
+                          "baseline": old["median"], "current": cell["median"],
+                          "ratio": round(ratio, 2)})
+    return sorted(worse, key=lambda c: -c["ratio"])
+
+
+def parse_orders(text: str) -> tuple:
+    """"1-3,5" → (1, 2, 3, 5)."""
+    orders = []
+    for part in text.split(","):
+        lo, _, hi = part.strip().partition("-")
+        orders.extend(range(int(lo), int(hi or lo) + 1))
+    return tuple(orders)
+
+
+def save(report: dict, path: str):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=1, ensure_ascii=False)
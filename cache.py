@@ -0,0 +1,124 @@
+import threading
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Thread-safe least-recently-used cache bounded by entry count and by an
+    approximate byte budget.
+
+    Byte usage is a running total of per-entry sizes. Each get/put
+    re-measures the entry it touches and the previous most-recently-used
+    one, so values that grow while a caller holds them (e.g. a
+    DerivativeContext acquiring more derivatives) are accounted for on the
+    next access without re-sizing the whole cache.
+    """
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 64 * 1024 * 1024,
+                 sizeof=None):
+        self.max_entries = max_entries
+        self.max_bytes   = max_bytes
+        self._sizeof     = sizeof or (lambda value: 0)
+        self._data       = OrderedDict()
+        self._sizes      = {}          # key → sizeof(value) when last measured
+        self._bytes      = 0
+        self._lock       = threading.RLock()
+        self.hits        = 0
+        self.misses      = 0
+        self.evictions   = 0
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._touch(key)
+            self.hits += 1
+            self._enforce()
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._touch(key)
+            self._enforce()
+
+    def get_or_create(self, key, factory):
+        """Return the cached value for `key`, building it with factory() on a miss."""
+        with self._lock:
+            value = self.get(key)
+            if value is None:
+                value = factory()
+                self.put(key, value)
+            return value
+
+    def invalidate(self, key=None):
+        """Drop one entry, or every entry when `key` is None."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+                self._sizes.clear()
+                self._bytes = 0
+            elif self._data.pop(key, None) is not None:
+                self._bytes -= self._sizes.pop(key)
+
+    def configure(self, max_entries: int = None, max_bytes: int = None):
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            self._enforce()
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "entries":     len(self._data),
+                "bytes":       self._bytes,
+                "max_entries": self.max_entries,
+                "max_bytes":   self.max_bytes,
+                "hits":        self.hits,
+                "misses":      self.misses,
+                "evictions":   self.evictions,
+                "hit_rate":    self.hits / total if total else 0.0,
+            }
+
+    def __contains__(self, key):
+        with self._lock:
+            return key in self._data
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def _measure(self, key):
+        size              = self._sizeof(self._data[key])
+        self._bytes      += size - self._sizes.get(key, 0)
+        self._sizes[key]  = size
+
+    def _touch(self, key):
+        # the previous MRU entry is the one most likely to have grown since
+        recent   = reversed(self._data)
+        previous = next(recent)
+        if previous == key and key not in self._sizes:      # just inserted by put
+            previous = next(recent, key)
+        if previous != key:
+            self._measure(previous)
+        self._data.move_to_end(key)
+        self._measure(key)
+
+    def _evict_oldest(self):
+        key, _ = self._data.popitem(last=False)
+        self._bytes   -= self._sizes.pop(key)
+        self.evictions += 1
+
+    def _enforce(self):
+        # the most recently used entry is never evicted, even if it alone
+        # exceeds max_bytes — the caller is still holding it
+        while len(self._data) > max(self.max_entries, 1):
+            self._evict_oldest()
+        while len(self._data) > 1 and self._bytes > self.max_bytes:
+            self._evict_oldest()
@@ -0,0 +1,208 @@
+import io
+import threading
+import tokenize
+
+from sympy import symbols, sympify, diff, simplify, preorder_traversal
+
+from cache import LRUCache
+from evaluator import compile_expr
+from stages import StageTimeout
+
+# rough per-node footprint of a SymPy tree, used for the cache byte budget
+_NODE_BYTES = 200
+
+
+class DerivativeTower:
+    """
+    Successive derivatives f, f′, f″, … of one expression, each stored once.
+
+    Level n is simplify(d/dx level n−1), so asking for order 7 after order 5
+    costs two more passes, and orders 1..10 together cost the same as 10.
+    When a Budget runs out during simplify the level is kept unsimplified
+    and its order is recorded in `unsimplified`.
+    """
+
+    def __init__(self, expr, var):
+        self.var          = var
+        self._levels      = [expr]
+        self.unsimplified = set()
+
+    @property
+    def height(self) -> int:
+        """Highest order computed so far."""
+        return len(self._levels) - 1
+
+    def __getitem__(self, order: int):
+        return self.extend(order)
+
+    def extend(self, order: int, budget=None):
+        """Compute levels up to `order`; differentiate timeouts propagate."""
+        while self.height < order:
+            prev = self._levels[-1]
+            if budget is None:
+                self._levels.append(simplify(diff(prev, self.var)))
+                continue
+            raw = budget.run("differentiate", diff, prev, self.var)
+            try:
+                self._levels.append(budget.run("simplify", simplify, raw))
+            except StageTimeout:
+                self.unsimplified.add(self.height + 1)
+                self._levels.append(raw)
+        return self._levels[order]
+
+    def upto(self, order: int) -> list:
+        """[f, f′, …, f⁽ⁿ⁾] for n = order."""
+        self[order]
+        return self._levels[:order + 1]
+
+
+class DerivativeContext:
+    """
+    One parsed f(x) shared across a symbolic run.
+
+    The expression is sympified once and its derivatives live in a
+    DerivativeTower, so each order is differentiated and simplified at most
+    once and the trail builder, the point evaluator and the verifier all
+    work on the same SymPy tree.
+    Contexts are kept in a process-wide LRU cache (see get_context), so
+    rule trails and verification results are memoised here as well.
+    """
+
+    def __init__(self, expr_str: str, var_str: str):
+        self.expr_str      = expr_str
+        self.var_str       = var_str
+        self._var          = None
+        self._expr         = None
+        self._unevaluated  = None
+        self._tower        = None
+        self._compiled     = {}
+        self._taylor       = None
+        self._answers      = {}
+        self._lock         = threading.RLock()
+        self.trails        = {}
+        self.verifications = {}
+        self.verify_limits = {}     # order → verify budget its cached checks timed out under
+        self.nbytes        = len(expr_str) * 2
+
+    @property
+    def var(self):
+        if self._var is None:
+            self._var = symbols(self.var_str)
+        return self._var
+
+    @property
+    def expr(self):
+        if self._expr is None:
+            self._expr = sympify(self.expr_str)
+            self.nbytes += self._tree_bytes(self._expr)
+        return self._expr
+
+    @property
+    def unevaluated(self):
+        """sympify(expr_str, evaluate=False) — the form shown in validation."""
+        if self._unevaluated is None:
+            self._unevaluated = sympify(self.expr_str, evaluate=False)
+        return self._unevaluated
+
+    @property
+    def tower(self) -> DerivativeTower:
+        if self._tower is None:
+            self._tower = DerivativeTower(self.expr, self.var)
+        return self._tower
+
+    def derivative(self, order: int, budget=None):
+        """Return the simplified order-th derivative, extending the tower as needed."""
+        with self._lock:
+            tower  = self.tower
+            height = tower.height
+            try:
+                deriv = tower.extend(order, budget)
+            finally:
+                for level in tower.upto(min(order, tower.height))[height + 1:]:
+                    self.nbytes += self._tree_bytes(level)
+            return deriv
+
+    def answer(self, order: int) -> str:
+        """Display text of the order-th derivative (rules.answer_text), memoised."""
+        text = self._answers.get(order)
+        if text is None:
+            from rules import answer_text
+            text = answer_text(self.derivative(order), order)
+            self._answers[order] = text
+        return text
+
+    def compiled(self, order: int):
+        """Vectorised NumPy evaluator for the order-th derivative (order 0 is f itself)."""
+        fn = self._compiled.get(order)
+        if fn is None:
+            fn = compile_expr(self.derivative(order) if order else self.expr, self.var)
+            self._compiled[order] = fn
+        return fn
+
+    def evaluate(self, order: int, points):
+        """Values of the order-th derivative at every point, in one batched call."""
+        return self.compiled(order)(points)
+
+    @property
+    def taylor(self):
+        """f compiled to a taylor.TaylorProgram (forward-mode AD), built once."""
+        if self._taylor is None:
+            from taylor import compile_taylor
+            self._taylor = compile_taylor(self.expr, self.var)
+            self.nbytes += _NODE_BYTES * len(self._taylor)
+        return self._taylor
+
+    @staticmethod
+    def _tree_bytes(expr) -> int:
+        return _NODE_BYTES * sum(1 for _ in preorder_traversal(expr))
+
+
+# ── process-wide cache ────────────────────────────────────────────────────────
+CONTEXT_CACHE = LRUCache(max_entries=256, max_bytes=64 * 1024 * 1024,
+                         sizeof=lambda ctx: ctx.nbytes)
+
+
+def normalize_expr(expr_str: str) -> str:
+    """
+    Cache-key form of an (already ^/implicit-mul normalised) expression:
+    its Python tokens joined by single spaces, so "x**2+1" and "x ** 2 + 1"
+    share a key while "x y" and "xy" (which parse differently) do not.
+    """
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(expr_str).readline)
+        return " ".join(tok.string for tok in tokens if tok.string.strip())
+    except (tokenize.TokenError, SyntaxError):
+        return " ".join(expr_str.split())
+
+
+def get_context(expr_str: str, var_str: str) -> DerivativeContext:
+    """Return the cached DerivativeContext for (f(x), variable), creating it on a miss."""
+    key = (normalize_expr(expr_str), var_str)
+    return CONTEXT_CACHE.get_or_create(key, lambda: DerivativeContext(expr_str, var_str))
+
+
+def parse_context(expr_str: str, var_str: str) -> DerivativeContext:
+    """
+    Context for the parse check, which runs before the variable is
+    validated: the cached one for a single-letter variable, otherwise a
+    throwaway, so invalid input never lands in CONTEXT_CACHE.
+    """
+    if len(var_str) == 1 and var_str.isalpha():
+        return get_context(expr_str, var_str)
+    return DerivativeContext(expr_str, var_str)
+
+
+def invalidate_context(expr_str: str = None, var_str: str = "x"):
+    """Forget one cached expression, or the whole cache when expr_str is None."""
+    if expr_str is None:
+        CONTEXT_CACHE.invalidate()
+    else:
+        CONTEXT_CACHE.invalidate((normalize_expr(expr_str), var_str))
+
+
+def configure_context_cache(max_entries: int = None, max_bytes: int = None):
+    CONTEXT_CACHE.configure(max_entries=max_entries, max_bytes=max_bytes)
+
+
+def context_cache_stats() -> dict:
+    return CONTEXT_CACHE.stats()
@@ -1,34 +1,46 @@
 import sys
 import re
+import contextlib
+import math
+import time
 from datetime import datetime
-import subprocess
 
-from rules import differentiate_with_trail
+import numpy as np
 
+from rules import differentiate_with_trail, answer_text
+from context import DerivativeContext, get_context, invalidate_context, parse_context
+from evaluator import compile_expr
+from stages import Budget, StageTimeout, finish_timings
+from profiling import Profile, header as profile_header
+
+# importing this module never installs anything; worker.ensure_sympy does
 try:
     import sympy
     from sympy import symbols, sympify, diff, simplify, integrate, SympifyError
     SYMPY_OK = True
     SYMPY_VERSION = sympy.__version__
 except ImportError:
-    try:
-        subprocess.check_call(
-            [sys.executable, "-m", "pip", "install", "sympy"],
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-        )
-        import sympy
-        from sympy import symbols, sympify, diff, simplify, integrate, SympifyError
-        SYMPY_OK = True
-        SYMPY_VERSION = sympy.__version__
-    except Exception:
-        SYMPY_OK = False
-        SYMPY_VERSION = "NOT INSTALLED"
-
-from trail_logger import DIV, HDIV, SECTION_ICONS
+    SYMPY_OK = False
+    SYMPY_VERSION = "NOT INSTALLED"
+
+from trail import Trail, NullTrail, Timings
 
 ORDER_MIN = 1
 ORDER_MAX = 10
+SWEEP_POINTS = 200
+MODES = ("full", "answer")
+# a timeout in these stages leaves a degraded context (unparsed / unsimplified tower)
+DEGRADING_STAGES = ("parse", "differentiate", "simplify")
+
+
+def _evict_if_degraded(budget, raw_fx, var):
+    """
+    Drop the cached context after a parse / differentiate / simplify timeout,
+    so a degraded tower is not served next time. A "verify" or "trail"
+    timeout leaves the tower intact and keeps it cached.
+    """
+    if any(stage in DEGRADING_STAGES for stage in budget.timed_out):
+        invalidate_context(raw_fx, var)
 
 
 def _clean_expr(t):
@@ -52,60 +64,100 @@ def _fix_implicit_mul(expr_str):
     return expr_str
 
 
-def _symbolic_verify(raw_fx, var_str, order, deriv_expr_str):
+def _back_integration(d_sym, x, order, diff_orig):
+    """Strategy A rows: integrate d^n f `order` times and compare d/dx of both."""
+    reintegrated = d_sym
+    for _ in range(order):
+        reintegrated = integrate(reintegrated, x)
+    reintegrated = simplify(reintegrated)
+
+    # Strip constants: compare d/dx of both expressions
+    diff_reint  = simplify(diff(reintegrated, x))
+    residual    = simplify(diff_orig - diff_reint)
+
+    return [
+        ("Re-integrate d^n f  (drop C)", _clean_expr(str(reintegrated)), "info"),
+        ("d/dx[f(x)]",                   _clean_expr(str(diff_orig)),    "info"),
+        ("d/dx[∫...d^n result]",          _clean_expr(str(diff_reint)),   "info"),
+        ("Residual (should = 0)",          _clean_expr(str(residual)),
+         "pass" if residual == sympy.Integer(0) else "warn"),
+    ]
+
+
+def _symbolic_verify(raw_fx, var_str, order, deriv_expr_str, ctx=None, budget=None):
     """
     Verification Strategy:
       1. Integrate the computed derivative `order` times.
       2. Compare with the original f(x) (up to constants).
       3. Also compute forward-difference numeric spot-check at x=1.0.
 
+    `ctx` supplies the already differentiated SymPy tree used as reference.
+    Step 1-2 run under the "verify" stage of `budget`; if it runs out, only
+    the numeric checks are reported.
+
     Returns a list of (label, value, status) tuples.
     """
     results = []
+    budget  = budget or Budget()
     try:
-        x     = symbols(var_str)
-        f_sym = sympify(raw_fx)
+        if ctx is None:
+            ctx = DerivativeContext(raw_fx, var_str)
+        x     = ctx.var
+        f_sym = ctx.expr
 
         # FIX: restore explicit multiplication before passing to sympify
-        x = symbols(var_str)
         try:
             d_sym = sympify(_fix_implicit_mul(deriv_expr_str))
         except Exception:
-            d_sym = diff(sympify(raw_fx), x, order)
+            d_sym = diff(f_sym, x, order)
 
         # ── Back-integration check ────────────────────────────────────────────
-        reintegrated = d_sym
-        for _ in range(order):
-            reintegrated = integrate(reintegrated, x)
-        reintegrated = simplify(reintegrated)
-
-        # Strip constants: compare d/dx of both expressions
-        diff_orig   = simplify(diff(f_sym,        x))
-        diff_reint  = simplify(diff(reintegrated, x))
-        residual    = simplify(diff_orig - diff_reint)
-
-        results.append(("Re-integrate d^n f  (drop C)", _clean_expr(str(reintegrated)), "info"))
-        results.append(("d/dx[f(x)]",                   _clean_expr(str(diff_orig)),    "info"))
-        results.append(("d/dx[∫...d^n result]",          _clean_expr(str(diff_reint)),   "info"))
-        results.append(("Residual (should = 0)",          _clean_expr(str(residual)),
-                        "pass" if residual == sympy.Integer(0) else "warn"))
-
-        # ── Numeric spot-check at x = 1 ──────────────────────────────────────
+        try:
+            results.extend(budget.run("verify", _back_integration,
+                                      d_sym, x, order, ctx.derivative(1, budget)))
+        except StageTimeout as exc:
+            results.append(("Back-integration",
+                            f"timed out after {exc.limit:g}s — numeric checks only", "warn"))
+
+        # ── Numeric spot-checks (one batched call per side) ──────────────────
+        t_spot      = time.perf_counter()
         test_points = [1.0, 2.0, -1.0, 0.5, 3.0]
         all_match   = True
-        for xv in test_points:
-            try:
-                f_val  = float(diff(f_sym, x, order).subs(x, xv))
-                d_val  = float(d_sym.subs(x, xv))
-                err    = abs(f_val - d_val)
-                status = "pass" if err < 1e-6 else "warn"
-                if err >= 1e-6:
-                    all_match = False
-                results.append((f"Spot-check x={xv}",
-                                 f"SymPy={f_val:.6g}  Result={d_val:.6g}  Δ={err:.2e}",
-                                 status))
-            except Exception:
+        d_eval      = compile_expr(d_sym, x)
+        f_vals      = ctx.evaluate(order, test_points)
+        d_vals      = d_eval(test_points)
+        for xv, f_val, d_val in zip(test_points, f_vals, d_vals):
+            if math.isnan(f_val) or math.isnan(d_val):
                 results.append((f"Spot-check x={xv}", "skipped (eval error)", "warn"))
+                continue
+            err    = abs(f_val - d_val)
+            status = "pass" if err < 1e-6 else "warn"
+            if err >= 1e-6:
+                all_match = False
+            results.append((f"Spot-check x={xv}",
+                             f"SymPy={f_val:.6g}  Result={d_val:.6g}  Δ={err:.2e}",
+                             status))
+
+        budget.add("verify_spot_checks", time.perf_counter() - t_spot)
+
+        # ── Dense sweep: same comparison at SWEEP_POINTS points ──────────────
+        t_sweep = time.perf_counter()
+        sweep  = [-3.0 + 6.0 * i / (SWEEP_POINTS - 1) for i in range(SWEEP_POINTS)]
+        f_vals = ctx.evaluate(order, sweep)
+        d_vals = d_eval(sweep)
+        valid  = ~(np.isnan(f_vals) | np.isnan(d_vals))
+        if valid.any():
+            rel = np.abs(f_vals - d_vals)[valid] / np.maximum(1.0, np.abs(f_vals[valid]))
+            ok  = float(rel.max()) < 1e-6
+            if not ok:
+                all_match = False
+            results.append((f"Sweep {SWEEP_POINTS} pts in [-3, 3]",
+                             f"max rel Δ={rel.max():.2e}  ({int(valid.sum())} evaluable)",
+                             "pass" if ok else "warn"))
+        else:
+            results.append((f"Sweep {SWEEP_POINTS} pts in [-3, 3]",
+                             "skipped (eval error)", "warn"))
+        budget.add("verify_sweep", time.perf_counter() - t_sweep)
 
         overall = "PASS — all spot-checks consistent ✔" if all_match \
                   else "WARN — some spot-checks diverged ⚠"
@@ -125,7 +177,51 @@ class DerivativeEngine:
         raw_var: str,
         raw_order: str,
         raw_point: str,
+        budgets: dict = None,
+        trail:   bool = True,
+        mode:    str  = "full",
+        show_timings: bool = False,
+        profile: str  = None,
     ) -> dict:
+        """
+        `budgets` overrides stages.DEFAULT_BUDGETS (seconds per stage). A
+        stage that runs out degrades the result instead of hanging: an
+        unsimplified derivative, a plain answer without a rule trail, or
+        numeric-only verification. result["timed_out"] lists such stages.
+
+        result["log"] is a trail.Trail, rendered only when read. With
+        trail=False it stays empty and the rule-by-rule derivation is
+        skipped; the answer text is the same.
+
+        mode="answer" validates, differentiates and evaluates the point, and
+        stops there: no trail, no rule derivation, no verification.
+
+        result["timings"] maps each stage (validation, parse, differentiate,
+        simplify, trail, point_eval, verify, verify_spot_checks,
+        verify_sweep, total) to milliseconds; show_timings=True also lists
+        them in SUMMARY. Hooks from stages.add_timing_hook see every result.
+
+        profile="path/stem" runs under cProfile and tracemalloc and writes
+        stem.prof and stem.alloc.txt (see profiling.py); their paths are
+        returned in result["profile"].
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        budget   = Budget(budgets)
+        profiler = Profile(profile) if profile else None
+        if profiler:
+            budget.wrap_thread = profiler.wrap
+        started  = time.perf_counter()
+        with profiler or contextlib.nullcontext():
+            result = self._compute(raw_fx, raw_var, raw_order, raw_point,
+                                   budget, trail, mode, show_timings)
+        finish_timings("symbolic", result, budget, started)
+        if profiler:
+            result["profile"] = profiler.save(profile_header("symbolic", result))
+        return result
+
+    def _compute(self, raw_fx, raw_var, raw_order, raw_point,
+                 budget, trail, mode, show_timings) -> dict:
         import re as _re
         raw_fx = raw_fx.replace("^", "**")
         raw_fx = _re.sub(r'(\d)([a-zA-Z])', r'\1*\2', raw_fx)
@@ -133,21 +229,13 @@ class DerivativeEngine:
 
         result = self._base_result(raw_fx, raw_var, raw_order, raw_point)
         vsteps = result["validation_steps"]
-        log    = []
-
-        def w(text, tag="step"):
-            log.append((text, tag))
-
-        def section(name):
-            icon = SECTION_ICONS.get(name, "◆")
-            w(f"{icon} {name}\n", "section")
-            w(DIV + "\n", "dim")
-
-        def kv(key, value, tag="step"):
-            w(f"   {key:<24}:  {value}\n", tag)
-
-        def blank():
-            w("\n", "dim")
+        result["mode"] = mode
+        log    = (Trail(kv_width=24, outcome_width=30) if trail and mode == "full"
+                  else NullTrail())
+        w       = log.text
+        section = log.section
+        kv      = log.kv
+        blank   = log.blank
 
         # ── header ────────────────────────────────────────────────────────────
         _box_inner = 62
@@ -171,6 +259,7 @@ class DerivativeEngine:
         blank()
 
         # ── Validation ────────────────────────────────────────────────────────
+        t_valid = time.perf_counter()
         if not raw_fx:
             vsteps.append(self._step(1, "f(x) field — required, not empty",
                                      "FAIL", "f(x) cannot be empty."))
@@ -195,9 +284,15 @@ class DerivativeEngine:
                 result["ok"] = False
             else:
                 try:
-                    sym_expr = sympify(raw_fx, evaluate=False)
+                    _pctx    = parse_context(raw_fx, raw_var if raw_var else "x")
+                    sym_expr = budget.run("parse", lambda: _pctx.unevaluated)
                     vsteps.append(self._step(2, "f(x) — SymPy parse check", "PASS",
                                              f"Parsed OK → {sym_expr}"))
+                except StageTimeout as exc:
+                    vsteps.append(self._step(2, "f(x) — SymPy parse check", "FAIL",
+                                             f"Parsing took longer than {exc.limit:g}s."))
+                    result["field_errors"]["fx"] = "Expression is too large to parse."
+                    result["ok"] = False
                 except (SympifyError, TypeError, SyntaxError, ValueError) as exc:
                     short = str(exc).split("\n")[0][:80]
                     vsteps.append(self._step(2, "f(x) — SymPy parse check", "FAIL",
@@ -274,20 +369,16 @@ class DerivativeEngine:
                     vsteps.append(self._step(6, "Evaluate at x — numeric (opt)", "PASS",
                                              "Field blank — evaluation skipped."))
 
+        budget.add("validation", time.perf_counter() - t_valid)
+
         # ── Write validation into log ─────────────────────────────────────────
-        w("⓪ VALIDATION\n", "section")
-        w(DIV + "\n", "dim")
+        section("VALIDATION", "⓪")
         for check in vsteps:
-            icon = {"PASS": "✔", "FAIL": "✘", "SKIP": "○", "WARN": "⚠"}.get(check["status"], " ")
-            tag  = {"PASS": "pass", "FAIL": "fail", "SKIP": "dim", "WARN": "warn"}.get(
-                check["status"], "step")
-            w(f"   Step {check['num']}  {check['label']}\n", "step")
-            detail = f"  —  {check['detail']}" if check.get("detail") else ""
-            w(f"           {icon}  {check['status']}{detail}\n\n", tag)
+            log.check(check["num"], check["label"], check["status"], check.get("detail"))
 
         if not result["ok"]:
             w("   ✘  Computation aborted — correct errors and retry.\n", "fail")
-            w("\n" + HDIV + "\n", "dim")
+            log.close()
             result["log"] = log
             return result
 
@@ -295,16 +386,23 @@ class DerivativeEngine:
 
         # ── Compute ───────────────────────────────────────────────────────────
         try:
-            sym_var = symbols(result["var"])
-            expr    = sympify(raw_fx)
-            deriv   = simplify(diff(expr, sym_var, result["order"]))
-            result["answer"] = str(deriv)
+            ctx   = get_context(raw_fx, result["var"])
+            budget.run("parse", lambda: ctx.expr)
+            deriv = ctx.derivative(result["order"], budget)
 
             if point_val is not None:
-                try:
-                    result["point_value"] = f"{float(deriv.subs(sym_var, point_val)):.6g}"
-                except Exception:
-                    result["point_value"] = "[evaluation error]"
+                with budget.measure("point_eval"):
+                    value = float(ctx.evaluate(result["order"], [point_val])[0])
+                result["point_value"] = ("[evaluation error]" if math.isnan(value)
+                                         else str(value))
+        except StageTimeout as exc:
+            result["ok"] = False
+            result["answer"] = "Computation timed out"
+            result["timed_out"] = list(budget.timed_out)
+            w(f"   ✘  {exc}\n", "fail")
+            result["log"] = log
+            _evict_if_degraded(budget, raw_fx, result["var"])
+            return result
         except Exception as exc:
             result["ok"] = False
             result["answer"] = "Computation error"
@@ -312,17 +410,27 @@ class DerivativeEngine:
             result["log"] = log
             return result
 
-        rule_result      = differentiate_with_trail(raw_fx, result["var"], result["order"])
-        result["answer"] = rule_result["answer"]
+        if mode == "answer":
+            result["answer"]    = ctx.answer(result["order"])
+            result["timestamp"] = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
+            result["timed_out"] = list(budget.timed_out)
+            _evict_if_degraded(budget, raw_fx, result["var"])
+            result["log"] = log
+            return result
 
-        if point_val is not None:
-            try:
-                from sympy import symbols as _s, sympify as _sy, diff as _d, simplify as _si
-                _x  = _s(result["var"])
-                _dr = _si(_d(_sy(raw_fx), _x, result["order"]))
-                result["point_value"] = str(float(_dr.subs(_x, point_val)))
-            except Exception:
-                pass
+        try:
+            if not log.enabled:
+                rule_result = {"answer": ctx.answer(result["order"]), "steps": []}
+            else:
+                rule_result = budget.run("trail", differentiate_with_trail,
+                                         raw_fx, result["var"], result["order"], ctx)
+        except StageTimeout as exc:
+            rule_result = {
+                "answer": answer_text(deriv, result["order"]),
+                "steps":  [{"text": f"Rule trail skipped — exceeded its {exc.limit:g}s budget",
+                            "tag": "step"}],
+            }
+        result["answer"] = rule_result["answer"]
 
         result["timestamp"] = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
 
@@ -353,27 +461,13 @@ class DerivativeEngine:
         blank()
 
         # ── STEPS ─────────────────────────────────────────────────────────────
-        step_counter = [0]
-        w(f"{SECTION_ICONS['STEPS']} STEPS\n", "section")
-        w(DIV + "\n", "dim")
-
+        section("STEPS")
         for step in rule_result["steps"]:
-            if step["tag"] == "detail":
-                w("            → " + step["text"] + "\n", "rule")
-            elif step["tag"] == "answer":
-                step_counter[0] += 1
-                w(f"   Step {step_counter[0]:<2} ", "dim")
-                w(step["text"] + "\n", "answer")
-            else:
-                step_counter[0] += 1
-                w(f"   Step {step_counter[0]:<2} ", "dim")
-                w(step["text"] + "\n", "step")
+            log.step(step["tag"], step["text"])
 
         if result.get("point_value") is not None:
-            step_counter[0] += 1
-            w(f"   Step {step_counter[0]:<2} ", "dim")
-            w(f"Evaluate  f'({raw_point})\n", "step")
-            w(f"            → f'({raw_point})  =  {result['point_value']}\n", "answer")
+            log.step("step", "Evaluate  f'({})", raw_point)
+            log.step("detail", "f'({})  =  {}", raw_point, result["point_value"], tag="answer")
 
         blank()
 
@@ -386,17 +480,30 @@ class DerivativeEngine:
         # ── VERIFICATION (REAL) ───────────────────────────────────────────────
         section("VERIFICATION")
         kv("Strategy A", "Re-integrate derivative → compare d/dx of both")
-        kv("Strategy B", "Numeric spot-checks at 5 test points")
+        kv("Strategy B", f"Numeric spot-checks at 5 points + {SWEEP_POINTS}-point sweep")
         blank()
 
         # Pass result["answer"] through _fix_implicit_mul inside _symbolic_verify
-        ver_checks = _symbolic_verify(raw_fx, result["var"], result["order"], result["answer"])
-        result["verification"] = ver_checks
+        ver_checks = ctx.verifications.get(result["order"])
+        timed_out  = ctx.verify_limits.get(result["order"])
+        limit      = budget.limits.get("verify")
+        if ver_checks is not None and timed_out is not None:
+            if limit is None or limit > timed_out:
+                ver_checks = None           # a larger budget may finish the integration
+            else:
+                budget.timed_out.append("verify")
+        if ver_checks is None:
+            ver_checks = _symbolic_verify(raw_fx, result["var"], result["order"],
+                                          result["answer"], ctx, budget)
+            ctx.verifications[result["order"]] = ver_checks
+            if "verify" in budget.timed_out:
+                ctx.verify_limits[result["order"]] = limit
+            else:
+                ctx.verify_limits.pop(result["order"], None)
+        result["verification"] = list(ver_checks)
 
         for label, value, status in ver_checks:
-            tag = {"pass": "pass", "warn": "warn", "info": "verify"}.get(status, "step")
-            icon = {"pass": "✔", "warn": "⚠", "info": "→"}.get(status, " ")
-            w(f"   {icon}  {label:<30}  {value}\n", tag)
+            log.outcome(label, value, status)
 
         blank()
 
@@ -405,8 +512,17 @@ class DerivativeEngine:
         kv("Timestamp",   result["timestamp"])
         kv("Python",      result["python_version"])
         kv("SymPy",       result["sympy_version"])
-        w("\n" + HDIV + "\n", "dim")
-
+        if show_timings:
+            log.add(Timings(result["timings"]))
+        unsimplified = sorted(o for o in ctx.tower.unsimplified if o <= result["order"])
+        if unsimplified:
+            kv("Unsimplified orders", ", ".join(map(str, unsimplified)), "warn")
+        if budget.timed_out:
+            kv("Timed out", ", ".join(budget.timed_out), "warn")
+        log.close()
+
+        result["timed_out"] = list(budget.timed_out)
+        _evict_if_degraded(budget, raw_fx, result["var"])
         result["log"] = log
         return result
 
@@ -424,12 +540,16 @@ class DerivativeEngine:
             "raw_point":        raw_point,
             "var":              raw_var if raw_var else "x",
             "order":            1,
+            "mode":             "full",
             "answer":           "—",
             "point_value":      None,
             "validation_steps": [],
             "field_errors":     {},
             "log":              [],
             "verification":     [],
+            "timed_out":        [],
+            "timings":          {},
+            "profile":          None,
             "timestamp":        datetime.now().strftime("%Y-%m-%d  %H:%M:%S"),
             "python_version":   sys.version.split()[0],
             "sympy_version":    SYMPY_VERSION,
@@ -0,0 +1,42 @@
+import numpy as np
+from sympy import lambdify
+
+
+def compile_expr(expr, var):
+    """
+    Compile a SymPy expression of one variable into a vectorised callable.
+
+    The returned function takes a scalar or array of x values and returns a
+    float64 array of the same shape in a single NumPy call. Points where the
+    value is non-real or non-finite come back as NaN, which callers treat
+    the same way the old `float(expr.subs(x, v))` failures were treated.
+    Expressions NumPy cannot evaluate fall back to per-point SymPy.
+    """
+    fn = lambdify(var, expr, modules="numpy")
+
+    def evaluate(xs):
+        xs = np.asarray(xs, dtype=float)
+        try:
+            with np.errstate(all="ignore"):
+                out = np.asarray(fn(xs))
+        except Exception:
+            out = np.array([_subs_point(expr, var, xv) for xv in xs.ravel()])
+            out = out.reshape(xs.shape)
+        return _as_real(np.broadcast_to(out, xs.shape))
+
+    return evaluate
+
+
+def _subs_point(expr, var, xv):
+    try:
+        return complex(expr.subs(var, xv))
+    except Exception:
+        return np.nan
+
+
+def _as_real(values):
+    if np.iscomplexobj(values):
+        values = np.where(values.imag == 0, values.real, np.nan)
+    values = np.array(values, dtype=float)
+    values[~np.isfinite(values)] = np.nan
+    return values
@@ -0,0 +1,262 @@
+"""
+Trail exports (TXT / HTML), written incrementally.
+
+Every writer streams from the structured log — any iterable of (text, tag)
+chunks, such as result["log"] — into an already open file, one chunk at a
+time, so a document is never assembled in memory. Nothing here imports
+tkinter; the GUI's Export menu and `sdsolver batch --report` both use it.
+
+    with open("trail.html", "w", encoding="utf-8") as fh:
+        write_html(fh, result["log"])
+
+    with BatchReport("report.html") as report:      # one file for a whole batch
+        for record in records:
+            report.add(record, record_log)
+"""
+from datetime import datetime
+from html import escape
+
+# tag → CSS colour / weight (mirrors the tkinter tag colours in main.py)
+TAG_COLORS = {
+    "header":  "#7DF9C2",
+    "section": "#F97DDB",
+    "step":    "#E8EAF0",
+    "answer":  "#FFD166",
+    "verify":  "#7DDBF9",
+    "summary": "#8890A6",
+    "dim":     "#8890A6",
+    "rule":    "#FFD166",
+    "pass":    "#7DF9C2",
+    "fail":    "#FF6B6B",
+    "warn":    "#FFD166",
+}
+TAG_WEIGHTS = {"header": "bold", "section": "bold", "answer": "bold"}
+
+_TAG_CSS = "\n".join(
+    f"    .t-{tag} {{ color: {color};"
+    + (f" font-weight: {TAG_WEIGHTS[tag]};" if tag in TAG_WEIGHTS else "") + " }"
+    for tag, color in TAG_COLORS.items()
+)
+
+_HTML_HEAD = """<!DOCTYPE html>
+<html lang="en">
+<head>
+  <meta charset="UTF-8" />
+  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
+  <title>{title}</title>
+  <style>
+    @import url('https://fonts.googleapis.com/css2?family=Share+Tech+Mono&display=swap');
+
+    * {{ box-sizing: border-box; margin: 0; padding: 0; }}
+
+    body {{
+      background: #0D0F14;
+      color: #E8EAF0;
+      font-family: 'Share Tech Mono', 'Courier New', monospace;
+      font-size: 13px;
+      line-height: 1.65;
+      padding: 32px 16px;
+    }}
+
+    .wrapper {{
+      max-width: 860px;
+      margin: 0 auto;
+    }}
+
+    /* ── Top banner ── */
+    .banner {{
+      background: #13161E;
+      border-left: 4px solid #7DF9C2;
+      padding: 18px 28px;
+      margin-bottom: 24px;
+      display: flex;
+      justify-content: space-between;
+      align-items: center;
+      flex-wrap: wrap;
+      gap: 8px;
+    }}
+    .banner-title {{
+      color: #7DF9C2;
+      font-size: 18px;
+      font-weight: bold;
+      letter-spacing: 2px;
+    }}
+    .banner-meta {{
+      color: #8890A6;
+      font-size: 11px;
+    }}
+
+    /* ── Trail box ── */
+    .trail-box {{
+      background: #1A1E2A;
+      border: 1px solid #252B3B;
+      border-radius: 4px;
+      padding: 24px 28px;
+      white-space: pre-wrap;
+      word-break: break-word;
+      line-height: 1.7;
+    }}
+
+    /* ── Batch report rows ── */
+    details {{
+      margin-bottom: 6px;
+    }}
+    summary {{
+      background: #13161E;
+      padding: 6px 12px;
+      cursor: pointer;
+      white-space: pre-wrap;
+      word-break: break-word;
+    }}
+    summary.ok   {{ border-left: 3px solid #7DF9C2; }}
+    summary.fail {{ border-left: 3px solid #FF6B6B; }}
+    details .trail-box {{ margin-top: 4px; }}
+
+    /* ── Footer ── */
+    .footer {{
+      margin-top: 20px;
+      color: #8890A6;
+      font-size: 10px;
+      text-align: right;
+      letter-spacing: 1px;
+    }}
+
+{tag_css}
+  </style>
+</head>
+<body>
+  <div class="wrapper">
+
+    <div class="banner">
+      <div class="banner-title">∂&nbsp;&nbsp;{banner}</div>
+      <div class="banner-meta">Exported: {timestamp}</div>
+    </div>
+
+"""
+
+_HTML_FOOT = """
+    <div class="footer">
+      Generated by SD Solver &nbsp;|&nbsp; {timestamp}
+    </div>
+
+  </div>
+</body>
+</html>
+"""
+
+_TXT_RULE = "=" * 64
+
+
+def _stamp(exported: datetime = None) -> str:
+    return (exported or datetime.now()).strftime("%Y-%m-%d  %H:%M:%S")
+
+
+# ── single trail ──────────────────────────────────────────────────────────────
+def write_txt(fh, log, exported: datetime = None):
+    """Plain-text export: a short header, then the chunks as they come."""
+    fh.write("SD SOLVER — Solution Trail Export\n"
+             f"Exported : {_stamp(exported)}\n" + _TXT_RULE + "\n\n")
+    for text, _tag in log:
+        fh.write(text)
+
+
+def write_html(fh, log, exported: datetime = None):
+    """Styled HTML export; one <span> per chunk, coloured by its tag."""
+    stamp = _stamp(exported)
+    fh.write(_HTML_HEAD.format(title="SD Solver — Solution Trail", tag_css=_TAG_CSS,
+                               banner="SD SOLVER — SOLUTION TRAIL", timestamp=stamp))
+    fh.write('    <div class="trail-box">')
+    _write_spans(fh, log)
+    fh.write("</div>\n")
+    fh.write(_HTML_FOOT.format(timestamp=stamp))
+
+
+def export(path: str, log, exported: datetime = None):
+    """Write `log` to `path`, as HTML when it ends in .htm/.html, else as text."""
+    writer = write_html if path.lower().endswith((".html", ".htm")) else write_txt
+    with open(path, "w", encoding="utf-8") as fh:
+        writer(fh, log, exported)
+
+
+def _write_spans(fh, log):
+    for text, tag in log:
+        fh.write(f'<span class="t-{tag if tag in TAG_COLORS else "step"}">'
+                 f"{escape(text, quote=False)}</span>")
+
+
+# ── batch report ──────────────────────────────────────────────────────────────
+class BatchReport:
+    """
+    One TXT or HTML document for a whole batch, written row by row.
+
+    add(record, log) takes a `sdsolver batch` record (line, method, raw_fx,
+    answer, ok / error, ...) and the row's trail chunks (may be empty). In
+    HTML each row becomes a collapsed <details> block whose summary line
+    shows the answer. Counts are written at the end by close().
+    """
+
+    def __init__(self, path: str, exported: datetime = None):
+        self.path  = path
+        self.html  = path.lower().endswith((".html", ".htm"))
+        self.stamp = _stamp(exported)
+        self.rows  = 0
+        self.fails = 0
+        self._fh   = open(path, "w", encoding="utf-8")
+        if self.html:
+            self._fh.write(_HTML_HEAD.format(title="SD Solver — Batch Report", tag_css=_TAG_CSS,
+                                             banner="SD SOLVER — BATCH REPORT",
+                                             timestamp=self.stamp))
+        else:
+            self._fh.write("SD SOLVER — Batch Report\n"
+                           f"Exported : {self.stamp}\n" + _TXT_RULE + "\n")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def add(self, record: dict, log=()):
+        ok          = bool(record.get("ok"))
+        self.rows  += 1
+        self.fails += not ok
+        title       = _row_title(record)
+        if self.html:
+            self._fh.write(f'    <details><summary class="{"ok" if ok else "fail"}">'
+                           f"{escape(title, quote=False)}</summary>")
+            if log:
+                self._fh.write('<div class="trail-box">')
+                _write_spans(self._fh, log)
+                self._fh.write("</div>")
+            self._fh.write("</details>\n")
+        else:
+            self._fh.write(f"\n{title}\n{'-' * 64}\n")
+            for text, _tag in log:
+                self._fh.write(text)
+
+    def close(self):
+        if self._fh is None:
+            return
+        totals = f"{self.rows} rows, {self.rows - self.fails} ok, {self.fails} failed"
+        if self.html:
+            self._fh.write(f'\n    <div class="footer">{totals}</div>')
+            self._fh.write(_HTML_FOOT.format(timestamp=self.stamp))
+        else:
+            self._fh.write(f"\n{_TXT_RULE}\n{totals}\n")
+        self._fh.close()
+        self._fh = None
+
+
+def _row_title(record: dict) -> str:
+    label = f"#{record.get('id', record.get('line', '?'))}"
+    if "error" in record:
+        return f"{label}  ✘  {record['error']}"
+    var   = record.get("var", "x")
+    title = (f"{label}  [{record.get('method', '?')}]  "
+             f"d^{record.get('order', '?')}/d{var}^{record.get('order', '?')}  "
+             f"{record.get('raw_fx', '')}  →  {record.get('answer', '—')}")
+    if record.get("point_value") is not None:
+        title += f"   at {var} = {record.get('raw_point')}: {record['point_value']}"
+    if not record.get("ok"):
+        title += "   ✘ " + "; ".join(record.get("field_errors", {}).values())
+    return title
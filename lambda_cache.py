@@ -0,0 +1,138 @@
+"""
+Compiled f(x) callables for the numerical engine.
+
+lambdify (SymPy printing + code generation) is the most expensive step of a
+numerical run, so generated functions are kept in an LRU keyed on the
+normalised expression and variable. Optionally the generated *source* is
+persisted to a JSON file, so a warm start re-executes it instead of calling
+lambdify at all. Persistence is off unless enable_persistence() is called or
+SDSOLVER_LAMBDA_CACHE names a file.
+"""
+import atexit
+import json
+import os
+import threading
+
+from cache import LRUCache
+from context import get_context, normalize_expr
+
+MODULES        = ("numpy", "sympy")
+PERSIST_LIMIT  = 4096
+_STORE_VERSION = 1
+
+LAMBDA_CACHE = LRUCache(max_entries=512)
+
+_lock       = threading.Lock()
+_store      = {}        # "var|expr" → generated source
+_store_path = None
+_namespace  = None
+
+
+def get_lambda(expr_str: str, var_str: str):
+    """Return the compiled callable for f(var), building it at most once."""
+    key = (normalize_expr(expr_str), var_str)
+    fn  = LAMBDA_CACHE.get(key)
+    if fn is None:
+        fn = _load_persisted(key) or _build(expr_str, var_str, key)
+        LAMBDA_CACHE.put(key, fn)
+    return fn
+
+
+def enable_persistence(path: str):
+    """Load previously generated sources from `path` and save back at exit."""
+    global _store_path
+    with _lock:
+        first       = _store_path is None
+        _store_path = path
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") == _STORE_VERSION and data.get("modules") == list(MODULES):
+                _store.update(data.get("entries", {}))
+        except (OSError, ValueError):
+            pass
+    if first:
+        atexit.register(save)
+
+
+def save():
+    """Write the persisted sources (most recent PERSIST_LIMIT) to disk."""
+    with _lock:
+        if _store_path is None:
+            return
+        entries = dict(list(_store.items())[-PERSIST_LIMIT:])
+        tmp     = _store_path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump({"version": _STORE_VERSION, "modules": list(MODULES),
+                           "entries": entries}, fh)
+            os.replace(tmp, _store_path)
+        except OSError:
+            pass
+
+
+def invalidate_lambdas():
+    LAMBDA_CACHE.invalidate()
+    with _lock:
+        _store.clear()
+
+
+def lambda_cache_stats() -> dict:
+    stats = LAMBDA_CACHE.stats()
+    stats["persisted"] = len(_store)
+    return stats
+
+
+# ── internals ─────────────────────────────────────────────────────────────────
+def _store_key(key) -> str:
+    return f"{key[1]}|{key[0]}"
+
+
+def _build(expr_str, var_str, key):
+    import inspect
+    from sympy import lambdify
+
+    ctx = get_context(expr_str, var_str)
+    fn  = lambdify(ctx.var, ctx.expr, modules=list(MODULES))
+    if _store_path is not None:
+        try:
+            source = inspect.getsource(fn)
+        except (OSError, TypeError):
+            source = None
+        if source:
+            with _lock:
+                _store.pop(_store_key(key), None)
+                _store[_store_key(key)] = source
+    return fn
+
+
+def _load_persisted(key):
+    with _lock:
+        source = _store.get(_store_key(key))
+    if source is None:
+        return None
+    namespace = _base_namespace()
+    local     = {}
+    try:
+        code = compile(source, f"<sdsolver:{key[0]}>", "exec")
+        # every global the function touches must exist in the shared namespace;
+        # otherwise it relied on a per-expression import — rebuild with lambdify
+        inner = next(c for c in code.co_consts if hasattr(c, "co_names"))
+        if any(name not in namespace for name in inner.co_names):
+            return None
+        exec(code, namespace, local)
+    except Exception:
+        return None
+    return next(iter(local.values()), None)
+
+
+def _base_namespace():
+    global _namespace
+    if _namespace is None:
+        from sympy import Symbol, lambdify
+        _namespace = lambdify(Symbol("_x"), 0, modules=list(MODULES)).__globals__
+    return _namespace
+
+
+if os.environ.get("SDSOLVER_LAMBDA_CACHE"):
+    enable_persistence(os.environ["SDSOLVER_LAMBDA_CACHE"])
@@ -1,12 +1,18 @@
+import time
+_LAUNCHED = time.perf_counter()     # startup is measured from here
+
 import tkinter as tk
-from tkinter import scrolledtext, font, filedialog
+from tkinter import font, filedialog
 from datetime import datetime
+import os
+import shutil
 import sys
-import threading
+import tempfile
 
-from engine import DerivativeEngine
-from numerical_engine import NumericalEngine
-from trail_logger import TrailLogger
+from trail_logger import TrailLogger, CHARS_PER_SEC
+from trail_view import TrailView
+from export import write_txt, write_html
+from worker import ComputeWorker, PROCESS
 
 BG_DARK  = "#0D0F14"
 BG_PANEL = "#13161E"
@@ -31,15 +37,46 @@ class DerivativeApp(tk.Tk):
         self.minsize(900, 720)
         self.configure(bg=BG_DARK)
         self.resizable(True, True)
-        self.sym_engine   = DerivativeEngine()
-        self.num_engine   = NumericalEngine()
+        self.worker       = ComputeWorker(
+            self.after, mode=os.environ.get("SDSOLVER_WORKER", PROCESS),
+            on_loaded=self._on_engines_loaded)
+        self.startup      = {}      # seconds since launch: window, engines
         self._generating  = False
         self._last_result = None
         self._last_log    = []
+        self._last_prof   = None
         self._method_var  = tk.StringVar(value="symbolic")
         self._scheme_var  = tk.StringVar(value="central")
+        self._auto_h_var  = tk.BooleanVar(value=False)
         self._build_fonts()
         self._build_ui()
+        self.protocol("WM_DELETE_WINDOW", self._on_close)
+        self.worker.start()         # SymPy loads in the background while the window paints
+        self.after_idle(self._on_interactive)
+
+    def _on_interactive(self):
+        self.startup["window"] = time.perf_counter() - _LAUNCHED
+        self._show_startup()
+
+    def _on_engines_loaded(self, seconds):
+        self.startup["engines"] = time.perf_counter() - _LAUNCHED
+        self._show_startup()
+
+    def _startup_text(self) -> str:
+        parts = [f"{label} {self.startup[key]:.2f} s"
+                 for key, label in (("window", "window"), ("engines", "engines ready"))
+                 if key in self.startup]
+        return "  ·  ".join(parts)
+
+    def _show_startup(self):
+        """Append the startup times to the initial status line while it is still showing."""
+        if self._generating or not self.status_var.get().startswith("Ready"):
+            return
+        self.status_var.set(f"Ready — enter f(x) and click COMPUTE   ({self._startup_text()})")
+
+    def _on_close(self):
+        self.worker.shutdown()
+        self.destroy()
 
     def _build_fonts(self):
         self.f_title  = font.Font(family="Courier New", size=18, weight="bold")
@@ -102,7 +139,8 @@ class DerivativeApp(tk.Tk):
 
         self._build_left(left)
         self._build_right(right)
-        self.logger = TrailLogger(self.trail_text)
+        cps = float(os.environ.get("SDSOLVER_TRAIL_CPS", CHARS_PER_SEC))
+        self.logger = TrailLogger(self.trail_text, cps=cps, instant=cps <= 0)
 
     def _build_left(self, parent):
         tk.Label(parent, text="INPUT PANEL", font=self.f_label,
@@ -268,13 +306,10 @@ class DerivativeApp(tk.Tk):
 
         trail_container = tk.Frame(parent, bg=BORDER, pady=1, padx=1)
         trail_container.pack(fill="both", expand=True, pady=(6, 4))
-        self.trail_text = scrolledtext.ScrolledText(
+        self.trail_text = TrailView(
             trail_container,
             font=self.f_trail,
             bg=BG_INPUT, fg=TEXT_PRI,
-            insertbackground=ACCENT,
-            relief="flat", bd=0,
-            wrap="word", state="disabled",
             padx=12, pady=10,
         )
         self.trail_text.pack(fill="both", expand=True)
@@ -394,21 +429,9 @@ class DerivativeApp(tk.Tk):
         my = self.winfo_y() + (self.winfo_height() // 2) - (popup.winfo_reqheight() // 2)
         popup.geometry(f"+{mx}+{my}")
 
-    def _get_trail_text(self) -> str:
-        """Return the full plain text currently shown in the trail widget."""
-        self.trail_text.configure(state="normal")
-        content = self.trail_text.get("1.0", "end")
-        self.trail_text.configure(state="disabled")
-        return content
-
-    def _get_trail_log(self) -> list:
-        """Return the raw (text, tag) log list from the logger."""
-        return self.logger.get_log()
-
-    def _export_txt(self):
-        """Save the full trail as a plain-text .txt file."""
-        content = self._get_trail_text().strip()
-        if not content or content == "—":
+    def _export(self, kind: str, writer):
+        """Ask for a path and stream the last trail into it (export.write_txt / write_html)."""
+        if not self._last_log:
             self._show_notify(
                 "warning",
                 "Nothing to Export",
@@ -416,198 +439,51 @@ class DerivativeApp(tk.Tk):
             )
             return
 
+        ext      = kind.lower()
         filepath = filedialog.asksaveasfilename(
             parent=self,
-            title="Export Trail as TXT",
-            defaultextension=".txt",
-            filetypes=[("Text Files", "*.txt"), ("All Files", "*.*")],
-            initialfile=f"sd_solver_trail_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
+            title=f"Export Trail as {kind}",
+            defaultextension=f".{ext}",
+            filetypes=[(f"{kind} Files", f"*.{ext}"), ("All Files", "*.*")],
+            initialfile=f"sd_solver_trail_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{ext}",
         )
         if not filepath:
             return
 
-        header_line = (
-            "SD SOLVER — Solution Trail Export\n"
-            f"Exported : {datetime.now().strftime('%Y-%m-%d  %H:%M:%S')}\n"
-            + "=" * 64 + "\n\n"
-        )
         try:
             with open(filepath, "w", encoding="utf-8") as f:
-                f.write(header_line + content)
+                writer(f, self._last_log)
             self._show_notify(
                 "success",
                 "Export Successful",
-                f"Trail saved to:\n{filepath}",
+                f"Trail saved to:\n{filepath}" + self._export_profile(filepath),
             )
         except Exception as exc:
             self._show_notify("error", "Export Failed", str(exc))
 
+    def _export_txt(self):
+        """Save the full trail as a plain-text .txt file."""
+        self._export("TXT", write_txt)
+
     def _export_html(self):
         """Save the full trail as a styled .html file."""
-        content_check = self._get_trail_text().strip()
-        if not content_check:
-            self._show_notify(
-                "warning",
-                "Nothing to Export",
-                "The solution trail is empty.\nPlease compute a derivative first.",
-            )
-            return
-
-        # Use the stored log from last computation for accurate colour tags.
-        # Fall back to a plain single-entry log if somehow empty.
-        log = self._last_log if self._last_log else [(content_check, "step")]
-
-        filepath = filedialog.asksaveasfilename(
-            parent=self,
-            title="Export Trail as HTML",
-            defaultextension=".html",
-            filetypes=[("HTML Files", "*.html"), ("All Files", "*.*")],
-            initialfile=f"sd_solver_trail_{datetime.now().strftime('%Y%m%d_%H%M%S')}.html",
-        )
-        if not filepath:
-            return
-
-        # Tag → CSS colour mapping (mirrors the tkinter tag colours)
-        TAG_COLORS = {
-            "header":  "#7DF9C2",
-            "section": "#F97DDB",
-            "step":    "#E8EAF0",
-            "answer":  "#FFD166",
-            "verify":  "#7DDBF9",
-            "summary": "#8890A6",
-            "dim":     "#8890A6",
-            "rule":    "#FFD166",
-            "pass":    "#7DF9C2",
-            "fail":    "#FF6B6B",
-            "warn":    "#FFD166",
-        }
-
-        TAG_WEIGHTS = {
-            "header":  "bold",
-            "section": "bold",
-            "answer":  "bold",
-        }
-
-        def escape_html(text: str) -> str:
-            return (
-                text.replace("&", "&amp;")
-                    .replace("<", "&lt;")
-                    .replace(">", "&gt;")
-                    .replace(" ", "&nbsp;")
-                    .replace("\n", "<br>\n")
-            )
-
-        body_html = ""
-        for text, tag in log:
-            color  = TAG_COLORS.get(tag, "#E8EAF0")
-            weight = TAG_WEIGHTS.get(tag, "normal")
-            body_html += (
-                f'<span style="color:{color};font-weight:{weight};">'
-                f'{escape_html(text)}</span>'
-            )
-
-        timestamp = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
-
-        html = f"""<!DOCTYPE html>
-<html lang="en">
-<head>
-  <meta charset="UTF-8" />
-  <meta name="viewport" content="width=device-width, initial-scale=1.0" />
-  <title>SD Solver — Solution Trail</title>
-  <style>
-    @import url('https://fonts.googleapis.com/css2?family=Share+Tech+Mono&display=swap');
-
-    * {{ box-sizing: border-box; margin: 0; padding: 0; }}
-
-    body {{
-      background: #0D0F14;
-      color: #E8EAF0;
-      font-family: 'Share Tech Mono', 'Courier New', monospace;
-      font-size: 13px;
-      line-height: 1.65;
-      padding: 32px 16px;
-    }}
-
-    .wrapper {{
-      max-width: 860px;
-      margin: 0 auto;
-    }}
-
-    /* ── Top banner ── */
-    .banner {{
-      background: #13161E;
-      border-left: 4px solid #7DF9C2;
-      padding: 18px 28px;
-      margin-bottom: 24px;
-      display: flex;
-      justify-content: space-between;
-      align-items: center;
-      flex-wrap: wrap;
-      gap: 8px;
-    }}
-    .banner-title {{
-      color: #7DF9C2;
-      font-size: 18px;
-      font-weight: bold;
-      letter-spacing: 2px;
-    }}
-    .banner-meta {{
-      color: #8890A6;
-      font-size: 11px;
-    }}
-
-    /* ── Trail box ── */
-    .trail-box {{
-      background: #1A1E2A;
-      border: 1px solid #252B3B;
-      border-radius: 4px;
-      padding: 24px 28px;
-      white-space: pre-wrap;
-      word-break: break-word;
-      line-height: 1.7;
-    }}
-
-    /* ── Footer ── */
-    .footer {{
-      margin-top: 20px;
-      color: #8890A6;
-      font-size: 10px;
-      text-align: right;
-      letter-spacing: 1px;
-    }}
-  </style>
-</head>
-<body>
-  <div class="wrapper">
-
-    <div class="banner">
-      <div class="banner-title">∂&nbsp;&nbsp;SD SOLVER — SOLUTION TRAIL</div>
-      <div class="banner-meta">Exported: {timestamp}</div>
-    </div>
-
-    <div class="trail-box">
-{body_html}
-    </div>
-
-    <div class="footer">
-      Generated by SD Solver &nbsp;|&nbsp; {timestamp}
-    </div>
-
-  </div>
-</body>
-</html>
-"""
+        self._export("HTML", write_html)
 
+    def _export_profile(self, filepath: str) -> str:
+        """
+        Copy the last run's profile files (SDSOLVER_PROFILE) next to an export;
+        returns a line for the success message. A failed copy is noted there
+        rather than raised, since the trail itself was already written.
+        """
+        if not self._last_prof:
+            return ""
+        stem = os.path.splitext(filepath)[0]
         try:
-            with open(filepath, "w", encoding="utf-8") as f:
-                f.write(html)
-            self._show_notify(
-                "success",
-                "Export Successful",
-                f"Trail saved to:\n{filepath}",
-            )
-        except Exception as exc:
-            self._show_notify("error", "Export Failed", str(exc))
+            for suffix, src in (("prof", ".prof"), ("alloc", ".alloc.txt")):
+                shutil.copyfile(self._last_prof[suffix], stem + src)
+        except OSError as exc:
+            return f"\nProfile not copied: {exc}"
+        return f"\nProfile: {os.path.basename(stem)}.prof / .alloc.txt"
 
     # ── method selection popup ────────────────────────────────────────────────
     # ── about / help dialog ───────────────────────────────────────────────────
@@ -668,6 +544,7 @@ class DerivativeApp(tk.Tk):
         row("Language", "Python 3.9+")
         row("GUI Toolkit", "tkinter")
         row("Math Engine", "SymPy (symbolic exact)")
+        row("Startup", self._startup_text() or "—")
 
         tk.Frame(scroll_frame, bg=BORDER, height=1).pack(fill="x", padx=24, pady=(4, 0))
 
@@ -704,7 +581,7 @@ class DerivativeApp(tk.Tk):
             ("Order",        "1–10"),
             ("Evaluate",     "Optional value"),
             ("COMPUTE",      "Runs solver"),
-            ("STOP",         "Stops animation"),
+            ("STOP",         "Cancels computation / stops animation"),
             ("CLEAR",        "Resets fields"),
             ("⬇ EXPORT",    "Dropdown beside SOLUTION TRAIL header"),
             ("  → .TXT",    "Save trail as plain text file"),
@@ -741,6 +618,7 @@ class DerivativeApp(tk.Tk):
 
         popup_method = tk.StringVar(value=self._method_var.get())
         popup_scheme = tk.StringVar(value=self._scheme_var.get())
+        popup_auto_h = tk.BooleanVar(value=self._auto_h_var.get())
 
         tk.Frame(popup, bg=ACCENT, height=4).pack(fill="x")
 
@@ -781,7 +659,7 @@ class DerivativeApp(tk.Tk):
                  fg=TEXT_SEC, bg=BG_INPUT, justify="left").pack(anchor="w", pady=(2, 0))
 
         num_card = tk.Frame(content, bg=BG_INPUT, pady=10, padx=14)
-        num_card.pack(fill="x", pady=(0, 6))
+        num_card.pack(fill="x", pady=(0, 10))
 
         rb_num = tk.Radiobutton(
             num_card,
@@ -809,6 +687,8 @@ class DerivativeApp(tk.Tk):
             ("central",  "Central    O(h²) — recommended"),
             ("forward",  "Forward    O(h)"),
             ("backward", "Backward   O(h)"),
+            ("richardson", "Richardson O(h⁶) — h, h/2, h/4 extrapolated"),
+            ("complex-step", "Complex    Im f(x+ih)/h — f′ to full precision"),
         ]:
             tk.Radiobutton(
                 scheme_frame,
@@ -820,6 +700,36 @@ class DerivativeApp(tk.Tk):
                 selectcolor=BG_DARK,
                 relief="flat", cursor="hand2",
             ).pack(anchor="w", pady=1)
+        tk.Checkbutton(
+            scheme_frame,
+            text="     Auto step size (Ridders' extrapolation)",
+            variable=popup_auto_h,
+            font=font.Font(family="Courier New", size=9),
+            fg=ACCENT3, bg=BG_INPUT,
+            activebackground=BG_INPUT, activeforeground=ACCENT3,
+            selectcolor=BG_DARK,
+            relief="flat", cursor="hand2",
+        ).pack(anchor="w", pady=(6, 1))
+
+        ad_card = tk.Frame(content, bg=BG_INPUT, pady=10, padx=14)
+        ad_card.pack(fill="x", pady=(0, 6))
+
+        rb_ad = tk.Radiobutton(
+            ad_card,
+            text="  Automatic  —  Forward-Mode (Taylor) AD",
+            variable=popup_method, value="automatic",
+            font=font.Font(family="Courier New", size=10, weight="bold"),
+            fg=ACCENT2, bg=BG_INPUT,
+            activebackground=BG_INPUT, activeforeground=ACCENT2,
+            selectcolor=BG_DARK,
+            relief="flat", cursor="hand2",
+        )
+        rb_ad.pack(anchor="w")
+        tk.Label(ad_card,
+                 text="     Propagates Taylor series through f — orders 1–10\n"
+                      "     exact to rounding, no symbolic blow-up. Needs x.",
+                 font=font.Font(family="Courier New", size=8),
+                 fg=TEXT_SEC, bg=BG_INPUT, justify="left").pack(anchor="w", pady=(2, 0))
 
         def show_scheme():
             scheme_frame.pack(fill="x", pady=(8, 0))
@@ -829,6 +739,7 @@ class DerivativeApp(tk.Tk):
 
         rb_sym.config(command=hide_scheme)
         rb_num.config(command=show_scheme)
+        rb_ad.config(command=hide_scheme)
 
         if popup_method.get() == "numerical":
             show_scheme()
@@ -843,9 +754,10 @@ class DerivativeApp(tk.Tk):
             chosen_scheme = popup_scheme.get()
             self._method_var.set(chosen_method)
             self._scheme_var.set(chosen_scheme)
-            if chosen_method == "numerical":
+            self._auto_h_var.set(popup_auto_h.get())
+            if chosen_method in ("numerical", "automatic"):
                 self.lbl_point.config(
-                    text="Evaluate at x = (REQUIRED for numerical)", fg=ERR_RED)
+                    text=f"Evaluate at x = (REQUIRED for {chosen_method})", fg=ERR_RED)
             else:
                 self.lbl_point.config(
                     text="Evaluate at x = (optional)", fg=TEXT_SEC)
@@ -954,7 +866,14 @@ class DerivativeApp(tk.Tk):
                                   activebackground="#D96BB8")
 
     def _on_clear_or_stop(self):
-        if self._generating:
+        if self.worker.busy:
+            self.worker.cancel()
+            self._set_generating(False)
+            self.lbl_answer.config(text="—", fg=GOLD)
+            self.lbl_status.config(fg=TEXT_SEC)
+            self.status_var.set("Stopped — computation cancelled")
+            self._show_stop_popup("User pressed Stop during computation.", "manual")
+        elif self._generating:
             self.logger.stop()
         else:
             self._do_clear()
@@ -962,7 +881,8 @@ class DerivativeApp(tk.Tk):
     def _do_clear(self):
         self._clear_all_errors()
         self.logger.clear()
-        self._last_log = []
+        self._last_log  = []
+        self._last_prof = None
         self.lbl_answer.config(text="—", fg=GOLD)
         self.lbl_method_badge.config(text="—", bg=TEXT_SEC)
         self.lbl_status.config(fg=TEXT_SEC)
@@ -1054,20 +974,38 @@ class DerivativeApp(tk.Tk):
 
         if method == "numerical":
             self.lbl_method_badge.config(text="NUMERICAL", bg=ACCENT3, fg=BG_DARK)
+        elif method == "automatic":
+            self.lbl_method_badge.config(text="AUTOMATIC", bg=ACCENT2, fg=BG_DARK)
         else:
             self.lbl_method_badge.config(text="SYMBOLIC", bg=ACCENT, fg=BG_DARK)
 
+        kwargs = {"raw_fx": raw_fx, "raw_var": raw_var,
+                  "raw_order": raw_order, "raw_point": raw_point}
         if method == "numerical":
-            result = self.num_engine.validate_and_compute(
-                raw_fx, raw_var, raw_order, raw_point, scheme=scheme
-            )
-        else:
-            result = self.sym_engine.validate_and_compute(
-                raw_fx, raw_var, raw_order, raw_point
-            )
+            kwargs["scheme"] = scheme
+            if self._auto_h_var.get():
+                kwargs["h"] = "auto"
+        if os.environ.get("SDSOLVER_PROFILE"):
+            kwargs["profile"] = os.path.join(tempfile.gettempdir(),
+                                             f"sdsolver-profile-{os.getpid()}")
+
+        self._set_generating(True)
+        self.worker.submit(
+            method, kwargs,
+            on_done=lambda result: self._on_result(method, result),
+            on_error=self._on_compute_error,
+        )
 
+    def _on_compute_error(self, message: str):
+        self._set_generating(False)
+        self.lbl_answer.config(text="Error — see status", fg=ERR_RED)
+        self.lbl_status.config(fg=ERR_RED)
+        self.status_var.set(f"⚠  Computation failed  —  {message[:120]}")
+
+    def _on_result(self, method: str, result: dict):
         full_log = result.get("log", [])
-        self._last_log = full_log          # keep for HTML export
+        self._last_log  = full_log         # keep for export
+        self._last_prof = result.get("profile")
 
         if not result["ok"]:
             self.lbl_answer.config(text="Error — see trail", fg=ERR_RED)
@@ -1084,14 +1022,13 @@ class DerivativeApp(tk.Tk):
                     self._set_field_error(self.entry_point, self.err_point, msg)
 
             reason = "  \n".join(result["field_errors"].values())
+            self._set_generating(False)
             self.logger.animate(
-                full_log, delay_ms=38,
+                full_log,
                 on_done=lambda _: self._show_stop_popup(reason, "validation")
             )
             return
 
-        self._set_generating(True)
-
         def on_animation_done(outcome):
             self._set_generating(False)
             if outcome == "stopped":
@@ -1107,7 +1044,7 @@ class DerivativeApp(tk.Tk):
                 )
                 self._show_stop_popup("Computation Complete", "done")
 
-        self.logger.animate(full_log, delay_ms=38, on_done=on_animation_done)
+        self.logger.animate(full_log, on_done=on_animation_done)
 
     def _on_clear(self):
         if not self._generating:
@@ -1,6 +1,10 @@
 import sys
+import time
+import contextlib
 from datetime import datetime
 
+import numpy as np
+
 try:
     import sympy
     from sympy import symbols, sympify, diff, simplify, SympifyError
@@ -10,34 +14,68 @@ except ImportError:
     SYMPY_OK = False
     SYMPY_VERSION = "NOT INSTALLED"
 
-from trail_logger import DIV, HDIV, SECTION_ICONS
+from trail import Trail, NullTrail, Step, Timings
+from stages import Budget, finish_timings
+from profiling import Profile, header as profile_header
+from context import get_context, parse_context
+from lambda_cache import get_lambda
+import stencils
 
 ORDER_MIN = 1
 ORDER_MAX = 10
 H_DEFAULT = 1e-5
+H_AUTO    = "auto"     # pass as h to pick the step adaptively (Ridders)
+BATCH_CHUNK = 1 << 20      # max stencil nodes evaluated per vectorised call
+MODES = ("full", "answer")
+SCHEMES = stencils.LAYOUTS + ("richardson", "complex-step")
+
+# Ridders' adaptive step: shrink factor per column, give-up factor, target, columns
+RIDDERS_CON  = 1.4
+RIDDERS_SAFE = 2.0
+RIDDERS_TOL  = 1e-12
+RIDDERS_MAX  = 12
+RIDDERS_POOR = 1e-6     # error estimate that triggers a restart from a smaller step
+RIDDERS_DRIFT = 1e-3    # … or, relative to the estimate, that says the columns disagree
+RIDDERS_NOISE = 100     # … unless below round-off, in units of ε·|f| / hⁿ
+RIDDERS_H_MAX = 1.0     # largest first step: f may vary on a unit scale at any x
+
+# "richardson" scheme: the central stencil at h / d for each divisor d, extrapolated
+RICHARDSON_LEVELS = (1, 2, 4)
+
+# "complex-step" scheme: f'(x) ≈ Im f(x + ih) / h, no subtraction so h can be tiny
+COMPLEX_STEP_H     = 1e-20
+COMPLEX_STEP_SLOPE = 1e12   # |Im f(x+ih)| above slope·h·max(1, |f|): f is not real at x
+COMPLEX_STEP_ULPS  = 64     # |Re f(x+ih) − f(x)| above ulps·ε·max(1, |f|): a branch point
+COMPLEX_STEP_AGREE = 0.5    # relative gap to central difference that rules the step out
+# SymPy functions that lambdify to something non-analytic (|z|, branches, rounding)
+NON_ANALYTIC = ("Abs", "sign", "floor", "ceiling", "frac", "Piecewise", "Max", "Min",
+                "re", "im", "arg", "conjugate", "Heaviside", "Mod")
+
+_SCHEME_NAMES = {"richardson": "Richardson Extrapolation", "complex-step": "Complex Step"}
 
 
-def _numerical_verify(f, x0, order, scheme, h, approx):
+def _numerical_verify(f, x0, order, scheme, h, approx, budget=None):
     """
     Verification for numerical engine:
       1. Richardson extrapolation / h-refinement (h, h/2, h/4, h/10)
       2. Symmetric cross-check: compare forward vs backward vs central at x0
+         (complex step: against central difference at H_DEFAULT)
       3. 5 test points with h vs h/10 residuals
 
+    Time spent in each strategy is added to `budget` (a stages.Budget).
     Returns list of (label, value, status).
     """
     results = []
+    budget  = budget or Budget()
+    t_stage = time.perf_counter()
 
     # ── Richardson / h-refinement ─────────────────────────────────────────────
     prev = approx
     consistent = True
+    D = _verify_difference(f, order, scheme)
     for divisor in [2, 4, 10]:
         try:
-            h_new   = h / divisor
-            coeffs  = [(-1) ** (order - k) * _comb(order, k) for k in range(order + 1)]
-            pts     = [x0 + (k - order / 2) * h_new for k in range(order + 1)]
-            fvals   = [f(p) for p in pts]
-            val     = sum(c * fv for c, fv in zip(coeffs, fvals)) / (h_new ** order)
+            val     = D(x0, h / divisor)
             delta   = abs(val - prev)
             ok      = delta < 1e-3
             if not ok:
@@ -49,8 +87,20 @@ def _numerical_verify(f, x0, order, scheme, h, approx):
         except Exception as exc:
             results.append((f"h/{divisor} refinement", f"error: {exc}", "warn"))
 
+    budget.add("verify_refinement", time.perf_counter() - t_stage)
+    t_stage = time.perf_counter()
+
     # ── Scheme cross-check ────────────────────────────────────────────────────
-    if order == 1:
+    if scheme == "complex-step":
+        try:
+            cen   = (f(x0 + H_DEFAULT) - f(x0 - H_DEFAULT)) / (2 * H_DEFAULT)
+            delta = abs(approx - cen)
+            results.append(("Complex vs Central  Δ", f"{delta:.3e}",
+                             "pass" if delta < 1e-3 else "warn"))
+            consistent = consistent and delta < 1e-3
+        except Exception:
+            pass
+    elif order == 1 and scheme != "richardson":   # one-sided O(h) at its coarse h says nothing
         try:
             fp = f(x0 + h);  fm = f(x0 - h);  f0 = f(x0)
             fwd  = (fp - f0) / h
@@ -67,16 +117,16 @@ def _numerical_verify(f, x0, order, scheme, h, approx):
         except Exception:
             pass
 
+    budget.add("verify_cross_check", time.perf_counter() - t_stage)
+    t_stage = time.perf_counter()
+
     # ── 5-point spot check: h vs h/10 ────────────────────────────────────────
     import math
     test_points = [x0 - 1.0, x0 - 0.5, x0, x0 + 0.5, x0 + 1.0]
     for xv in test_points:
         try:
-            coeffs  = [(-1) ** (order - k) * _comb(order, k) for k in range(order + 1)]
-            pts_h   = [xv + (k - order / 2) * h       for k in range(order + 1)]
-            pts_h10 = [xv + (k - order / 2) * (h / 10) for k in range(order + 1)]
-            val_h   = sum(c * f(p) for c, p in zip(coeffs, pts_h))   / (h       ** order)
-            val_h10 = sum(c * f(p) for c, p in zip(coeffs, pts_h10)) / ((h / 10) ** order)
+            val_h   = D(xv, h)
+            val_h10 = D(xv, h / 10)
             delta   = abs(val_h - val_h10)
             ok      = delta < 1e-3
             if not ok:
@@ -87,15 +137,389 @@ def _numerical_verify(f, x0, order, scheme, h, approx):
         except Exception:
             results.append((f"Spot x={xv:.2g}", "eval error", "warn"))
 
+    budget.add("verify_spot_checks", time.perf_counter() - t_stage)
+
     overall = "PASS — approximation is stable ✔" if consistent \
               else "WARN — result may be sensitive to h ⚠"
     results.append(("Overall Status", overall, "pass" if consistent else "warn"))
     return results
 
 
-def _comb(n, k):
-    import math
-    return math.comb(n, k)
+def _verify_difference(f, order, scheme):
+    """
+    D(x, h), the estimate the h-refinement and spot checks re-evaluate: the
+    complex step itself, the extrapolated stencil for "richardson" (its step
+    is far too coarse for the plain one), else the compact central stencil.
+    """
+    if scheme == "complex-step":
+        return lambda x, h: _complex_step(f, x, h)
+    if scheme == "richardson":
+        offsets, coeffs = _stencil(order, scheme)
+    else:
+        offsets, coeffs = stencils.compact(order)
+
+    def D(x, h):
+        return sum(c * f(x + o * h) for o, c in zip(offsets, coeffs)) / (h ** order)
+    return D
+
+
+def _complex_step(f, x, h):
+    """
+    Im f(x + ih) / h; ValueError when f is not real and finite at x or
+    along the step, when Re f(x + ih) differs from f(x) by more than
+    round-off (an analytic f moves it by O(h²), so x is a branch point, as
+    for sqrt at 0), or when the result disagrees wildly with the central
+    difference at H_DEFAULT.
+    """
+    try:
+        with np.errstate(all="ignore"):
+            value = complex(f(complex(x, h)))
+    except Exception as exc:
+        raise ValueError(f"f cannot take a complex argument ({type(exc).__name__})")
+    if not (np.isfinite(value.real) and np.isfinite(value.imag)):
+        raise ValueError(f"f({x:g} + {h:g}i) is not finite")
+    if abs(value.imag) > COMPLEX_STEP_SLOPE * h * max(1.0, abs(value.real)):
+        raise ValueError(f"f is not real at x = {x:g}")
+    f0 = _eval_vectorised(f, np.asarray(float(x)))
+    if not np.isfinite(f0):
+        raise ValueError(f"f is not real and finite at x = {x:g}")
+    if abs(value.real - f0) > COMPLEX_STEP_ULPS * np.finfo(float).eps * max(1.0, abs(f0)):
+        raise ValueError(f"f is not analytic at x = {x:g} (Re f(x + ih) ≠ f(x))")
+    approx = value.imag / h
+    cen    = _eval_vectorised(f, x + np.array([H_DEFAULT, -H_DEFAULT])) @ [0.5, -0.5] / H_DEFAULT
+    if abs(approx - cen) > COMPLEX_STEP_AGREE * max(1.0, abs(approx), abs(cen)):
+        raise ValueError(f"Im f(x + ih)/h = {approx:.6g} disagrees with central difference "
+                         f"{cen:.6g}")
+    return approx
+
+
+def _complex_unsafe(expr, order):
+    """Why the complex step cannot be used for this f and order, or None."""
+    if order != 1:
+        return f"first derivatives only, n = {order}"
+    used = sorted({type(node).__name__ for node in sympy.preorder_traversal(expr)}
+                  & set(NON_ANALYTIC))
+    if used:
+        return f"{', '.join(used)} is not analytic"
+    return None
+
+
+def _stencil(order, scheme, accuracy=None):
+    """
+    Finite-difference stencil used by _finite_difference, as
+    (offsets, coeffs) with offsets in units of h:
+        f⁽ⁿ⁾(x) ≈ Σ coeffs[k] · f(x + offsets[k]·h) / hⁿ
+    accuracy=None keeps the fewest nodes: f(x ± h) for n=1 central, the
+    compact n+1-node central stencil above that, O(h) one-sided ones.
+    """
+    if scheme == "richardson":
+        return _richardson_stencil(order)
+    if accuracy is None and scheme == "central" and order > 1:
+        return stencils.compact(order)
+    return stencils.stencil(order, accuracy, scheme)
+
+
+def _richardson_table(values):
+    """Neville tableau over D(h), D(h/2), D(h/4), … (error in h², h⁴, …); a list of columns."""
+    table = [list(values)]
+    while len(table[-1]) > 1:
+        fac  = 4 ** len(table)
+        prev = table[-1]
+        table.append([(fac * b - a) / (fac - 1) for a, b in zip(prev, prev[1:])])
+    return table
+
+
+def _richardson_step(order, x=0.0):
+    """
+    Default h for the "richardson" scheme: where the O(h⁶) truncation of the
+    extrapolated value meets round-off (∝ ε/hⁿ at the finest step h/4).
+    The nodes x + k·h carry an error of about ε·|x|, so ε is taken relative
+    to max(1, |x|). x may be an array (one step per point).
+    """
+    eps = np.finfo(float).eps * np.maximum(1.0, np.abs(x))
+    h   = RICHARDSON_LEVELS[-1] * eps ** (1 / (order + 6))
+    return float(h) if np.ndim(h) == 0 else h
+
+
+def _richardson_fit(f, xs, order, h):
+    """
+    Shrink the default "richardson" step wherever f is not finite on the
+    merged stencil (the wide h stencil crossed a singularity or left the
+    domain), as _ridders does for its first step. Halving keeps the step as
+    large as the domain allows; 20 halvings reach h / 10⁶.
+    """
+    offsets, _ = _richardson_stencil(order)
+    xs         = np.asarray(xs, dtype=float)
+    hh         = np.broadcast_to(np.asarray(h, dtype=float), xs.shape).copy()
+    for _ in range(20):
+        nodes = xs[..., None] + offsets * hh[..., None]
+        bad   = ~np.isfinite(_eval_vectorised(f, nodes)).all(axis=-1)
+        if not bad.any():
+            break
+        hh = np.where(bad, hh / 2, hh)
+    return float(hh) if hh.ndim == 0 else hh
+
+
+def _richardson_stencil(order):
+    """
+    The "richardson" scheme as one stencil (offsets in units of h): the
+    tableau is linear in the D(h / d), so its weights fold into the grid
+    stencil's coefficients and coinciding nodes are merged.
+    """
+    offsets, coeffs = stencils.stencil(order)
+    finest  = RICHARDSON_LEVELS[-1]
+    weights = _richardson_table(np.eye(len(RICHARDSON_LEVELS)))[-1][0]
+    merged  = {}
+    for div, weight in zip(RICHARDSON_LEVELS, weights):
+        for o, c in zip(offsets, coeffs):
+            node         = int(o) * (finest // div)
+            merged[node] = merged.get(node, 0.0) + weight * c * div ** order
+    nodes = sorted(n for n, c in merged.items() if c != 0)
+    return np.array(nodes, dtype=float) / finest, np.array([merged[n] for n in nodes])
+
+
+def _ridders_start(xs, order):
+    """
+    Initial step for Ridders' tableau: well above the h that balances
+    truncation (∝ h²) against round-off (∝ ε/hⁿ), i.e. ε^(1/(n+2)), since the
+    extrapolation removes truncation error but cannot undo cancellation.
+
+    It grows with |x| up to RIDDERS_H_MAX (a step of 10⁷ at x = 10⁸ samples
+    sin(x) across a million periods), but stays at least √ε·|x| so that
+    x ± h still resolves h to about √ε where floats are sparse.
+    """
+    eps   = np.finfo(float).eps
+    h     = max(0.1, 4 * eps ** (1 / (order + 2)))
+    scale = np.maximum(1.0, np.abs(xs))
+    return np.maximum(np.minimum(h * scale, RIDDERS_H_MAX), np.sqrt(eps) * scale)
+
+
+def _ridders(f, xs, order, scheme, h0=None, restarts=3, accuracy=None):
+    """
+    Ridders' method over an array of points.
+
+    The stencil is evaluated at h0, h0/CON, h0/CON², … and every new value is
+    extrapolated towards h → 0 with a Neville tableau (in powers of h² for
+    symmetric stencils, of h for one-sided ones). For each point the entry
+    with the smallest error estimate is kept; a point stops once its error
+    is below RIDDERS_TOL (relative, absolute below 1) or the higher-order
+    columns start to diverge, so smooth functions finish in a few columns.
+    Points whose estimate stays above RIDDERS_POOR (typically a singularity
+    within the first stencils), or above RIDDERS_DRIFT of the value itself
+    and above round-off (the tableau entries disagree, e.g. a first step
+    far too large for f), are redone from an 8× smaller first step, up to
+    `restarts` times, keeping the better estimate.
+
+    Returns (values, steps, errors, evaluations, columns, adrift): the h
+    each value came from, the error estimates, f-evaluations per point, the
+    (h, D(h)) of every column tried, and where the entries still disagree.
+    """
+    xs              = np.asarray(xs, dtype=float)
+    offsets, coeffs = _stencil(order, scheme, accuracy)
+    fac0            = RIDDERS_CON ** 2 if np.allclose(offsets, -offsets[::-1]) else RIDDERS_CON
+    hh              = (np.broadcast_to(np.asarray(h0, dtype=float), xs.shape).copy()
+                       if h0 is not None else _ridders_start(xs, order))
+
+    fscale          = np.zeros(xs.shape)
+
+    def D(h):
+        nonlocal fscale
+        fvals  = _eval_vectorised(f, xs[..., None] + offsets * h[..., None])
+        fscale = np.fmax(fscale, np.fmax.reduce(np.abs(fvals), axis=-1))
+        return fvals @ coeffs / h ** order
+
+    first = D(hh)
+    for _ in range(6):          # the first stencil crossed a singularity: start smaller
+        bad = ~np.isfinite(first)
+        if not bad.any():
+            break
+        hh    = np.where(bad, hh / 10, hh)
+        first = np.where(bad, D(hh), first)
+
+    prev    = [first]
+    columns = [(hh, first)]
+    best    = first.copy()
+    best_h  = hh.copy()
+    err     = np.full(xs.shape, np.inf)
+    done    = np.zeros(xs.shape, dtype=bool)
+    evals   = len(offsets)
+    for i in range(1, RIDDERS_MAX):
+        hh     = hh / RIDDERS_CON
+        row    = [D(hh)]
+        evals += len(offsets)
+        columns.append((hh, row[0]))
+        fac = fac0
+        with np.errstate(all="ignore"):
+            for j in range(1, i + 1):
+                row.append((row[j - 1] * fac - prev[j - 1]) / (fac - 1))
+                fac   *= fac0
+                errt   = np.maximum(np.abs(row[j] - row[j - 1]), np.abs(row[j] - prev[j - 1]))
+                better = (errt <= err) & ~done
+                err    = np.where(better, errt, err)
+                best   = np.where(better, row[j], best)
+                best_h = np.where(better, hh, best_h)
+            done |= np.abs(row[i] - prev[i - 1]) >= RIDDERS_SAFE * err
+            done |= err <= RIDDERS_TOL * np.maximum(1.0, np.abs(best))
+        prev = row
+        if done.all():
+            break
+
+    with np.errstate(all="ignore"):
+        noise   = RIDDERS_NOISE * np.finfo(float).eps * fscale / best_h ** order
+        adrift  = ~(err <= np.maximum(RIDDERS_DRIFT * np.abs(best), noise))
+    poor = adrift | ~(err <= RIDDERS_POOR * np.maximum(1.0, np.abs(best)))
+    if restarts and poor.any():
+        h_retry = columns[0][0][poor] / 8
+        b2, h2, e2, ev2, _, a2 = _ridders(f, xs[poor], order, scheme, h_retry, restarts - 1,
+                                          accuracy)
+        take         = ~(e2 >= err[poor])
+        idx          = np.flatnonzero(poor)[take]
+        best.flat[idx], best_h.flat[idx], err.flat[idx] = b2[take], h2[take], e2[take]
+        adrift.flat[idx] = a2[take]
+        evals       += ev2
+    return best, best_h, err, evals, columns, adrift
+
+
+def _eval_vectorised(f, xs):
+    """f over an ndarray in one call; element-wise fallback for non-NumPy functions."""
+    with np.errstate(all="ignore"):
+        try:
+            out = np.asarray(f(xs))
+        except Exception:
+            out = np.vectorize(f, otypes=[complex])(xs)
+    out = np.broadcast_to(out, xs.shape)
+    if np.iscomplexobj(out):
+        out = np.where(out.imag == 0, out.real, np.nan)
+    return np.asarray(out, dtype=float)
+
+
+def _scheme_name(scheme):
+    return _SCHEME_NAMES.get(scheme, scheme.capitalize() + " Difference")
+
+
+def _check(num, label, status, detail=""):
+    return {"num": num, "label": label, "status": status, "detail": detail}
+
+
+def _validate(raw_fx, raw_var, raw_order, raw_point, result, clock, method="numerical"):
+    """
+    The six input checks of the point-wise engines (`method` names the
+    engine in the point check). Appends to result["validation_steps"] and
+    ["field_errors"], sets ["ok"], ["var"], ["order"] and ["raw_point"];
+    returns the evaluation point as a float, or None.
+    """
+    vsteps    = result["validation_steps"]
+    point_val = None
+    t_valid   = time.perf_counter()
+    if not raw_fx:
+        vsteps.append(_check(1, "f(x) field — required, not empty",
+                             "FAIL", "f(x) cannot be empty."))
+        result["field_errors"]["fx"] = "f(x) cannot be empty."
+        result["ok"] = False
+        for n, lbl in [
+            (2, "f(x) — SymPy parse check"),
+            (3, "Variable — single alpha char"),
+            (4, "Derivative order — integer"),
+            (5, "Derivative order — range 1–10"),
+            (6, f"Evaluate at x — required for {method}"),
+        ]:
+            vsteps.append(_check(n, lbl, "SKIP", "Skipped (empty input)"))
+    else:
+        vsteps.append(_check(1, "f(x) field — required, not empty", "PASS"))
+
+        sym_expr = None
+        if not SYMPY_OK:
+            vsteps.append(_check(2, "f(x) — SymPy parse check", "FAIL",
+                                 "SymPy not installed."))
+            result["field_errors"]["fx"] = "SymPy not installed."
+            result["ok"] = False
+        else:
+            try:
+                with clock.measure("parse"):
+                    sym_expr = parse_context(raw_fx, raw_var if raw_var else "x").unevaluated
+                vsteps.append(_check(2, "f(x) — SymPy parse check", "PASS",
+                                     f"Parsed OK → {sym_expr}"))
+            except (SympifyError, TypeError, SyntaxError, ValueError) as exc:
+                short = str(exc).split("\n")[0][:80]
+                vsteps.append(_check(2, "f(x) — SymPy parse check", "FAIL",
+                                     f"Cannot parse. {short}"))
+                result["field_errors"]["fx"] = "Not a valid math expression."
+                result["ok"] = False
+
+        if not result["ok"]:
+            for n, lbl in [
+                (3, "Variable — single alpha char"),
+                (4, "Derivative order — integer"),
+                (5, "Derivative order — range 1–10"),
+                (6, f"Evaluate at x — required for {method}"),
+            ]:
+                vsteps.append(_check(n, lbl, "SKIP", "Skipped (parse failed)"))
+        else:
+            var_str = raw_var if raw_var else "x"
+            if not (len(var_str) == 1 and var_str.isalpha()):
+                vsteps.append(_check(3, "Variable — single alpha char", "FAIL",
+                                     f"'{var_str}' is not a single letter."))
+                result["field_errors"]["var"] = "Must be a single letter, e.g. x, y, t."
+                result["ok"] = False
+            else:
+                vsteps.append(_check(3, "Variable — single alpha char", "PASS",
+                                     f"'{var_str}' is valid."))
+                result["var"] = var_str
+
+            order_int = None
+            order_str = raw_order if raw_order else "1"
+            try:
+                order_int = int(order_str)
+                if order_int != float(order_str):
+                    raise ValueError
+                vsteps.append(_check(4, "Derivative order — integer", "PASS",
+                                     f"Order = {order_int}"))
+                result["order"] = order_int
+            except (ValueError, TypeError):
+                vsteps.append(_check(4, "Derivative order — integer", "FAIL",
+                                     f"'{order_str}' is not an integer."))
+                result["field_errors"]["order"] = "Must be a whole number (1–10)."
+                result["ok"] = False
+
+            if order_int is not None:
+                if ORDER_MIN <= order_int <= ORDER_MAX:
+                    vsteps.append(_check(
+                        5, f"Derivative order — range {ORDER_MIN}–{ORDER_MAX}", "PASS",
+                        f"{order_int} is within [{ORDER_MIN}, {ORDER_MAX}]."))
+                else:
+                    vsteps.append(_check(
+                        5, f"Derivative order — range {ORDER_MIN}–{ORDER_MAX}", "FAIL",
+                        f"{order_int} is out of range."))
+                    result["field_errors"]["order"] = (
+                        f"Order must be between {ORDER_MIN} and {ORDER_MAX}.")
+                    result["ok"] = False
+            else:
+                vsteps.append(_check(
+                    5, f"Derivative order — range {ORDER_MIN}–{ORDER_MAX}",
+                    "SKIP", "Skipped (invalid order)"))
+
+            if not raw_point:
+                vsteps.append(_check(6, f"Evaluate at x — required for {method}",
+                                     "FAIL",
+                                     f"{method.capitalize()} method needs a point x = value."))
+                result["field_errors"]["point"] = (
+                    f"Required for {method.capitalize()} method. Enter a number.")
+                result["ok"] = False
+            else:
+                try:
+                    point_val = float(raw_point)
+                    vsteps.append(_check(6, f"Evaluate at x — required for {method}",
+                                         "PASS", f"x = {point_val}"))
+                    result["raw_point"] = raw_point
+                except ValueError:
+                    vsteps.append(_check(6, f"Evaluate at x — required for {method}",
+                                         "FAIL",
+                                         f"'{raw_point}' is not a number."))
+                    result["field_errors"]["point"] = "Must be a number."
+                    result["ok"] = False
+
+    clock.add("validation", time.perf_counter() - t_valid)
+    return point_val
 
 
 class NumericalEngine:
@@ -116,31 +540,89 @@ class NumericalEngine:
         raw_order: str,
         raw_point: str,
         scheme:    str = "central",
-        h:         float = H_DEFAULT,
+        h:         float = None,
+        trail:     bool = True,
+        mode:      str = "full",
+        show_timings: bool = False,
+        profile:   str = None,
+        accuracy:  int = None,
     ) -> dict:
+        """
+        result["log"] is a trail.Trail rendered on first read; trail=False
+        leaves it empty. mode="answer" also skips the verification stencils
+        and returns as soon as the finite difference is known.
+
+        h=None uses the scheme's default step: H_DEFAULT, or for "richardson"
+        one scaled to the order and to max(1, |x|) (_richardson_step), since
+        the extrapolation needs a step well above where round-off takes over.
+        That step is shrunk where f is not finite on the stencil; if it still
+        is, the result has ok=False and a field error on the point.
+
+        h=H_AUTO ("auto") picks the step with Ridders' extrapolation;
+        result["h"] is then the step that was used and
+        result["error_estimate"] the tableau's error estimate;
+        result["unreliable"] is True when the extrapolations still disagree
+        after restarting from smaller steps.
+
+        accuracy=p uses the O(hᵖ) central / forward / backward stencil from
+        the table in stencils.py (central rounds p up to even); None keeps
+        the fewest-node stencil. The "richardson" scheme ignores it.
+
+        scheme="complex-step" takes Im f(x + ih) / h with h = COMPLEX_STEP_H:
+        one evaluation and no cancellation, for first derivatives of
+        analytic f. Otherwise (n > 1, Abs / Piecewise / ..., f not real or
+        finite at x or along the step, x a branch point, a result far from
+        the central difference) it falls back to central difference at
+        H_DEFAULT and result["fallback"] says why. h="auto" is ignored.
+
+        result["timings"] maps each stage (validation, parse, compile,
+        finite_difference, verify_refinement, verify_cross_check,
+        verify_spot_checks, total) to milliseconds; show_timings=True also
+        lists them in SUMMARY.
+
+        profile="path/stem" writes a cProfile dump and an allocation report
+        (profiling.py); result["profile"] holds their paths.
+        """
+        if mode not in MODES:
+            raise ValueError(f"mode must be one of {MODES}, got {mode!r}")
+        if scheme not in SCHEMES:
+            raise ValueError(f"scheme must be one of {SCHEMES}, got {scheme!r}")
+        if accuracy is not None and accuracy < 1:
+            raise ValueError(f"accuracy must be at least 1, got {accuracy}")
+        if scheme in ("richardson", "complex-step"):
+            accuracy = None
+        if scheme == "complex-step" and h == H_AUTO:
+            h = None            # nothing to search for: the step has no cancellation
+        clock    = Budget()
+        profiler = Profile(profile) if profile else None
+        started  = time.perf_counter()
+        with profiler or contextlib.nullcontext():
+            result = self._compute(raw_fx, raw_var, raw_order, raw_point, scheme, h,
+                                   accuracy, clock, trail, mode, show_timings)
+        finish_timings("numerical", result, clock, started)
+        if profiler:
+            result["profile"] = profiler.save(profile_header("numerical", result))
+        return result
+
+    def _compute(self, raw_fx, raw_var, raw_order, raw_point, scheme, h,
+                 accuracy, clock, trail, mode, show_timings) -> dict:
         import re as _re
 
         raw_fx = raw_fx.replace("^", "**")
         raw_fx = _re.sub(r'(\d)([a-zA-Z])', r'\1*\2', raw_fx)
         raw_fx = _re.sub(r'\)\s*\(', r')*(', raw_fx)
+        if h is None and scheme != "richardson":
+            h = COMPLEX_STEP_H if scheme == "complex-step" else H_DEFAULT
 
         result = self._base_result(raw_fx, raw_var, raw_order, raw_point, scheme, h)
-        vsteps = result["validation_steps"]
-        log    = []
-
-        def w(text, tag="step"):
-            log.append((text, tag))
-
-        def section(name):
-            icon = SECTION_ICONS.get(name, "◆")
-            w(f"{icon} {name}\n", "section")
-            w(DIV + "\n", "dim")
-
-        def kv(key, value, tag="step"):
-            w(f"   {key:<30}:  {value}\n", tag)
-
-        def blank():
-            w("\n", "dim")
+        result["accuracy"] = accuracy
+        result["mode"] = mode
+        log    = (Trail(kv_width=30, outcome_width=34) if trail and mode == "full"
+                  else NullTrail())
+        w       = log.text
+        section = log.section
+        kv      = log.kv
+        blank   = log.blank
 
         # ── header ────────────────────────────────────────────────────────────
         w("╔" + "═" * 62 + "╗\n", "header")
@@ -158,133 +640,23 @@ class NumericalEngine:
         kv("Variable",        raw_var   if raw_var   else "(empty)")
         kv("Order (n)",       raw_order if raw_order else "(empty)")
         kv("Evaluate at",     raw_point if raw_point else "⚠  Required for numerical")
-        kv("Scheme",          scheme.capitalize() + " Difference")
-        kv("Step size (h)",   str(h))
+        kv("Scheme",          _scheme_name(scheme))
+        kv("Step size (h)",   "scaled to the order" if h is None else h)
+        if accuracy is not None:
+            kv("Accuracy",    f"O(h^{stencils.accuracy_of(accuracy, scheme)})")
         blank()
 
         # ── validation ────────────────────────────────────────────────────────
-        if not raw_fx:
-            vsteps.append(self._step(1, "f(x) field — required, not empty",
-                                     "FAIL", "f(x) cannot be empty."))
-            result["field_errors"]["fx"] = "f(x) cannot be empty."
-            result["ok"] = False
-            for n, lbl in [
-                (2, "f(x) — SymPy parse check"),
-                (3, "Variable — single alpha char"),
-                (4, "Derivative order — integer"),
-                (5, "Derivative order — range 1–10"),
-                (6, "Evaluate at x — required for numerical"),
-            ]:
-                vsteps.append(self._step(n, lbl, "SKIP", "Skipped (empty input)"))
-        else:
-            vsteps.append(self._step(1, "f(x) field — required, not empty", "PASS"))
-
-            sym_expr = None
-            if not SYMPY_OK:
-                vsteps.append(self._step(2, "f(x) — SymPy parse check", "FAIL",
-                                         "SymPy not installed."))
-                result["field_errors"]["fx"] = "SymPy not installed."
-                result["ok"] = False
-            else:
-                try:
-                    sym_expr = sympify(raw_fx, evaluate=False)
-                    vsteps.append(self._step(2, "f(x) — SymPy parse check", "PASS",
-                                             f"Parsed OK → {sym_expr}"))
-                except (SympifyError, TypeError, SyntaxError, ValueError) as exc:
-                    short = str(exc).split("\n")[0][:80]
-                    vsteps.append(self._step(2, "f(x) — SymPy parse check", "FAIL",
-                                             f"Cannot parse. {short}"))
-                    result["field_errors"]["fx"] = "Not a valid math expression."
-                    result["ok"] = False
-
-            if not result["ok"]:
-                for n, lbl in [
-                    (3, "Variable — single alpha char"),
-                    (4, "Derivative order — integer"),
-                    (5, "Derivative order — range 1–10"),
-                    (6, "Evaluate at x — required for numerical"),
-                ]:
-                    vsteps.append(self._step(n, lbl, "SKIP", "Skipped (parse failed)"))
-            else:
-                var_str = raw_var if raw_var else "x"
-                if not (len(var_str) == 1 and var_str.isalpha()):
-                    vsteps.append(self._step(3, "Variable — single alpha char", "FAIL",
-                                             f"'{var_str}' is not a single letter."))
-                    result["field_errors"]["var"] = "Must be a single letter, e.g. x, y, t."
-                    result["ok"] = False
-                else:
-                    vsteps.append(self._step(3, "Variable — single alpha char", "PASS",
-                                             f"'{var_str}' is valid."))
-                    result["var"] = var_str
-
-                order_int = None
-                order_str = raw_order if raw_order else "1"
-                try:
-                    order_int = int(order_str)
-                    if order_int != float(order_str):
-                        raise ValueError
-                    vsteps.append(self._step(4, "Derivative order — integer", "PASS",
-                                             f"Order = {order_int}"))
-                    result["order"] = order_int
-                except (ValueError, TypeError):
-                    vsteps.append(self._step(4, "Derivative order — integer", "FAIL",
-                                             f"'{order_str}' is not an integer."))
-                    result["field_errors"]["order"] = "Must be a whole number (1–10)."
-                    result["ok"] = False
-
-                if order_int is not None:
-                    if ORDER_MIN <= order_int <= ORDER_MAX:
-                        vsteps.append(self._step(
-                            5, f"Derivative order — range {ORDER_MIN}–{ORDER_MAX}", "PASS",
-                            f"{order_int} is within [{ORDER_MIN}, {ORDER_MAX}]."))
-                    else:
-                        vsteps.append(self._step(
-                            5, f"Derivative order — range {ORDER_MIN}–{ORDER_MAX}", "FAIL",
-                            f"{order_int} is out of range."))
-                        result["field_errors"]["order"] = (
-                            f"Order must be between {ORDER_MIN} and {ORDER_MAX}.")
-                        result["ok"] = False
-                else:
-                    vsteps.append(self._step(
-                        5, f"Derivative order — range {ORDER_MIN}–{ORDER_MAX}",
-                        "SKIP", "Skipped (invalid order)"))
-
-                point_val = None
-                if not raw_point:
-                    vsteps.append(self._step(6, "Evaluate at x — required for numerical",
-                                             "FAIL",
-                                             "Numerical method needs a point x = value."))
-                    result["field_errors"]["point"] = (
-                        "Required for Numerical method. Enter a number.")
-                    result["ok"] = False
-                else:
-                    try:
-                        point_val = float(raw_point)
-                        vsteps.append(self._step(6, "Evaluate at x — required for numerical",
-                                                 "PASS", f"x = {point_val}"))
-                        result["raw_point"] = raw_point
-                    except ValueError:
-                        vsteps.append(self._step(6, "Evaluate at x — required for numerical",
-                                                 "FAIL",
-                                                 f"'{raw_point}' is not a number."))
-                        result["field_errors"]["point"] = "Must be a number."
-                        result["ok"] = False
+        point_val = _validate(raw_fx, raw_var, raw_order, raw_point, result, clock)
 
         # ── write validation into log ─────────────────────────────────────────
-        w("⓪ VALIDATION\n", "section")
-        w(DIV + "\n", "dim")
-        for check in vsteps:
-            icon = {"PASS": "✔", "FAIL": "✘", "SKIP": "○", "WARN": "⚠"}.get(
-                check["status"], " ")
-            tag  = {"PASS": "pass", "FAIL": "fail", "SKIP": "dim", "WARN": "warn"}.get(
-                check["status"], "step")
-            w(f"   Step {check['num']}  {check['label']}\n", "step")
-            detail = f"  —  {check['detail']}" if check.get("detail") else ""
-            w(f"           {icon}  {check['status']}{detail}\n\n", tag)
+        section("VALIDATION", "⓪")
+        for check in result["validation_steps"]:
+            log.check(check["num"], check["label"], check["status"], check.get("detail"))
 
         if not result["ok"]:
             w("   ✘  Computation aborted — correct errors and retry.\n", "fail")
-            w("\n" + HDIV + "\n", "dim")
+            log.close()
             result["log"] = log
             return result
 
@@ -294,10 +666,32 @@ class NumericalEngine:
         fx_lambda = None
         approx    = None
         try:
-            fx_lambda = self._make_lambda(raw_fx, result["var"])
-            approx, fd_steps = self._finite_difference(
-                fx_lambda, point_val, result["order"], scheme, h
-            )
+            with clock.measure("compile"):
+                fx_lambda = self._make_lambda(raw_fx, result["var"])
+            with clock.measure("finite_difference"):
+                if h is None:
+                    h = result["h"] = _richardson_fit(
+                        fx_lambda, point_val, result["order"],
+                        _richardson_step(result["order"], point_val))
+                if scheme == "complex-step":
+                    approx, fd_steps, fallback = self._complex_difference(
+                        fx_lambda, point_val, result["order"], h,
+                        get_context(raw_fx, result["var"]).expr
+                    )
+                    if fallback:
+                        scheme, h = "central", H_DEFAULT
+                        result.update(scheme=scheme, h=h, fallback=fallback)
+                elif h == H_AUTO:
+                    approx, fd_steps, h, error, poor = self._adaptive_difference(
+                        fx_lambda, point_val, result["order"], scheme, accuracy
+                    )
+                    result["h"]              = h
+                    result["error_estimate"] = error
+                    result["unreliable"]     = poor
+                else:
+                    approx, fd_steps = self._finite_difference(
+                        fx_lambda, point_val, result["order"], scheme, h, accuracy
+                    )
             result["answer"]      = f"{approx:.8g}"
             result["point_value"] = result["answer"]
             result["fd_steps"]    = fd_steps
@@ -308,38 +702,59 @@ class NumericalEngine:
             result["log"] = log
             return result
 
+        if scheme == "richardson" and not np.isfinite(approx):
+            result["ok"]          = False
+            result["answer"]      = "Computation error"
+            result["point_value"] = None
+            result["field_errors"]["point"] = (
+                f"f is not finite on the Richardson stencil around {result['var']} = {raw_point}.")
+            w(f"   ✘  Error: f is not finite on the stencil (h = {h:.3g}, "
+              f"even after shrinking)\n", "fail")
+            result["log"] = log
+            return result
+
         result["timestamp"] = datetime.now().strftime("%Y-%m-%d  %H:%M:%S")
+        if mode == "answer":
+            result["log"] = log
+            return result
 
         # ── METHOD section ────────────────────────────────────────────────────
         section("METHOD")
         kv("Name",         "Numerical Differentiation (Finite Difference)")
-        kv("Scheme",       scheme.capitalize() + " Difference")
-        kv("Step size h",  str(h))
-        if scheme == "central":
+        kv("Scheme",       _scheme_name(scheme))
+        if result["error_estimate"] is None:
+            kv("Step size h",  h)
+        else:
+            kv("Step size h",  f"{h:.6g}  (auto — Ridders' extrapolation)")
+            kv("Error estimate", f"{result['error_estimate']:.3e}"
+                                 + ("  ⚠ unreliable" if result["unreliable"] else ""))
+        if result["fallback"]:
+            kv("Fallback",     f"complex step not usable — {result['fallback']}")
+        if scheme == "complex-step":
+            kv("Formula (n=1)", "Im f(x + ih) / h   → O(h²), no cancellation")
+        elif scheme == "richardson":
+            kv("Formula", "[ 64·D(h/4) − 20·D(h/2) + D(h) ] / 45   → O(h⁶)")
+            kv("D(h)", "Central stencil on x + k·h, k integer")
+        elif accuracy is not None:
+            offsets, _ = _stencil(result["order"], scheme, accuracy)
+            kv("Formula", f"Σ cₖ·f(x + oₖ·h) / hⁿ  over {len(offsets)} nodes"
+                          f"   → O(h^{stencils.accuracy_of(accuracy, scheme)})")
+            kv("Coefficients", "Fornberg's algorithm (stencils.py)")
+        elif scheme == "central":
             kv("Formula (n=1)", "[ f(x+h) − f(x−h) ] / 2h   → O(h²)")
+            kv("Higher orders", "Generalised central-difference stencil")
         elif scheme == "forward":
             kv("Formula (n=1)", "[ f(x+h) − f(x)   ] / h    → O(h)")
+            kv("Higher orders", "One-sided stencil on x, x+h, …, x+n·h   → O(h)")
         else:
             kv("Formula (n=1)", "[ f(x)   − f(x−h) ] / h    → O(h)")
-        kv("Higher orders", "Generalised central-difference stencil")
+            kv("Higher orders", "One-sided stencil on x−n·h, …, x−h, x   → O(h)")
         blank()
 
         # ── STEPS section ─────────────────────────────────────────────────────
-        w(f"{SECTION_ICONS['STEPS']} STEPS\n", "section")
-        w(DIV + "\n", "dim")
-
-        step_counter = [0]
+        section("STEPS")
         for fd_step in fd_steps:
-            if fd_step["tag"] == "detail":
-                w("            → " + fd_step["text"] + "\n", "rule")
-            elif fd_step["tag"] == "answer":
-                step_counter[0] += 1
-                w(f"   Step {step_counter[0]:<2} ", "dim")
-                w(fd_step["text"] + "\n", "answer")
-            else:
-                step_counter[0] += 1
-                w(f"   Step {step_counter[0]:<2} ", "dim")
-                w(fd_step["text"] + "\n", "step")
+            log.add(fd_step)
 
         blank()
 
@@ -353,17 +768,19 @@ class NumericalEngine:
         # ── VERIFICATION (ENHANCED) ───────────────────────────────────────────
         section("VERIFICATION")
         kv("Strategy A", "h-refinement  (h → h/2 → h/4 → h/10)")
-        kv("Strategy B", "Scheme cross-check  (fwd vs bwd vs central)")
+        if scheme == "complex-step":
+            kv("Strategy B", f"Complex step vs central difference  (h = {H_DEFAULT:g})")
+        else:
+            kv("Strategy B", "Scheme cross-check  (fwd vs bwd vs central)")
         kv("Strategy C", "5-point spot-check  (h vs h/10 residuals)")
         blank()
 
-        ver_checks = _numerical_verify(fx_lambda, point_val, result["order"], scheme, h, approx)
+        ver_checks = _numerical_verify(fx_lambda, point_val, result["order"], scheme, h, approx,
+                                       clock)
         result["verification"] = ver_checks
 
         for label, value, status in ver_checks:
-            tag  = {"pass": "pass", "warn": "warn", "info": "verify"}.get(status, "step")
-            icon = {"pass": "✔", "warn": "⚠", "info": "→"}.get(status, " ")
-            w(f"   {icon}  {label:<34}  {value}\n", tag)
+            log.outcome(label, value, status)
 
         blank()
 
@@ -372,71 +789,242 @@ class NumericalEngine:
         kv("Timestamp",   result["timestamp"])
         kv("Python",      result["python_version"])
         kv("SymPy",       result["sympy_version"])
-        w("\n" + HDIV + "\n", "dim")
+        if show_timings:
+            log.add(Timings(result["timings"]))
+        log.close()
 
         result["log"] = log
         return result
 
+    def evaluate_batch(
+        self,
+        raw_fx:  str,
+        raw_var: str,
+        order:   int,
+        points,
+        scheme:  str = "central",
+        h:       float = None,
+        accuracy: int = None,
+    ) -> np.ndarray:
+        """
+        Finite-difference derivative at every x in `points` (any array-like).
+
+        All stencils are built as one (n_points, n_nodes) array and f is
+        evaluated on it in a single vectorised call, in chunks of at most
+        BATCH_CHUNK nodes to bound memory. Returns a float64 array with the
+        shape of `points`; NaN where f is not real/finite. No trail is built.
+        h=None is the scheme's default step (see validate_and_compute);
+        h=H_AUTO runs Ridders' extrapolation for every point at once (NaN
+        where it stays unreliable);
+        accuracy as in validate_and_compute. Raises ValueError on invalid input.
+        """
+        import re as _re
+
+        raw_fx = raw_fx.replace("^", "**")
+        raw_fx = _re.sub(r'(\d)([a-zA-Z])', r'\1*\2', raw_fx)
+        raw_fx = _re.sub(r'\)\s*\(', r')*(', raw_fx)
+        var_str = raw_var if raw_var else "x"
+        if not raw_fx:
+            raise ValueError("f(x) cannot be empty.")
+        if not (len(var_str) == 1 and var_str.isalpha()):
+            raise ValueError(f"'{var_str}' is not a single letter.")
+        if not ORDER_MIN <= int(order) <= ORDER_MAX:
+            raise ValueError(f"Order must be between {ORDER_MIN} and {ORDER_MAX}.")
+        if scheme not in SCHEMES:
+            raise ValueError(f"scheme must be one of {SCHEMES}, got {scheme!r}")
+
+        order = int(order)
+        f     = self._make_lambda(raw_fx, var_str)
+        xs    = np.asarray(points, dtype=float)
+        if scheme == "complex-step":
+            return self._complex_batch(f, xs, order, raw_fx, var_str,
+                                       COMPLEX_STEP_H if h in (None, H_AUTO) else h)
+        if h == H_AUTO:
+            values, *_, poor = _ridders(f, xs, order, scheme, accuracy=accuracy)
+            return np.where(poor, np.nan, values)
+        if h is None and scheme == "richardson":
+            h = _richardson_fit(f, xs, order, _richardson_step(order, xs))
+        elif h is None:
+            h = H_DEFAULT
+        flat  = xs.ravel()
+        hs    = np.broadcast_to(np.asarray(h, dtype=float), xs.shape).ravel()
+        offsets, coeffs = _stencil(order, scheme, accuracy)
+        step  = max(1, BATCH_CHUNK // len(offsets))
+        out   = np.empty_like(flat)
+        for start in range(0, flat.size, step):
+            block  = flat[start:start + step]
+            hb     = hs[start:start + step]
+            nodes  = block[:, None] + offsets[None, :] * hb[:, None]
+            fvals  = _eval_vectorised(f, nodes)
+            out[start:start + step] = fvals @ coeffs / hb ** order
+        return out.reshape(xs.shape)
+
     # ── finite difference core ─────────────────────────────────────────────────
-    def _finite_difference(self, f, x, order, scheme, h):
+    def _finite_difference(self, f, x, order, scheme, h, accuracy=None):
+        """Return (approx, steps); steps are trail.Step records, formatted lazily."""
         steps = []
 
-        def s(text, tag="step"):   steps.append({"text": text, "tag": tag})
-        def d(text, tag="detail"): steps.append({"text": text, "tag": tag})
+        def s(fmt, *args, kind="step"): steps.append(Step(kind, fmt, *args))
+        def d(fmt, *args):              steps.append(Step("detail", fmt, *args))
 
         x0 = x
 
-        if order == 1:
+        if scheme == "richardson":
+            approx = self._richardson(f, x0, order, h, s, d)
+        elif order == 1 and accuracy is None:
             if scheme == "central":
                 fp = f(x0 + h); fm = f(x0 - h)
                 approx = (fp - fm) / (2 * h)
-                s(f"Central difference  n=1  at  x = {x0}")
-                d(f"f(x+h) = f({x0+h:.6g}) = {fp:.8g}")
-                d(f"f(x-h) = f({x0-h:.6g}) = {fm:.8g}")
-                d(f"[ f(x+h) - f(x-h) ] / 2h  =  [{fp:.6g} - {fm:.6g}] / {2*h:.2e}")
-                s(f"≈  {approx:.8g}", "answer")
+                s("Central difference  n=1  at  x = {}", x0)
+                d("f(x+h) = f({:.6g}) = {:.8g}", x0 + h, fp)
+                d("f(x-h) = f({:.6g}) = {:.8g}", x0 - h, fm)
+                d("[ f(x+h) - f(x-h) ] / 2h  =  [{:.6g} - {:.6g}] / {:.2e}", fp, fm, 2 * h)
+                s("≈  {:.8g}", approx, kind="answer")
             elif scheme == "forward":
                 fp = f(x0 + h); f0 = f(x0)
                 approx = (fp - f0) / h
-                s(f"Forward difference  n=1  at  x = {x0}")
-                d(f"f(x+h) = f({x0+h:.6g}) = {fp:.8g}")
-                d(f"f(x)   = f({x0:.6g})   = {f0:.8g}")
-                d(f"[ f(x+h) - f(x) ] / h  =  [{fp:.6g} - {f0:.6g}] / {h:.2e}")
-                s(f"≈  {approx:.8g}", "answer")
+                s("Forward difference  n=1  at  x = {}", x0)
+                d("f(x+h) = f({:.6g}) = {:.8g}", x0 + h, fp)
+                d("f(x)   = f({:.6g})   = {:.8g}", x0, f0)
+                d("[ f(x+h) - f(x) ] / h  =  [{:.6g} - {:.6g}] / {:.2e}", fp, f0, h)
+                s("≈  {:.8g}", approx, kind="answer")
             else:
                 f0 = f(x0); fm = f(x0 - h)
                 approx = (f0 - fm) / h
-                s(f"Backward difference  n=1  at  x = {x0}")
-                d(f"f(x)   = f({x0:.6g})   = {f0:.8g}")
-                d(f"f(x-h) = f({x0-h:.6g}) = {fm:.8g}")
-                d(f"[ f(x) - f(x-h) ] / h  =  [{f0:.6g} - {fm:.6g}] / {h:.2e}")
-                s(f"≈  {approx:.8g}", "answer")
+                s("Backward difference  n=1  at  x = {}", x0)
+                d("f(x)   = f({:.6g})   = {:.8g}", x0, f0)
+                d("f(x-h) = f({:.6g}) = {:.8g}", x0 - h, fm)
+                d("[ f(x) - f(x-h) ] / h  =  [{:.6g} - {:.6g}] / {:.2e}", f0, fm, h)
+                s("≈  {:.8g}", approx, kind="answer")
         else:
-            import math
-            s(f"Higher-order ({order}) central difference at x = {x0}")
-            d(f"Apply central difference {order} time(s) recursively")
-            coeffs = [(-1) ** (order - k) * math.comb(order, k) for k in range(order + 1)]
-            points = [x0 + (k - order / 2) * h for k in range(order + 1)]
+            offsets, coeffs = _stencil(order, scheme, accuracy)
+            if scheme == "central" and accuracy is None:
+                s("Higher-order ({}) central difference at x = {}", order, x0)
+                d("Apply central difference {} time(s) recursively", order)
+            else:
+                s("{} difference  n={}  O(h^{})  at  x = {}", scheme.capitalize(), order,
+                  stencils.accuracy_of(accuracy, scheme), x0)
+                d("{}-node stencil, coefficients from the stencil table", len(offsets))
+            points = [x0 + o * h for o in offsets]
             fvals  = [f(p) for p in points]
             approx = sum(c * fv for c, fv in zip(coeffs, fvals)) / (h ** order)
-            for i, (p, fv, c) in enumerate(zip(points, fvals, coeffs)):
-                d(f"f({p:.6g}) = {fv:.8g}   coeff = {c:+d}")
-            d(f"Σ coeff·f(x_i) / h^{order}  =  {approx:.8g}")
-            s(f"≈  {approx:.8g}", "answer")
+            for p, fv, c in zip(points, fvals, coeffs):
+                d("f({:.6g}) = {:.8g}   coeff = {:+.6g}", p, fv, c)
+            d("Σ coeff·f(x_i) / h^{}  =  {:.8g}", order, approx)
+            s("≈  {:.8g}", approx, kind="answer")
 
         return approx, steps
 
     @staticmethod
-    def _make_lambda(expr_str: str, var_str: str):
-        from sympy import symbols as _sym, sympify as _sy, lambdify
-        x    = _sym(var_str)
-        expr = _sy(expr_str)
-        fn   = lambdify(x, expr, modules=["numpy", "sympy"])
-        return fn
+    def _richardson(f, x0, order, h, s, d):
+        """
+        Central stencil at each step in RICHARDSON_LEVELS, extrapolated.
+        f is called once per distinct node: nodes are keyed by their offset
+        in units of the finest step, so shared ones (x itself for even n,
+        x ± h/2 at both h/2 and h/4, ...) are reused.
+        """
+        offsets, coeffs = stencils.stencil(order)
+        finest = RICHARDSON_LEVELS[-1]
+        fvals  = {}             # offset in units of h/finest → f value
+        levels = []
+        s("Richardson extrapolation  n={}  at  x = {}", order, x0)
+        d("Central stencil at h, h/2, h/4; shared nodes are evaluated once")
+        for div in RICHARDSON_LEVELS:
+            total = 0.0
+            for o, c in zip(offsets, coeffs):
+                node = int(o) * (finest // div)
+                if node not in fvals:
+                    fvals[node] = f(x0 + node * (h / finest))
+                total += c * fvals[node]
+            levels.append(total / (h / div) ** order)
+            d("D({:<5}) =  {:.12g}", "h" if div == 1 else f"h/{div}", levels[-1])
+        table = _richardson_table(levels)
+        for j, column in enumerate(table[1:], 1):
+            d("O(h^{})    {}", 2 * j + 2, "   ".join(f"{v:.12g}" for v in column))
+        used = len(offsets) * len(RICHARDSON_LEVELS)
+        d("{} f-evaluations for {} stencil nodes ({} reused)", len(fvals), used,
+          used - len(fvals))
+        approx = table[-1][0]
+        s("≈  {:.8g}", approx, kind="answer")
+        return approx
+
+    def _complex_difference(self, f, x, order, h, expr):
+        """Complex step, or central difference when it cannot be used; (approx, steps, reason)."""
+        reason = _complex_unsafe(expr, order)
+        if reason is None:
+            try:
+                approx = _complex_step(f, x, h)
+            except ValueError as exc:
+                reason = str(exc)
+        if reason is not None:
+            approx, steps = self._finite_difference(f, x, order, "central", H_DEFAULT)
+            steps.insert(0, Step("step", "Complex step not usable ({}) — central difference, "
+                                         "h = {:g}", reason, H_DEFAULT, tag="warn"))
+            return approx, steps, reason
+        steps = [
+            Step("step",   "Complex step  n=1  at  x = {}   h = {:g}", x, h),
+            Step("detail", "Im f(x + ih)  =  Im f({:g} + {:g}i)  =  {:.8e}", x, h, approx * h),
+            Step("detail", "Im f(x + ih) / h  =  {:.12g}   (one evaluation, no subtraction)",
+                 approx),
+            Step("answer", "≈  {:.8g}", approx),
+        ]
+        return approx, steps, None
+
+    def _complex_batch(self, f, xs, order, raw_fx, var_str, h):
+        """evaluate_batch for "complex-step"; central difference wherever it cannot be used."""
+        out = np.full(xs.shape, np.nan)
+        bad = np.ones(xs.shape, dtype=bool)
+        if _complex_unsafe(get_context(raw_fx, var_str).expr, order) is None:
+            with np.errstate(all="ignore"):
+                try:
+                    vals = np.asarray(f(xs + 1j * h), dtype=complex)
+                except Exception:
+                    vals = np.vectorize(lambda z: complex(f(z)), otypes=[complex])(xs + 1j * h)
+            vals = np.broadcast_to(vals, xs.shape)
+            f0   = _eval_vectorised(f, xs)
+            cen  = (_eval_vectorised(f, xs + H_DEFAULT)
+                    - _eval_vectorised(f, xs - H_DEFAULT)) / (2 * H_DEFAULT)
+            out  = vals.imag / h
+            with np.errstate(all="ignore"):     # same tests as _complex_step; NaN compares False
+                bad  = ~(np.isfinite(vals.real) & np.isfinite(vals.imag) & np.isfinite(f0))
+                bad |= (np.abs(vals.imag)
+                        > COMPLEX_STEP_SLOPE * h * np.maximum(1.0, np.abs(vals.real)))
+                bad |= (np.abs(vals.real - f0)
+                        > COMPLEX_STEP_ULPS * np.finfo(float).eps * np.maximum(1.0, np.abs(f0)))
+                bad |= (np.abs(out - cen) > COMPLEX_STEP_AGREE
+                        * np.maximum(1.0, np.maximum(np.abs(out), np.abs(cen))))
+            out  = np.where(bad, np.nan, out)
+        if bad.any():
+            offsets, coeffs = _stencil(order, "central")
+            nodes    = xs[bad][:, None] + offsets * H_DEFAULT
+            out[bad] = _eval_vectorised(f, nodes) @ coeffs / H_DEFAULT ** order
+        return out
+
+    def _adaptive_difference(self, f, x, order, scheme, accuracy=None):
+        """Ridders' adaptive step; returns (approx, steps, h, error_estimate, poor)."""
+        value, h, err, evals, columns, poor = _ridders(f, np.asarray(x, dtype=float), order,
+                                                       scheme, accuracy=accuracy)
+        approx, h, err, poor = float(value), float(h), float(err), bool(poor)
+        steps = [
+            Step("step", "Ridders' extrapolation  n={}  {} stencil  at  x = {}",
+                 order, scheme, x),
+            Step("detail", "D(h) at h, h/{}, h/{}², …  extrapolated towards h → 0",
+                 RIDDERS_CON, RIDDERS_CON),
+        ]
+        for hh, dh in columns:
+            steps.append(Step("detail", "h = {:.4e}   D(h) = {:.12g}", float(hh), float(dh)))
+        steps.append(Step("detail", "chosen h = {:.4e}   error estimate = {:.2e}   "
+                                    "{} f-evaluations", h, err, evals))
+        if poor:
+            steps.append(Step("step", "Extrapolations disagree by more than {:g}% even from "
+                                      "smaller first steps — estimate unreliable",
+                              100 * RIDDERS_DRIFT, tag="warn"))
+        steps.append(Step("answer", "≈  {:.8g}", approx))
+        return approx, steps, h, err, poor
 
     @staticmethod
-    def _step(num, label, status, detail=""):
-        return {"num": num, "label": label, "status": status, "detail": detail}
+    def _make_lambda(expr_str: str, var_str: str):
+        return get_lambda(expr_str, var_str)
 
     @staticmethod
     def _base_result(raw_fx, raw_var, raw_order, raw_point, scheme, h):
@@ -448,6 +1036,7 @@ class NumericalEngine:
             "raw_point":        raw_point,
             "var":              raw_var if raw_var else "x",
             "order":            1,
+            "mode":             "full",
             "answer":           "—",
             "point_value":      None,
             "fd_steps":         [],
@@ -455,8 +1044,13 @@ class NumericalEngine:
             "field_errors":     {},
             "log":              [],
             "verification":     [],
+            "timings":          {},
+            "profile":          None,
             "scheme":           scheme,
             "h":                h,
+            "error_estimate":   None,
+            "fallback":         None,
+            "unreliable":       False,
             "timestamp":        datetime.now().strftime("%Y-%m-%d  %H:%M:%S"),
             "python_version":   sys.version.split()[0],
             "sympy_version":    SYMPY_VERSION,
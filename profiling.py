@@ -0,0 +1,127 @@
+"""
+cProfile + tracemalloc capture for a single computation.
+
+    result = DerivativeEngine().validate_and_compute(fx, "x", "5", "1", profile="slow")
+    # → slow.prof        (pstats dump: python -m pstats slow.prof, snakeviz, ...)
+    #   slow.alloc.txt   (peak traced memory and the top-N allocating lines)
+
+Symbolic stages that run under a budget execute on helper threads; those
+threads are profiled too and merged into the same .prof (a stage abandoned
+on timeout is still running, so it is missing from the profile). The
+calling thread's wait for them appears as lock.acquire under
+stages._call_with_timeout, so cumulative times double-count those stages. Both
+tools slow the run down noticeably — read the profile for proportions, and
+result["timings"] from an unprofiled run for absolute times.
+"""
+import cProfile
+import os
+import pstats
+import threading
+import tracemalloc
+
+TOP_N = 25
+
+
+class Profile:
+    """Context manager; save() writes <stem>.prof and <stem>.alloc.txt."""
+
+    def __init__(self, stem: str, top: int = TOP_N):
+        stem = os.path.abspath(str(stem))
+        if stem.endswith(".prof"):
+            stem = stem[:-len(".prof")]
+        self.stem     = stem
+        self.top      = top
+        self.files    = {"prof": stem + ".prof", "alloc": stem + ".alloc.txt"}
+        self.peak     = 0
+        self._main    = cProfile.Profile()
+        self._threads = []
+        self._lock    = threading.Lock()
+        self._owns_tm = False
+        self._before  = None
+        self._after   = None
+
+    def __enter__(self):
+        self._owns_tm = not tracemalloc.is_tracing()
+        if self._owns_tm:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self._before = tracemalloc.take_snapshot()
+        self._main.enable()
+        return self
+
+    def __exit__(self, *exc):
+        self._main.disable()
+        self.peak   = tracemalloc.get_traced_memory()[1]
+        self._after = tracemalloc.take_snapshot()
+        if self._owns_tm:
+            tracemalloc.stop()
+        return False
+
+    def wrap(self, fn):
+        """fn, profiled on whichever thread ends up calling it (stages.Budget helpers)."""
+        def run(*args, **kwargs):
+            prof = cProfile.Profile()
+            try:
+                prof.enable()
+            except ValueError:      # 3.12+: the main profiler already sees every thread
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                prof.disable()
+                with self._lock:
+                    self._threads.append(prof)
+        return run
+
+    # ── reports ───────────────────────────────────────────────────────────────
+    def save(self, header: str = "") -> dict:
+        """Write both files (creating the directory) and return their paths."""
+        os.makedirs(os.path.dirname(self.stem) or ".", exist_ok=True)
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            for prof in self._threads:
+                stats.add(prof)
+        stats.dump_stats(self.files["prof"])
+        with open(self.files["alloc"], "w", encoding="utf-8") as fh:
+            fh.write(self.allocation_report(header))
+        return dict(self.files)
+
+    def allocation_report(self, header: str = "") -> str:
+        filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, cProfile.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        )
+        after  = self._after.filter_traces(filters)
+        before = self._before.filter_traces(filters)
+        diffs  = [d for d in after.compare_to(before, "lineno") if d.size_diff > 0]
+        lines  = [header.rstrip("\n")] if header else []
+        lines += [
+            f"{'Peak traced memory':<26}: {_kib(self.peak)}",
+            f"{'Retained after run':<26}: {_kib(sum(d.size_diff for d in diffs))}",
+            "",
+            f"Top {self.top} lines by memory still allocated at the end of the run:",
+            "",
+        ]
+        for rank, diff in enumerate(diffs[:self.top], 1):
+            frame = diff.traceback[0]
+            lines.append(f"{rank:>3}. {_kib(diff.size_diff):>12}  {diff.count_diff:>7} blocks  "
+                         f"{frame.filename}:{frame.lineno}")
+        return "\n".join(lines) + "\n"
+
+
+def _kib(size: int) -> str:
+    return f"{size / 1024:,.1f} KiB"
+
+
+def header(engine: str, result: dict) -> str:
+    """The lines that open an allocation report: what was run and its timings."""
+    lines = [
+        f"SD SOLVER — {engine} profile",
+        f"f({result['var']}) = {result['raw_fx']}   order {result['order']}   "
+        f"at {result['var']} = {result['raw_point']}   mode {result['mode']}",
+        f"{'Answer':<26}: {result['answer']}",
+    ]
+    lines += [f"{'Time · ' + stage:<26}: {ms:.2f} ms (profiled)"
+              for stage, ms in result["timings"].items()]
+    return "\n".join(lines) + "\n" + "=" * 64 + "\n"
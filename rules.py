@@ -5,6 +5,8 @@ from sympy import (
     Number, Integer, Symbol, sin, cos, tan, exp, log
 )
 
+from context import DerivativeContext
+
 _SUP = str.maketrans("0123456789+-", "⁰¹²³⁴⁵⁶⁷⁸⁹⁺⁻")
 
 
@@ -82,8 +84,34 @@ def extract_ce(term, var):
     return None
 
 
-def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
+def _clean_passes(t):
+    t = t.replace("**", "^")
+    t = re.sub(r'(\d)\*([a-zA-Z])', r'\1\2', t)
+    t = re.sub(r'([a-zA-Z0-9])\*([a-zA-Z])', r'\1·\2', t)
+    return t
+
+
+def _clean_rules(t):
+    t = t.replace("**", "^")
+    t = re.sub(r'(\d)\*([a-zA-Z(])',          r'\1\2',   t)
+    t = re.sub(r'\)\*([a-zA-Z])',              r')\1',    t)
+    t = re.sub(r'([a-zA-Z0-9])\*([a-zA-Z])',  r'\1·\2',  t)
+    t = re.sub(r'(\^[\d]+)([a-zA-Z])',         r'\1·\2',  t)
+    t = re.sub(r'([a-zA-Z])\*\(',              r'\1(',    t)
+    return t
+
+
+def answer_text(expr, order: int) -> str:
+    """Display form of a derivative, exactly as differentiate_with_trail renders its answer."""
+    return _clean_passes(str(expr)) if order > 1 else _clean_rules(str(expr))
+
+
+def differentiate_with_trail(expr_str: str, var_str: str, order: int,
+                             ctx: DerivativeContext = None) -> dict:
     """
+    Pass `ctx` to reuse an already parsed/differentiated expression; the
+    trail is then memoised on the context so repeated requests skip it.
+
     Returns:
         {
             "answer"  : str,
@@ -91,8 +119,20 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
             "method"  : "Symbolic Differentiation",
         }
     """
-    x    = symbols(var_str)
-    expr = sympify(expr_str)
+    if ctx is None:
+        ctx = DerivativeContext(expr_str, var_str)
+    key   = (order, expr_str)
+    trail = ctx.trails.get(key)
+    if trail is None:
+        trail = _build_trail(expr_str, var_str, order, ctx)
+        ctx.trails[key] = trail
+        ctx.nbytes += sum(len(step["text"]) for step in trail["steps"]) * 2
+    return trail
+
+
+def _build_trail(expr_str: str, var_str: str, order: int, ctx: DerivativeContext) -> dict:
+    x    = ctx.var
+    expr = ctx.expr
     steps = []
 
     def s(text, tag="step"):   steps.append({"text": text, "tag": tag})
@@ -100,6 +140,7 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
 
     if order > 1:
         s(f"Apply differentiation {order} time(s) — showing each pass")
+        passes  = ctx.tower.upto(order)
         current = expr
 
         for i in range(1, order + 1):
@@ -109,7 +150,7 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
             _inp = _re2.sub(r'([a-zA-Z0-9])\*([a-zA-Z])', r'\1·\2', _inp)
             d(f"Pass {i}:  d/d{var_str}[{_inp}]")
 
-            current = simplify(diff(current, x))
+            current = passes[i]
 
             import re as _re
             _cur = str(current).replace('**', '^')
@@ -117,20 +158,13 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
             _cur = _re.sub(r'([a-zA-Z0-9])\*([a-zA-Z])', r'\1·\2', _cur)
             d(f"       =  {_cur}")
 
-        final = current
+        final = ctx.derivative(order)
 
-        import re as _re3
-        def _clean(t):
-            t = t.replace("**", "^")
-            t = _re3.sub(r'(\d)\*([a-zA-Z])', r'\1\2', t)
-            t = _re3.sub(r'([a-zA-Z0-9])\*([a-zA-Z])', r'\1·\2', t)
-            return t
-
-        s(f"= {_clean(str(final))}", "answer")
+        s(f"= {_clean_passes(str(final))}", "answer")
         for step in steps:
-            step["text"] = _clean(step["text"])
+            step["text"] = _clean_passes(step["text"])
         return {
-            "answer": _clean(str(final)),
+            "answer": answer_text(final, order),
             "steps":  steps,
             "method": "Symbolic Differentiation",
         }
@@ -189,7 +223,7 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
         d("= " + "  +  ".join(raw_parts))
         d("= " + "  +  ".join(simp_parts))
 
-        final = simplify(diff(expr, x))
+        final = ctx.derivative(1)
         s(f"= {final}", "answer")
 
     elif not is_sum and isinstance(expr, Mul):
@@ -202,7 +236,7 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
         d(f"Let  u = {u},   v = {v}")
         d(f"     u' = {du},   v' = {dv}")
         d(f"= ({du})·({v})  +  ({u})·({dv})")
-        final = simplify(du * v + u * dv)
+        final = ctx.derivative(1)
         d(f"= {du * v + u * dv}")
         s(f"= {final}", "answer")
 
@@ -215,28 +249,19 @@ def differentiate_with_trail(expr_str: str, var_str: str, order: int) -> dict:
         d(f"f(u) = {expr.func.__name__}(u),   g(x) = {inner}")
         d(f"f'(u) = {outer_d},   g'(x) = {inner_d}")
         d(f"= {at_g}  ·  {inner_d}")
-        final = simplify(at_g * inner_d)
+        final = ctx.derivative(1)
         s(f"= {final}", "answer")
 
     else:
         s("Apply differentiation rules")
-        final = simplify(diff(expr, x, order))
+        final = ctx.derivative(order)
         d(f"= {final}")
         s(f"= {final}", "answer")
 
-    def clean(t):
-        t = t.replace("**", "^")
-        t = re.sub(r'(\d)\*([a-zA-Z(])',          r'\1\2',   t)
-        t = re.sub(r'\)\*([a-zA-Z])',              r')\1',    t)
-        t = re.sub(r'([a-zA-Z0-9])\*([a-zA-Z])',  r'\1·\2',  t)
-        t = re.sub(r'(\^[\d]+)([a-zA-Z])',         r'\1·\2',  t)
-        t = re.sub(r'([a-zA-Z])\*\(',              r'\1(',    t)
-        return t
-
     for step in steps:
-        step["text"] = clean(step["text"])
+        step["text"] = _clean_rules(step["text"])
 
-    answer_str = clean(str(simplify(diff(expr, x, order))))
+    answer_str = answer_text(ctx.derivative(order), order)
     return {
         "answer": answer_str,
         "steps":  steps,
@@ -0,0 +1,426 @@
+"""
+Headless command-line interface.
+
+    python -m sdsolver batch submissions.csv > results.jsonl
+    python -m sdsolver batch --method numerical - < rows.jsonl
+    python -m sdsolver profile "exp(tan(x)/2)" --order 3 --out slow
+
+Each input row names f(x), the variable, the derivative order and an
+optional evaluation point (CSV with a header row, or one JSON object per
+line). One JSON result per row is streamed to stdout as soon as it is ready.
+Nothing here imports tkinter.
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+
+from batch import BatchExecutor, route_key
+from trail import to_json
+from worker import run_engine
+
+METHODS = ("symbolic", "numerical", "automatic")
+SCHEMES = ("central", "forward", "backward", "richardson", "complex-step")
+
+# accepted column names for each engine argument
+FIELDS = {
+    "fx":    ("fx", "f", "expr", "expression"),
+    "var":   ("var", "variable"),
+    "order": ("order", "n"),
+    "point": ("point", "x0", "at"),
+}
+
+
+# ── input ─────────────────────────────────────────────────────────────────────
+def detect_format(path: str, first_line: str) -> str:
+    if path.endswith((".jsonl", ".ndjson", ".json")):
+        return "jsonl"
+    if path.endswith(".csv"):
+        return "csv"
+    return "jsonl" if first_line.lstrip().startswith("{") else "csv"
+
+
+def iter_rows(stream, fmt: str):
+    """Yield (line_no, row) pairs; row is a dict of raw strings, or an Exception."""
+    if fmt == "csv":
+        reader = csv.DictReader(line for line in stream if line.strip())
+        for line_no, row in enumerate(reader, start=1):
+            yield line_no, {k.strip().lower(): (v or "").strip()
+                            for k, v in row.items() if k is not None}
+        return
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+        except ValueError as exc:
+            yield line_no, exc
+            continue
+        yield line_no, {str(k).lower(): v for k, v in row.items()}
+
+
+def _field(row: dict, name: str, default=""):
+    for key in FIELDS.get(name, (name,)):
+        value = row.get(key)
+        if value is not None and value != "":
+            return str(value)
+    return default
+
+
+def job_for(row: dict, opts: dict):
+    """Map one input row to (method, kwargs) for worker.run_engine."""
+    method = _field(row, "method", opts["method"]).lower()
+    if method not in METHODS:
+        raise ValueError(f"unknown method {method!r} (expected one of {', '.join(METHODS)})")
+    kwargs = {
+        "raw_fx":    _field(row, "fx"),
+        "raw_var":   _field(row, "var"),
+        "raw_order": _field(row, "order", "1"),
+        "raw_point": _field(row, "point"),
+        "trail":     bool(opts.get("log") or opts.get("report")),
+        "mode":      _field(row, "mode", opts.get("mode", "full")),
+        "show_timings": bool(opts.get("timings")),
+    }
+    if kwargs["mode"] not in ("full", "answer"):
+        raise ValueError(f"unknown mode {kwargs['mode']!r} (expected full or answer)")
+    if method == "numerical":
+        kwargs["scheme"] = _field(row, "scheme", opts["scheme"]).lower()
+        if kwargs["scheme"] not in SCHEMES:
+            raise ValueError(f"unknown scheme {kwargs['scheme']!r} "
+                             f"(expected one of {', '.join(SCHEMES)})")
+        h = _field(row, "h", "" if opts["h"] is None else str(opts["h"]))
+        if h:
+            kwargs["h"] = "auto" if h.strip().lower() == "auto" else float(h)
+            if kwargs["h"] != "auto" and not (math.isfinite(kwargs["h"]) and kwargs["h"] > 0):
+                raise ValueError(f"h must be a positive number or auto, got {h!r}")
+        accuracy = _field(row, "accuracy", "" if opts.get("accuracy") is None
+                          else str(opts["accuracy"]))
+        if accuracy:
+            kwargs["accuracy"] = int(accuracy)
+            if kwargs["accuracy"] < 1:
+                raise ValueError(f"accuracy must be at least 1, got {accuracy}")
+    elif method == "symbolic" and opts.get("budgets"):
+        kwargs["budgets"] = opts["budgets"]
+    return method, kwargs
+
+
+# ── output ────────────────────────────────────────────────────────────────────
+def prepare_row(line_no: int, row, opts: dict):
+    """Return (record, job); job is None when the row already failed to map."""
+    record = {"line": line_no}
+    if isinstance(row, Exception):
+        record.update(ok=False, error=f"Invalid input row: {row}")
+        return record, None
+    if row.get("id") not in (None, ""):
+        record["id"] = row["id"]
+    try:
+        method, kwargs = job_for(row, opts)
+    except Exception as exc:
+        record.update(ok=False, error=f"{type(exc).__name__}: {exc}")
+        return record, None
+    record["method"] = method
+    return record, (method, kwargs)
+
+
+def finish_row(record: dict, ok: bool, payload, opts: dict) -> dict:
+    """Merge an engine result (or error message) into the row's record."""
+    if not ok:
+        record.update(ok=False, error=payload)
+        return record
+    log = payload.pop("log", [])
+    if opts.get("log"):
+        payload["log"] = "".join(text for text, _tag in log)
+    record.update(payload)
+    if opts.get("report"):
+        record["trail"] = log       # for the --report writer; removed before emit
+    return record
+
+
+def run_row(line_no: int, row, opts: dict) -> dict:
+    """Compute one row in this process and return its JSON-ready record; never raises."""
+    record, job = prepare_row(line_no, row, opts)
+    if job is None:
+        return record
+    try:
+        return finish_row(record, True, run_engine(*job), opts)
+    except Exception as exc:
+        return finish_row(record, False, f"{type(exc).__name__}: {exc}", opts)
+
+
+def emit(record: dict, out):
+    out.write(json.dumps(record, ensure_ascii=False, default=to_json) + "\n")
+    out.flush()
+
+
+# ── commands ──────────────────────────────────────────────────────────────────
+def cmd_batch(args) -> int:
+    opts = {
+        "method":  args.method,
+        "scheme":  args.scheme,
+        "h":       args.h,
+        "accuracy": args.accuracy,
+        "budgets": dict(args.budget or []),
+        "log":     args.log,
+        "mode":    args.mode,
+        "timings": args.timings,
+        "report":  bool(args.report),
+    }
+    report = None
+    stream = sys.stdin if args.input == "-" else open(args.input, "r", encoding="utf-8", newline="")
+    try:
+        lines = iter(stream)
+        first = next(lines, "")
+        fmt   = args.format or detect_format(args.input, first)
+        rows  = iter_rows(_chain(first, lines), fmt)
+        failed = 0
+        if args.workers == 1:
+            records = (run_row(line_no, row, opts) for line_no, row in rows)
+            started = time.perf_counter()
+        else:
+            executor = BatchExecutor(args.workers or None)
+            records  = _run_parallel(executor, rows, opts, ordered=not args.unordered)
+        if args.report:
+            from export import BatchReport
+            report = BatchReport(args.report)
+        count = 0
+        for record in records:
+            failed += not record.get("ok", False)
+            count  += 1
+            trail   = record.pop("trail", ())
+            if report:
+                report.add(record, trail)
+            emit(record, sys.stdout)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if report:
+            report.close()
+    if args.stats:
+        if args.workers == 1:
+            elapsed = time.perf_counter() - started
+            stats   = {"rows": count, "workers": 1, "seconds": round(elapsed, 3),
+                       "rows_per_sec": round(count / elapsed, 2) if elapsed > 0 else None}
+        else:
+            stats = executor.stats
+        stats["failed"] = failed
+        sys.stderr.write(json.dumps(stats) + "\n")
+    return 1 if failed and args.strict else 0
+
+
+def _run_parallel(executor, rows, opts, ordered):
+    """Feed mapped rows to the executor; rows that fail to map skip the pool."""
+    records = {}
+
+    def jobs():
+        for line_no, row in rows:
+            record, job = prepare_row(line_no, row, opts)
+            records[line_no] = record
+            if job is None:
+                yield line_no, None, None, 0
+            else:
+                yield line_no, job[0], job[1], route_key(job[1]["raw_fx"])
+
+    with executor:
+        for line_no, ok, payload in executor.map(jobs(), ordered=ordered):
+            record = records.pop(line_no)
+            if "error" in record:
+                yield record
+            else:
+                yield finish_row(record, ok, payload, opts)
+
+
+def cmd_bench(args) -> int:
+    import bench
+    families = args.families.split(",") if args.families else None
+    targets  = args.targets.split(",") if args.targets else bench.TARGETS
+    unknown  = [t for t in targets if t not in bench.TARGETS]
+    unknown += [f for f in families or () if f not in bench.CORPUS]
+    if unknown:
+        sys.stderr.write(f"unknown target/family: {', '.join(unknown)}\n")
+        return 2
+
+    def progress(cell):
+        if not args.quiet:
+            sys.stderr.write(f"{cell['target']:<17} {cell['expr']:<26} n={cell['order']:<2} "
+                             f"median {cell['median']} ms\n")
+
+    report = bench.run(families, bench.parse_orders(args.orders), targets,
+                       repeat=args.repeat, progress=progress)
+    if args.out:
+        bench.save(report, args.out)
+    else:
+        json.dump(report, sys.stdout, indent=1, ensure_ascii=False)
+        sys.stdout.write("\n")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as fh:
+            regressions = bench.compare(report, json.load(fh), args.threshold)
+        for reg in regressions:
+            sys.stderr.write(f"REGRESSION {reg['target']} {reg['expr']} n={reg['order']}: "
+                             f"{reg['baseline']} → {reg['current']} ms (×{reg['ratio']})\n")
+        return 1 if regressions else 0
+    return 0
+
+
+def cmd_serve(args) -> int:
+    import threading
+    from server import make_server
+    from worker import preload
+    # load SymPy while the socket comes up, so the first request does not pay for it
+    threading.Thread(target=preload, daemon=True, name="sdsolver-preload").start()
+    httpd = make_server(args.host, args.port, workers=args.workers, maxsize=args.queue,
+                        timeout=args.timeout, quiet=args.quiet)
+    host, port = httpd.server_address[:2]
+    sys.stderr.write(f"SD Solver listening on http://{host}:{port}  "
+                     f"(workers={args.workers}, queue={args.queue})\n")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+    return 0
+
+
+def cmd_profile(args) -> int:
+    import pstats
+    from datetime import datetime
+    stem   = args.out or f"sd_solver_profile_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+    row    = {"fx": args.fx, "var": args.var, "order": args.order, "point": args.point}
+    opts   = {"method": args.method, "scheme": args.scheme, "h": args.h,
+              "accuracy": args.accuracy, "budgets": dict(args.budget or []), "log": True, "mode": args.mode,
+              "timings": True}
+    method, kwargs = job_for(row, opts)
+    kwargs["profile"] = stem
+    result = run_engine(method, kwargs)
+
+    files = dict(result["profile"])
+    files["trail"] = files["prof"][:-len(".prof")] + ".txt"
+    with open(files["trail"], "w", encoding="utf-8") as fh:
+        fh.write("SD SOLVER — Solution Trail Export\n"
+                 f"Exported : {datetime.now().strftime('%Y-%m-%d  %H:%M:%S')}\n"
+                 + "=" * 64 + "\n\n" + result["log"].render_text().strip() + "\n")
+
+    stats = pstats.Stats(files["prof"], stream=sys.stdout)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(args.top)
+    sys.stderr.write(f"answer : {result['answer']}\n")
+    for kind in ("trail", "prof", "alloc"):
+        sys.stderr.write(f"{kind:<7}: {files[kind]}\n")
+    return 0 if result["ok"] else 1
+
+
+def _chain(first, rest):
+    if first:
+        yield first
+    yield from rest
+
+
+def _h_arg(text: str):
+    if text.strip().lower() == "auto":
+        return "auto"
+    try:
+        return float(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a number or auto, got {text!r}")
+
+
+def _budget_arg(text: str):
+    stage, _, seconds = text.partition("=")
+    try:
+        return stage.strip(), float(seconds)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected STAGE=SECONDS, got {text!r}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="sdsolver", description="SD Solver without the GUI.")
+    sub    = parser.add_subparsers(dest="command", required=True)
+
+    batch = sub.add_parser("batch", help="compute derivatives for a CSV/JSONL file of rows",
+                           description="Rows need fx (or expr), var, order and optional point; "
+                                       "method, scheme, h, accuracy and id columns override the defaults.")
+    batch.add_argument("input", nargs="?", default="-", help="input file, or - for stdin (default)")
+    batch.add_argument("--format", choices=("csv", "jsonl"),
+                       help="input format (default: from the extension / first line)")
+    batch.add_argument("--method", choices=METHODS, default="symbolic")
+    batch.add_argument("--scheme", choices=SCHEMES, default="central",
+                       help="finite-difference scheme (numerical)")
+    batch.add_argument("--h", type=_h_arg, help="step size, or auto (numerical; default: the engine's)")
+    batch.add_argument("--accuracy", type=int,
+                       help="stencil error order p, O(h^p) (numerical; default: fewest nodes)")
+    batch.add_argument("--budget", action="append", type=_budget_arg, metavar="STAGE=SECONDS",
+                       help="symbolic stage time limit, e.g. simplify=5 (repeatable)")
+    batch.add_argument("--mode", choices=("full", "answer"), default="full",
+                       help="answer = derivative and point value only, no verification")
+    batch.add_argument("--log", action="store_true",
+                       help="include the rendered solution trail (otherwise it is not built)")
+    batch.add_argument("--report", metavar="PATH",
+                       help="also write every row's trail into one .html (or .txt) report")
+    batch.add_argument("--timings", action="store_true",
+                       help="also list the per-stage timings in the trail's SUMMARY")
+    batch.add_argument("--workers", type=int, default=1,
+                       help="worker processes; 0 = one per CPU core (default: 1, in-process)")
+    batch.add_argument("--unordered", action="store_true",
+                       help="with --workers, emit results as they complete instead of in input order")
+    batch.add_argument("--stats", action="store_true",
+                       help="print row count, elapsed time and rows/s to stderr")
+    batch.add_argument("--strict", action="store_true", help="exit with status 1 if any row fails")
+    batch.set_defaults(func=cmd_batch)
+
+    bench = sub.add_parser("bench", help="time the engines over an expression corpus",
+                           description="Writes a JSON report with per-cell medians and percentiles.")
+    bench.add_argument("--out", help="write the JSON report here (default: stdout)")
+    bench.add_argument("--families", help="comma-separated subset of the corpus families")
+    bench.add_argument("--targets", help="comma-separated subset of targets (see bench.py)")
+    bench.add_argument("--orders", default="1-10", help="orders, e.g. 1-3,5 (default: 1-10)")
+    bench.add_argument("--repeat", type=int, default=3, help="samples per cell (default: 3)")
+    bench.add_argument("--compare", metavar="BASELINE",
+                       help="exit 1 if any cell's median regressed against this report")
+    bench.add_argument("--threshold", type=float, default=0.25,
+                       help="allowed median growth for --compare (default: 0.25)")
+    bench.add_argument("--quiet", action="store_true", help="no per-cell progress on stderr")
+    bench.set_defaults(func=cmd_bench)
+
+    prof = sub.add_parser("profile", help="profile one computation with cProfile and tracemalloc",
+                          description="Writes STEM.txt (the trail), STEM.prof and STEM.alloc.txt, "
+                                      "and prints the top functions by cumulative time.")
+    prof.add_argument("fx", help="f(x), e.g. 'exp(tan(x)/2)'")
+    prof.add_argument("--var", default="x")
+    prof.add_argument("--order", default="1")
+    prof.add_argument("--point", default="", help="evaluation point (optional)")
+    prof.add_argument("--method", choices=METHODS, default="symbolic")
+    prof.add_argument("--scheme", choices=SCHEMES, default="central",
+                      help="finite-difference scheme (numerical)")
+    prof.add_argument("--h", type=_h_arg, help="step size, or auto (numerical; default: the engine's)")
+    prof.add_argument("--accuracy", type=int,
+                      help="stencil error order p, O(h^p) (numerical; default: fewest nodes)")
+    prof.add_argument("--budget", action="append", type=_budget_arg, metavar="STAGE=SECONDS",
+                      help="symbolic stage time limit, e.g. simplify=5 (repeatable)")
+    prof.add_argument("--mode", choices=("full", "answer"), default="full")
+    prof.add_argument("--out", metavar="STEM",
+                      help="output path without extension (default: sd_solver_profile_<time>)")
+    prof.add_argument("--top", type=int, default=20, help="functions to print (default: 20)")
+    prof.set_defaults(func=cmd_profile)
+
+    serve = sub.add_parser("serve", help="serve the engines over HTTP/JSON",
+                           description="POST /symbolic, /numerical or /automatic with a JSON row; GET /health.")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--workers", type=int, default=4, help="compute threads (default: 4)")
+    serve.add_argument("--queue", type=int, default=64, help="max queued requests before 503")
+    serve.add_argument("--timeout", type=float, default=60.0, help="seconds before 504")
+    serve.add_argument("--quiet", action="store_true", help="do not log each request")
+    serve.set_defaults(func=cmd_serve)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
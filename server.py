@@ -0,0 +1,166 @@
+"""
+Local HTTP/JSON service for the engines.
+
+    POST /symbolic    {"fx": "x^3 + 2x", "var": "x", "order": 2, "point": 1}
+    POST /numerical   {... , "scheme": "central", "h": 1e-5}      ("h": "auto" → Ridders)
+                      {... , "scheme": "forward", "accuracy": 4}  (O(h⁴) stencil)
+    POST /automatic   {"fx": "exp(sin(x))", "order": 7, "point": 0.5}  (Taylor-mode AD)
+    GET  /health
+
+Send "trail": false to skip building the solution trail (log comes back empty),
+or "mode": "answer" to get only the answer and point value, unverified.
+Every result carries "timings" (stage → ms); "timings": true also lists
+them in the trail's SUMMARY.
+
+The response body is the engine's result dict (log, verification,
+field_errors, ...). Requests go through a bounded queue to a pool of worker
+threads that share this process's context / lambdify caches; when the queue
+is full the server answers 503 immediately instead of piling up work, and a
+request that waits longer than `timeout` seconds gets 504. HTTP threads
+never run SymPy themselves, so /health stays responsive under load.
+"""
+import json
+import math
+import queue
+import threading
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from sdsolver import METHODS, job_for
+from trail import to_json
+from worker import run_engine
+
+MAX_BODY = 64 * 1024
+
+
+def _is_seconds(value) -> bool:
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and math.isfinite(value) and value >= 0)
+
+
+class JobQueue:
+    """Bounded FIFO in front of `workers` daemon threads running run_engine."""
+
+    def __init__(self, workers: int = 4, maxsize: int = 64):
+        self._queue   = queue.Queue(maxsize=maxsize)
+        self.workers  = workers
+        self.maxsize  = maxsize
+        self.active   = 0
+        self._lock    = threading.Lock()
+        self._threads = [threading.Thread(target=self._loop, daemon=True,
+                                          name=f"sdsolver-http-{i}")
+                         for i in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, method: str, kwargs: dict) -> Future:
+        """Queue one job; raises queue.Full when the queue is at capacity."""
+        future = Future()
+        self._queue.put_nowait((future, method, kwargs))
+        return future
+
+    def _loop(self):
+        while True:
+            future, method, kwargs = self._queue.get()
+            if not future.set_running_or_notify_cancel():
+                continue
+            with self._lock:
+                self.active += 1
+            try:
+                future.set_result(run_engine(method, kwargs))
+            except Exception as exc:
+                future.set_exception(exc)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+
+class Handler(BaseHTTPRequestHandler):
+    server_version = "SDSolver/1.0"
+    jobs           = None      # JobQueue, set by make_server
+    timeout_s      = 60.0
+    quiet          = False
+
+    def do_GET(self):
+        if self.path.rstrip("/") != "/health":
+            return self._reply(404, {"error": f"no such endpoint: {self.path}"})
+        from context import context_cache_stats
+        from lambda_cache import lambda_cache_stats
+        self._reply(200, {
+            "status":  "ok",
+            "workers": self.jobs.workers,
+            "active":  self.jobs.active,
+            "queued":  self.jobs.depth,
+            "queue":   self.jobs.maxsize,
+            "caches":  {"context": context_cache_stats(), "lambda": lambda_cache_stats()},
+        })
+
+    def do_POST(self):
+        method = self.path.strip("/")
+        if method not in METHODS:
+            return self._reply(404, {"error": f"no such endpoint: {self.path}"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError(f"negative Content-Length: {length}")
+            if length > MAX_BODY:
+                return self._reply(413, {"error": f"body larger than {MAX_BODY} bytes"})
+            row = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(row, dict):
+                raise ValueError("expected a JSON object")
+            row = {str(k).lower(): v for k, v in row.items()}
+            budgets  = row.pop("budgets", None) or {}
+            want_log = row.pop("trail", True) is not False
+            timings  = row.pop("timings", False) is True
+            if not isinstance(budgets, dict) or not all(map(_is_seconds, budgets.values())):
+                raise ValueError("budgets must be an object of stage → seconds")
+            row["method"] = method
+            _, kwargs = job_for(row, {"method": method, "scheme": "central", "h": None,
+                                      "budgets": {k: float(v) for k, v in budgets.items()},
+                                      "log": want_log, "timings": timings})
+        except ValueError as exc:
+            return self._reply(400, {"error": f"bad request: {exc}"})
+
+        try:
+            future = self.jobs.submit(method, kwargs)
+        except queue.Full:
+            return self._reply(503, {"error": "server busy, try again"}, {"Retry-After": "1"})
+        try:
+            result = future.result(timeout=self.timeout_s)
+        except FutureTimeout:
+            future.cancel()
+            return self._reply(504, {"error": f"no result within {self.timeout_s:g}s"})
+        except Exception as exc:
+            return self._reply(500, {"error": f"{type(exc).__name__}: {exc}"})
+        self._reply(200, result)
+
+    def _reply(self, status: int, body: dict, headers: dict = None):
+        data = json.dumps(body, ensure_ascii=False, default=to_json).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if not self.quiet:
+            super().log_message(fmt, *args)
+
+
+def make_server(host: str = "127.0.0.1", port: int = 8765, workers: int = 4,
+                maxsize: int = 64, timeout: float = 60.0, quiet: bool = False):
+    """Build (but do not start) a ThreadingHTTPServer bound to host:port."""
+    handler = type("SDSolverHandler", (Handler,), {
+        "jobs":      JobQueue(workers, maxsize),
+        "timeout_s": timeout,
+        "quiet":     quiet,
+    })
+    httpd = ThreadingHTTPServer((host, port), handler)
+    httpd.daemon_threads = True
+    return httpd
@@ -0,0 +1,128 @@
+import contextlib
+import threading
+import time
+
+# seconds allowed per stage of a symbolic run; None = unbounded
+DEFAULT_BUDGETS = {
+    "parse":         5.0,
+    "differentiate": 20.0,
+    "simplify":      20.0,
+    "trail":         20.0,
+    "verify":        20.0,
+}
+
+
+# callables hook(engine_name, result) run after every validate_and_compute
+_timing_hooks = []
+
+
+class StageTimeout(Exception):
+    def __init__(self, stage: str, limit: float):
+        super().__init__(f"{stage} exceeded its {limit:g}s budget")
+        self.stage = stage
+        self.limit = limit
+
+
+class Budget:
+    """
+    Per-stage wall-clock budgets for one computation.
+
+    run(stage, fn, ...) calls fn on a helper thread and stops waiting once
+    the stage's remaining budget is spent, raising StageTimeout. Time is
+    accumulated per stage, so e.g. ten simplify passes share one simplify
+    budget. SymPy cannot be interrupted, so an abandoned call keeps running
+    in the background until it finishes; only pure computations should be
+    passed in, and the caller must not rely on their side effects. Use the
+    process worker (worker.ComputeWorker) when the CPU must be reclaimed.
+
+    `spent` doubles as the run's stage timings: measure() and add() record
+    stages that have no limit (validation, point evaluation, ...).
+
+    `wrap_thread`, when set, wraps every fn handed to a helper thread
+    (profiling.Profile.wrap uses it to profile those threads too).
+    """
+
+    def __init__(self, limits: dict = None):
+        self.limits      = dict(DEFAULT_BUDGETS)
+        self.limits.update(limits or {})
+        self.spent       = {}
+        self.timed_out   = []
+        self.wrap_thread = None
+
+    def remaining(self, stage: str):
+        limit = self.limits.get(stage)
+        if limit is None:
+            return None
+        return limit - self.spent.get(stage, 0.0)
+
+    def add(self, stage: str, seconds: float):
+        self.spent[stage] = self.spent.get(stage, 0.0) + seconds
+
+    @contextlib.contextmanager
+    def measure(self, stage: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+    def run(self, stage: str, fn, *args, **kwargs):
+        remaining = self.remaining(stage)
+        start     = time.perf_counter()
+        try:
+            if remaining is None:
+                return fn(*args, **kwargs)
+            if remaining <= 0:
+                raise StageTimeout(stage, self.limits[stage])
+            if self.wrap_thread:
+                fn = self.wrap_thread(fn)
+            return _call_with_timeout(fn, args, kwargs, remaining, stage,
+                                      self.limits[stage])
+        except StageTimeout:
+            if stage not in self.timed_out:
+                self.timed_out.append(stage)
+            raise
+        finally:
+            self.add(stage, time.perf_counter() - start)
+
+
+def add_timing_hook(hook):
+    """Call hook(engine_name, result) after each run, e.g. to ship result["timings"]."""
+    if hook not in _timing_hooks:
+        _timing_hooks.append(hook)
+
+
+def remove_timing_hook(hook):
+    if hook in _timing_hooks:
+        _timing_hooks.remove(hook)
+
+
+def finish_timings(engine: str, result: dict, budget: Budget, started: float):
+    """Fill result["timings"] (ms per stage, plus total) and run the hooks."""
+    timings = result["timings"]
+    timings.update({stage: round(secs * 1e3, 3) for stage, secs in budget.spent.items()})
+    timings["total"] = round((time.perf_counter() - started) * 1e3, 3)
+    for hook in list(_timing_hooks):
+        try:
+            hook(engine, result)
+        except Exception:
+            pass        # metrics must never break a computation
+
+
+def _call_with_timeout(fn, args, kwargs, timeout, stage, limit):
+    box = {}
+
+    def target():
+        try:
+            box["value"] = fn(*args, **kwargs)
+        except BaseException as exc:
+            box["error"] = exc
+
+    thread = threading.Thread(target=target, daemon=True, name=f"sdsolver-{stage}")
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise StageTimeout(stage, limit)
+    if "error" in box:
+        raise box["error"]
+    return box["value"]
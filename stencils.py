@@ -0,0 +1,97 @@
+"""
+Finite-difference stencils, generated with Fornberg's algorithm and cached.
+
+    offsets, coeffs = stencil(3, accuracy=4, layout="central")
+    # f‴(x) ≈ Σ coeffs[k] · f(x + offsets[k]·h) / h³   + O(h⁴)
+
+Layouts: "central" (whole steps either side of x), "forward" (x, x+h, ...)
+and "backward" (..., x−h, x). weights() gives the coefficients for any node
+set; compact() the (n+1)-node central stencil the engine has always used.
+Weights are computed with exact fractions and returned as read-only float
+arrays without zero-weight nodes, so each table entry is built once.
+"""
+from fractions import Fraction
+from functools import lru_cache
+
+import numpy as np
+
+LAYOUTS = ("central", "forward", "backward")
+
+
+def fornberg(order: int, offsets) -> list:
+    """Weights (Fractions) of the `order`-th derivative at 0 on the given node offsets."""
+    nodes = [Fraction(o) for o in offsets]
+    n     = len(nodes)
+    if n <= order:
+        raise ValueError(f"{n} nodes cannot approximate a derivative of order {order}")
+    # delta[k][j]: weight of node j for the k-th derivative, over the nodes seen so far
+    delta       = [[Fraction(0)] * n for _ in range(order + 1)]
+    delta[0][0] = Fraction(1)
+    c1          = Fraction(1)
+    c4          = nodes[0]
+    for i in range(1, n):
+        c2 = Fraction(1)
+        c5 = c4
+        c4 = nodes[i]
+        for j in range(i):
+            c3  = nodes[i] - nodes[j]
+            c2 *= c3
+            if j == i - 1:
+                for k in range(min(i, order), 0, -1):
+                    delta[k][i] = c1 * (k * delta[k - 1][i - 1] - c5 * delta[k][i - 1]) / c2
+                delta[0][i] = -c1 * c5 * delta[0][i - 1] / c2
+            for k in range(min(i, order), 0, -1):
+                delta[k][j] = (c4 * delta[k][j] - k * delta[k - 1][j]) / c3
+            delta[0][j] = c4 * delta[0][j] / c3
+        c1 = c2
+    return delta[order]
+
+
+@lru_cache(maxsize=None)
+def weights(order: int, offsets: tuple) -> tuple:
+    """(offsets, coeffs) as read-only float arrays, zero-weight nodes dropped."""
+    coeffs = fornberg(order, offsets)
+    keep   = [k for k, c in enumerate(coeffs) if c != 0]
+    out    = (np.array([float(offsets[k]) for k in keep]),
+              np.array([float(coeffs[k]) for k in keep]))
+    for array in out:
+        array.flags.writeable = False
+    return out
+
+
+def min_accuracy(layout: str) -> int:
+    return 2 if layout == "central" else 1
+
+
+def nodes(order: int, accuracy: int, layout: str) -> tuple:
+    """Node offsets (in steps) of the `layout` stencil with error O(h^accuracy)."""
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {LAYOUTS}, got {layout!r}")
+    if accuracy < 1:
+        raise ValueError(f"accuracy must be at least 1, got {accuracy}")
+    if layout == "central":
+        accuracy += accuracy % 2            # symmetry gives even orders only
+        half = (2 * ((order + 1) // 2) - 1 + accuracy) // 2
+        return tuple(range(-half, half + 1))
+    count = order + accuracy
+    return tuple(range(count)) if layout == "forward" else tuple(range(1 - count, 1))
+
+
+@lru_cache(maxsize=None)
+def stencil(order: int, accuracy: int = None, layout: str = "central") -> tuple:
+    """The cached table entry; accuracy=None is the layout's lowest (2 central, 1 one-sided)."""
+    if accuracy is None:
+        accuracy = min_accuracy(layout)
+    return weights(order, nodes(order, accuracy, layout))
+
+
+def compact(order: int) -> tuple:
+    """n+1 nodes centred on x (half steps for odd n): the binomial stencil, O(h²)."""
+    return weights(order, tuple(Fraction(2 * k - order, 2) for k in range(order + 1)))
+
+
+def accuracy_of(accuracy: int, layout: str) -> int:
+    """The error order actually delivered (central stencils round up to even)."""
+    if accuracy is None:
+        accuracy = min_accuracy(layout)
+    return accuracy + accuracy % 2 if layout == "central" else accuracy
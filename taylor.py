@@ -0,0 +1,299 @@
+"""
+Truncated Taylor-series arithmetic: forward-mode automatic differentiation.
+
+compile_taylor(expr, var) turns a SymPy expression into a straight-line
+program over its distinct subexpressions (shared subtrees are computed
+once, constant subtrees are folded to floats). program(x0, order) pushes
+the series x0 + t through it and returns the coefficients
+
+    c[k] = f⁽ᵏ⁾(x0) / k!,   k = 0 … order
+
+as an array of shape (order + 1, *x0.shape). Every instruction is an
+O(order²) recurrence on NumPy arrays, so a grid of points costs one pass
+and nothing is differentiated symbolically: the work grows with the size
+of f, not with the size of its derivatives.
+
+    prog   = compile_taylor(sympify("exp(sin(x))"), symbols("x"))
+    coeffs = prog(np.array([0.0, 1.0]), 3)
+    third  = 6 * coeffs[3]                    # f‴ at 0 and at 1
+"""
+import math
+from collections import Counter
+
+import numpy as np
+import sympy
+
+# integer exponents up to this size use repeated squaring (exact at a zero base)
+MAX_INT_POWER = 1 << 16
+
+
+class UnsupportedExpression(ValueError):
+    """f uses something the Taylor program cannot represent."""
+
+
+# ── series recurrences ────────────────────────────────────────────────────────
+# A series is an array s with s[k] the t^k coefficient; trailing axes are points.
+def _mul(a, b):
+    out = np.empty_like(a)
+    for k in range(len(a)):
+        out[k] = (a[:k + 1] * b[k::-1]).sum(axis=0)
+    return out
+
+
+def _recip(b):
+    out    = np.empty_like(b)
+    out[0] = 1.0 / b[0]
+    for k in range(1, len(b)):
+        out[k] = -(b[1:k + 1] * out[k - 1::-1]).sum(axis=0) * out[0]
+    return out
+
+
+def _powi(a, n):
+    if n < 0:
+        return _recip(_powi(a, -n))
+    result, square = None, a
+    while n:
+        if n & 1:
+            result = square if result is None else _mul(result, square)
+        n >>= 1
+        if n:
+            square = _mul(square, square)
+    if result is None:
+        result       = np.zeros_like(a)
+        result[0]    = 1.0
+    return result
+
+
+def _powr(a, r):
+    """a^r for a real exponent: p_k = Σ_j (r·j − (k − j))·a_j·p_{k−j} / (k·a_0)."""
+    out    = np.empty_like(a)
+    out[0] = a[0] ** r
+    j      = _ks(a)
+    for k in range(1, len(a)):
+        weights = (r + 1) * j[1:k + 1] - k
+        out[k]  = (weights * a[1:k + 1] * out[k - 1::-1]).sum(axis=0) / (k * a[0])
+    return out
+
+
+def _exp(a):
+    out    = np.empty_like(a)
+    out[0] = np.exp(a[0])
+    ja     = _ks(a) * a
+    for k in range(1, len(a)):
+        out[k] = (ja[1:k + 1] * out[k - 1::-1]).sum(axis=0) / k
+    return out
+
+
+def _sincos(a, hyperbolic=False):
+    s, c   = np.empty_like(a), np.empty_like(a)
+    s[0]   = np.sinh(a[0]) if hyperbolic else np.sin(a[0])
+    c[0]   = np.cosh(a[0]) if hyperbolic else np.cos(a[0])
+    sign   = 1.0 if hyperbolic else -1.0
+    ja     = _ks(a) * a
+    for k in range(1, len(a)):
+        s[k] = (ja[1:k + 1] * c[k - 1::-1]).sum(axis=0) / k
+        c[k] = sign * (ja[1:k + 1] * s[k - 1::-1]).sum(axis=0) / k
+    return s, c
+
+
+def _integrate(a, g, f0):
+    """F(a) from F(a_0) = f0 and g = F′(a): F_k = Σ_j j·a_j·g_{k−j} / k."""
+    out    = np.empty_like(a)
+    out[0] = f0
+    ja     = _ks(a) * a
+    for k in range(1, len(a)):
+        out[k] = (ja[1:k + 1] * g[k - 1::-1]).sum(axis=0) / k
+    return out
+
+
+def _ks(a):
+    """0, 1, …, n shaped to broadcast against a."""
+    return np.arange(len(a), dtype=float).reshape((-1,) + (1,) * (a.ndim - 1))
+
+
+def _shift(a, c0):
+    out     = a.copy()
+    out[0] += c0
+    return out
+
+
+def _square(a):
+    return _mul(a, a)
+
+
+# function name → series implementation of f(a)
+_FUNCTIONS = {
+    "exp":   _exp,
+    "log":   lambda a: _integrate(a, _recip(a), np.log(a[0])),
+    "sin":   lambda a: _sincos(a)[0],
+    "cos":   lambda a: _sincos(a)[1],
+    "tan":   lambda a: (lambda s, c: _mul(s, _recip(c)))(*_sincos(a)),
+    "cot":   lambda a: (lambda s, c: _mul(c, _recip(s)))(*_sincos(a)),
+    "sec":   lambda a: _recip(_sincos(a)[1]),
+    "csc":   lambda a: _recip(_sincos(a)[0]),
+    "sinh":  lambda a: _sincos(a, True)[0],
+    "cosh":  lambda a: _sincos(a, True)[1],
+    "tanh":  lambda a: (lambda s, c: _mul(s, _recip(c)))(*_sincos(a, True)),
+    "coth":  lambda a: (lambda s, c: _mul(c, _recip(s)))(*_sincos(a, True)),
+    "sech":  lambda a: _recip(_sincos(a, True)[1]),
+    "csch":  lambda a: _recip(_sincos(a, True)[0]),
+    "asin":  lambda a: _integrate(a, _powr(_shift(-_square(a), 1.0), -0.5), np.arcsin(a[0])),
+    "acos":  lambda a: _integrate(a, -_powr(_shift(-_square(a), 1.0), -0.5), np.arccos(a[0])),
+    "atan":  lambda a: _integrate(a, _recip(_shift(_square(a), 1.0)), np.arctan(a[0])),
+    "acot":  lambda a: _integrate(a, -_recip(_shift(_square(a), 1.0)), np.arctan(1.0 / a[0])),
+    "asinh": lambda a: _integrate(a, _powr(_shift(_square(a), 1.0), -0.5), np.arcsinh(a[0])),
+    "acosh": lambda a: _integrate(a, _powr(_shift(_square(a), -1.0), -0.5), np.arccosh(a[0])),
+    "atanh": lambda a: _integrate(a, _recip(_shift(-_square(a), 1.0)), np.arctanh(a[0])),
+    "Abs":   lambda a: a * np.sign(a[0]),
+}
+SUPPORTED = tuple(sorted(_FUNCTIONS))
+
+
+# ── compilation ───────────────────────────────────────────────────────────────
+class TaylorProgram:
+    """
+    Straight-line program: instructions (op, slot, operands, constant) in
+    evaluation order. Slots whose value is no longer needed are released as
+    the program runs, so memory follows the widest point of f, not its size.
+    """
+
+    def __init__(self, instructions, result, releases, constant=None):
+        self.instructions = instructions
+        self.result       = result
+        self.releases     = releases       # instruction index → slots last used there
+        self.constant     = constant       # f without the variable: its value
+
+    def __len__(self):
+        return len(self.instructions)
+
+    def op_counts(self) -> Counter:
+        return Counter(op for op, *_ in self.instructions)
+
+    def __call__(self, points, order: int) -> np.ndarray:
+        points = np.asarray(points, dtype=float)
+        if self.constant is not None:
+            out    = np.zeros((order + 1,) + points.shape)
+            out[0] = self.constant
+            return out
+        slots = {}
+        with np.errstate(all="ignore"):
+            for i, (op, slot, operands, const) in enumerate(self.instructions):
+                args = [slots[s] for s in operands]
+                if op == "var":
+                    value    = np.zeros((order + 1,) + points.shape)
+                    value[0] = points
+                    if order:
+                        value[1] = 1.0
+                elif op == "add":
+                    value = _shift(sum(args[1:], args[0]), const)
+                elif op == "mul":
+                    value = args[0]
+                    for arg in args[1:]:
+                        value = _mul(value, arg)
+                    value = value * const if const != 1.0 else value
+                elif op == "powi":
+                    value = _powi(args[0], const)
+                elif op == "powr":
+                    value = _powr(args[0], const)
+                elif op == "pow":
+                    value = _exp(_mul(args[1], _FUNCTIONS["log"](args[0])))
+                elif op == "expk":
+                    value = _exp(args[0] * const)
+                else:
+                    value = _FUNCTIONS[op](args[0])
+                slots[slot] = value
+                for done in self.releases.get(i, ()):
+                    del slots[done]
+        return slots[self.result]
+
+
+def compile_taylor(expr, var) -> TaylorProgram:
+    """
+    Compile `expr` (a SymPy expression in `var`) to a TaylorProgram.
+    Raises UnsupportedExpression for other free symbols, complex constants
+    or functions outside SUPPORTED.
+    """
+    others = expr.free_symbols - {var}
+    if others:
+        raise UnsupportedExpression(
+            f"f may only depend on {var}, found {', '.join(sorted(map(str, others)))}")
+    if var not in expr.free_symbols:
+        return TaylorProgram([], None, {}, constant=_constant(expr))
+
+    values       = {}       # node → ("c", float) or ("s", slot)
+    instructions = []
+    stack        = [(expr, False)]
+    while stack:            # iterative post-order: deep trees do not hit the recursion limit
+        node, ready = stack.pop()
+        if node in values:
+            continue
+        if not ready and node.args:
+            stack.append((node, True))
+            stack.extend((arg, False) for arg in node.args if arg not in values)
+            continue
+        values[node] = _emit(node, var, [values[a] for a in node.args], instructions)
+
+    kind, result = values[expr]
+    return TaylorProgram(instructions, result, _releases(instructions, result))
+
+
+def _emit(node, var, args, instructions):
+    if all(kind == "c" for kind, _ in args) and node != var:
+        return "c", _constant(node)
+
+    def push(op, operands, const=None):
+        slot = len(instructions)
+        instructions.append((op, slot, tuple(operands), const))
+        return "s", slot
+
+    if node == var:
+        return push("var", ())
+    slots  = [value for kind, value in args if kind == "s"]
+    consts = [value for kind, value in args if kind == "c"]
+    if isinstance(node, sympy.Add):
+        return push("add", slots, math.fsum(consts))
+    if isinstance(node, sympy.Mul):
+        return push("mul", slots, math.prod(consts))
+    if isinstance(node, sympy.Pow):
+        (base_kind, base), (exp_kind, exponent) = args
+        if exp_kind == "c":
+            if exponent == int(exponent) and abs(exponent) <= MAX_INT_POWER:
+                return push("powi", [base], int(exponent))
+            return push("powr", [base], exponent)
+        if base_kind == "c":
+            if base <= 0:
+                raise UnsupportedExpression(f"{node}: non-positive base to a variable power")
+            return push("expk", [exponent], math.log(base))
+        return push("pow", [base, exponent])
+    name = type(node).__name__
+    if name in _FUNCTIONS and len(args) == 1:
+        return push(name, slots)
+    raise UnsupportedExpression(f"{name}() has no Taylor-series rule")
+
+
+def _constant(node) -> float:
+    try:
+        value = complex(node.evalf())
+    except (TypeError, ValueError):
+        raise UnsupportedExpression(f"{node} does not evaluate to a number")
+    if value.imag:
+        raise UnsupportedExpression(f"{node} is not real")
+    return value.real
+
+
+def _releases(instructions, result) -> dict:
+    last = {}
+    for i, (_op, _slot, operands, _const) in enumerate(instructions):
+        for s in operands:
+            last[s] = i
+    releases = {}
+    for s, i in last.items():
+        if s != result:
+            releases.setdefault(i, []).append(s)
+    return releases
+
+
+def derivatives(coeffs: np.ndarray) -> np.ndarray:
+    """Taylor coefficients → derivatives: f⁽ᵏ⁾ = k!·c[k]."""
+    factorials = np.array([math.factorial(k) for k in range(len(coeffs))], dtype=float)
+    return coeffs * factorials.reshape((-1,) + (1,) * (coeffs.ndim - 1))
@@ -0,0 +1,248 @@
+"""
+Structured solution trail.
+
+The engines record what happened as small typed records (a section, a
+key/value field, a numbered step with its numbers kept as numbers, a
+verification outcome, ...). Nothing is formatted until a consumer asks:
+iterating a Trail, indexing it or calling len() renders it once into the
+familiar (text, tag) chunks that TrailLogger and the exporters consume.
+NullTrail accepts the same calls and records nothing, for callers that
+never look at the trail.
+"""
+from trail_logger import DIV, HDIV, SECTION_ICONS
+
+_CHECK_ICONS = {"PASS": "✔", "FAIL": "✘", "SKIP": "○", "WARN": "⚠"}
+_CHECK_TAGS  = {"PASS": "pass", "FAIL": "fail", "SKIP": "dim", "WARN": "warn"}
+_RESULT_ICON = {"pass": "✔", "warn": "⚠", "info": "→"}
+_RESULT_TAGS = {"pass": "pass", "warn": "warn", "info": "verify"}
+
+
+# ── records ───────────────────────────────────────────────────────────────────
+class Text:
+    """A literal chunk (banners, one-off messages)."""
+    __slots__ = ("text", "tag")
+
+    def __init__(self, text: str, tag: str = "step"):
+        self.text = text
+        self.tag  = tag
+
+
+class Section:
+    __slots__ = ("name", "icon")
+
+    def __init__(self, name: str, icon: str = None):
+        self.name = name
+        self.icon = icon
+
+
+class Field:
+    """`key : value` line; value may be any object and is str()-ed on render."""
+    __slots__ = ("key", "value", "tag")
+
+    def __init__(self, key: str, value, tag: str = "step"):
+        self.key   = key
+        self.value = value
+        self.tag   = tag
+
+
+class Check:
+    """One validation check: num, label, PASS/FAIL/SKIP/WARN and a detail."""
+    __slots__ = ("num", "label", "status", "detail")
+
+    def __init__(self, num: int, label: str, status: str, detail: str = ""):
+        self.num    = num
+        self.label  = label
+        self.status = status
+        self.detail = detail
+
+
+class Step:
+    """
+    A step in STEPS. kind is "step", "answer" (both numbered) or "detail".
+    The text is `fmt.format(*args)`, so numeric values stay numbers until
+    the step is rendered.
+    """
+    __slots__ = ("kind", "fmt", "args", "tag")
+
+    def __init__(self, kind: str, fmt: str, *args, tag: str = None):
+        self.kind = kind
+        self.fmt  = fmt
+        self.args = args
+        self.tag  = tag
+
+    @property
+    def text(self) -> str:
+        return self.fmt.format(*self.args) if self.args else self.fmt
+
+    def as_dict(self) -> dict:
+        return {"text": self.text, "tag": self.kind}
+
+
+class Outcome:
+    """A verification row (label, value, pass/warn/info)."""
+    __slots__ = ("label", "value", "status")
+
+    def __init__(self, label: str, value: str, status: str):
+        self.label  = label
+        self.value  = value
+        self.status = status
+
+
+class Timings:
+    """Stage timings (ms), one field row each; the dict may be filled after it is added."""
+    __slots__ = ("timings",)
+
+    def __init__(self, timings: dict):
+        self.timings = timings
+
+
+class Blank:
+    __slots__ = ()
+
+
+class Close:
+    __slots__ = ()
+
+
+# ── containers ────────────────────────────────────────────────────────────────
+class Trail:
+    """
+    Ordered list of records plus the layout widths of one engine.
+    Behaves as a read-only sequence of (text, tag) chunks.
+    """
+    __slots__ = ("records", "kv_width", "outcome_width", "_chunks")
+    enabled   = True
+
+    def __init__(self, kv_width: int = 24, outcome_width: int = 30):
+        self.records       = []
+        self.kv_width      = kv_width
+        self.outcome_width = outcome_width
+        self._chunks       = None
+
+    # ── building ──────────────────────────────────────────────────────────────
+    def add(self, record):
+        self.records.append(record)
+        self._chunks = None
+
+    def text(self, text: str, tag: str = "step"):
+        self.add(Text(text, tag))
+
+    def section(self, name: str, icon: str = None):
+        self.add(Section(name, icon))
+
+    def kv(self, key: str, value, tag: str = "step"):
+        self.add(Field(key, value, tag))
+
+    def check(self, num: int, label: str, status: str, detail: str = ""):
+        self.add(Check(num, label, status, detail))
+
+    def step(self, kind: str, fmt: str, *args, tag: str = None):
+        self.add(Step(kind, fmt, *args, tag=tag))
+
+    def outcome(self, label: str, value: str, status: str):
+        self.add(Outcome(label, value, status))
+
+    def blank(self):
+        self.add(Blank())
+
+    def close(self):
+        self.add(Close())
+
+    # ── rendering ─────────────────────────────────────────────────────────────
+    def chunks(self) -> list:
+        """The trail as (text, tag) chunks; rendered on first use and kept."""
+        if self._chunks is None:
+            self._chunks = list(self._render())
+        return self._chunks
+
+    def render_text(self) -> str:
+        return "".join(text for text, _tag in self.chunks())
+
+    def as_dicts(self) -> list:
+        """Records as plain dicts ({"type": ..., fields}) for JSON consumers."""
+        out = []
+        for rec in self.records:
+            item = {"type": type(rec).__name__.lower()}
+            for name in rec.__slots__:
+                value = getattr(rec, name)
+                item[name] = list(value) if isinstance(value, tuple) else value
+            if isinstance(rec, Step):
+                item["text"] = rec.text
+            out.append(item)
+        return out
+
+    def __iter__(self):
+        return iter(self.chunks())
+
+    def __len__(self):
+        return len(self.chunks())
+
+    def __getitem__(self, index):
+        return self.chunks()[index]
+
+    def __bool__(self):
+        return bool(self.records)
+
+    def __getstate__(self):
+        return (self.records, self.kv_width, self.outcome_width)
+
+    def __setstate__(self, state):
+        self.records, self.kv_width, self.outcome_width = state
+        self._chunks = None
+
+    def _render(self):
+        counter = 0
+        for rec in self.records:
+            kind = type(rec)
+            if kind is Text:
+                yield rec.text, rec.tag
+            elif kind is Section:
+                icon = rec.icon or SECTION_ICONS.get(rec.name, "◆")
+                yield f"{icon} {rec.name}\n", "section"
+                yield DIV + "\n", "dim"
+                if rec.name == "STEPS":
+                    counter = 0
+            elif kind is Field:
+                yield f"   {rec.key:<{self.kv_width}}:  {rec.value}\n", rec.tag
+            elif kind is Check:
+                icon   = _CHECK_ICONS.get(rec.status, " ")
+                tag    = _CHECK_TAGS.get(rec.status, "step")
+                detail = f"  —  {rec.detail}" if rec.detail else ""
+                yield f"   Step {rec.num}  {rec.label}\n", "step"
+                yield f"           {icon}  {rec.status}{detail}\n\n", tag
+            elif kind is Step:
+                if rec.kind == "detail":
+                    yield "            → " + rec.text + "\n", rec.tag or "rule"
+                else:
+                    counter += 1
+                    yield f"   Step {counter:<2} ", "dim"
+                    yield rec.text + "\n", rec.tag or ("answer" if rec.kind == "answer" else "step")
+            elif kind is Outcome:
+                tag  = _RESULT_TAGS.get(rec.status, "step")
+                icon = _RESULT_ICON.get(rec.status, " ")
+                yield f"   {icon}  {rec.label:<{self.outcome_width}}  {rec.value}\n", tag
+            elif kind is Timings:
+                for stage, ms in rec.timings.items():
+                    yield f"   {'Time · ' + stage:<{self.kv_width}}:  {ms:.2f} ms\n", "summary"
+            elif kind is Blank:
+                yield "\n", "dim"
+            elif kind is Close:
+                yield "\n" + HDIV + "\n", "dim"
+
+
+class NullTrail(Trail):
+    """A Trail that drops everything — the engines' no-trail mode."""
+    __slots__ = ()
+    enabled   = False
+
+    def add(self, record):
+        pass
+
+
+def to_json(obj):
+    """json.dumps(default=...) hook: trails become (text, tag) chunks, steps dicts."""
+    if isinstance(obj, Trail):
+        return [list(chunk) for chunk in obj.chunks()]
+    if isinstance(obj, Step):
+        return obj.as_dict()
+    return str(obj)
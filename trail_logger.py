@@ -1,6 +1,15 @@
+import math
+import time
+
 DIV  = "─" * 62
 HDIV = "═" * 62
 
+# replay: typing rate, longest a replay may take, and Tk time allowed per frame
+CHARS_PER_SEC   = 2000
+MAX_ANIMATE_S   = 3.0
+FRAME_MS        = 16
+FRAME_BUDGET_MS = 8
+
 SECTION_ICONS = {
     "GIVEN":        "①",
     "METHOD":       "②",
@@ -12,8 +21,14 @@ SECTION_ICONS = {
 
 
 class TrailLogger:
+    """
+    Writes the trail into a Tk Text widget, directly or as a typed replay.
 
-    def __init__(self, widget):
+    `cps` is the replay rate in characters per second; instant=True (or
+    cps=0) shows the trail as fast as the per-frame budget allows.
+    """
+
+    def __init__(self, widget, cps: float = CHARS_PER_SEC, instant: bool = False):
         self._widget       = widget
         self._step_counter = 0
         self._in_steps     = False
@@ -21,18 +36,23 @@ class TrailLogger:
         self._stopped      = False
         self._after_ids    = []
         self._on_done      = None
+        self.cps           = cps
+        self.instant       = instant
+        self._chunks       = []
+        self._index        = 0
+        self._offset       = 0
+        self._rate         = 0.0
+        self._allowance    = 0.0
+        self._last_frame   = 0.0
+        self._frame_chars  = 2000
 
     def clear(self):
         self._step_counter = 0
         self._in_steps     = False
         self._stopped      = False
         self._log.clear()
-        for aid in self._after_ids:
-            try:
-                self._widget.after_cancel(aid)
-            except Exception:
-                pass
-        self._after_ids.clear()
+        self._chunks = []
+        self._cancel_frames()
         self._widget.configure(state="normal")
         self._widget.delete("1.0", "end")
         self._widget.configure(state="disabled")
@@ -80,35 +100,90 @@ class TrailLogger:
     def get_log(self) -> list:
         return list(self._log)
 
-    def animate(self, log: list, delay_ms: int = 18, on_done=None):
+    def animate(self, log: list, on_done=None, cps: float = None, instant: bool = None):
         """
-        Replay a pre-built log list with a typing delay between each chunk.
+        Replay a pre-built log (list of (text, tag) or a trail.Trail).
+
+        Every FRAME_MS the characters typed since the last frame are inserted
+        in one widget call, splitting a long chunk if needed; the rate is
+        raised so no replay takes longer than MAX_ANIMATE_S, and the amount
+        inserted per frame adapts so Tk spends about FRAME_BUDGET_MS on it.
         Calls on_done("done") when finished or on_done("stopped") if halted.
         """
+        cps     = self.cps if cps is None else cps
+        instant = self.instant if instant is None else instant
+        self._cancel_frames()
         self._on_done = on_done
         self._stopped = False
         self._widget.configure(state="normal")
         self._widget.delete("1.0", "end")
         self._widget.configure(state="disabled")
-        self._after_ids.clear()
-        self._schedule_chunks(log, 0, delay_ms)
 
-    def _schedule_chunks(self, log: list, index: int, delay_ms: int):
+        self._chunks     = list(log)
+        self._index      = 0
+        self._offset     = 0
+        total            = sum(len(text) for text, _tag in self._chunks)
+        self._rate       = math.inf if instant or not cps else max(cps, total / MAX_ANIMATE_S)
+        self._allowance  = 0.0
+        self._last_frame = time.perf_counter()
+        self._frame()
+
+    def _frame(self):
+        self._after_ids.clear()
         if self._stopped:
-            if self._on_done:
-                self._on_done("stopped")
-            return
-        if index >= len(log):
-            if self._on_done:
-                self._on_done("done")
-            return
-        text, tag = log[index]
-        self._write_direct(text, tag)
-        aid = self._widget.after(
-            delay_ms,
-            lambda: self._schedule_chunks(log, index + 1, delay_ms)
-        )
-        self._after_ids.append(aid)
+            return self._finish("stopped")
+        if self._index >= len(self._chunks):
+            return self._finish("done")
+
+        now = time.perf_counter()
+        if self._rate == math.inf:
+            self._allowance = self._frame_chars
+        else:
+            self._allowance = min(self._allowance + (now - self._last_frame) * self._rate,
+                                  self._frame_chars)
+        self._last_frame = now
+        budget           = max(1, int(self._allowance))
+        left             = budget
+        parts            = []
+        while left > 0 and self._index < len(self._chunks):
+            text, tag     = self._chunks[self._index]
+            piece         = text[self._offset:self._offset + left]
+            parts        += (piece, tag)
+            left         -= len(piece)
+            self._offset += len(piece)
+            if self._offset >= len(text):
+                self._index  += 1
+                self._offset  = 0
+        self._allowance = max(0.0, self._allowance - (budget - left))
+
+        start = time.perf_counter()
+        self._widget.configure(state="normal")
+        self._widget.insert("end", *parts)
+        self._widget.configure(state="disabled")
+        self._widget.see("end")
+        self._adapt((time.perf_counter() - start) * 1e3)
+
+        self._after_ids.append(self._widget.after(FRAME_MS, self._frame))
+
+    def _adapt(self, spent_ms: float):
+        """Grow or shrink the per-frame character cap to keep Tk near its budget."""
+        if spent_ms > FRAME_BUDGET_MS:
+            self._frame_chars = max(200, self._frame_chars // 2)
+        elif spent_ms < FRAME_BUDGET_MS / 2:
+            self._frame_chars = min(200_000, self._frame_chars * 2)
+
+    def _finish(self, outcome: str):
+        self._chunks = []
+        if self._on_done:
+            self._on_done(outcome)
+
+    def _cancel_frames(self):
+        for aid in self._after_ids:
+            try:
+                self._widget.after_cancel(aid)
+            except Exception:
+                pass
+        self._after_ids.clear()
 
     def _write(self, text: str, tag: str = "step"):
         self._log.append((text, tag))
@@ -0,0 +1,265 @@
+"""
+Virtualized solution-trail viewer.
+
+TrailView stands in for the ScrolledText that used to show the trail. It
+accepts the calls TrailLogger and DerivativeApp make on a Text widget —
+insert("end", text, tag, ...), delete("1.0", "end"), get("1.0", "end"),
+see("end"), tag_config(tag, foreground=, font=), configure(state=...) —
+but keeps the text as a list of lines and draws only the rows that are on
+screen onto a Canvas, so inserting and scrolling cost the same for a
+100k-character trail as for a short one.
+
+    click a section title (GIVEN, STEPS, ...)   collapse / expand the section
+    click a folded long line                    show it in full (click again to fold)
+    right-click a line                          copy it to the clipboard
+"""
+import bisect
+import tkinter as tk
+
+LONG_LINE = 240         # lines longer than this start out folded to one row
+FOLD_MARK = "  … [+{n} chars]"
+MIN_COLS  = 20
+
+
+class TrailView(tk.Frame):
+
+    def __init__(self, master, font, bg: str, fg: str, padx: int = 12, pady: int = 10, **kw):
+        super().__init__(master, bg=bg, **kw)
+        self._font      = font
+        self._fg        = fg
+        self._padx      = padx
+        self._pady      = pady
+        self._tags      = {}        # tag → {"foreground": ..., "font": ...}
+        self._canvas    = tk.Canvas(self, bg=bg, highlightthickness=0, bd=0)
+        self._scroll    = tk.Scrollbar(self, orient="vertical", command=self.yview)
+        self._scroll.pack(side="right", fill="y")
+        self._canvas.pack(side="left", fill="both", expand=True)
+        self._redraw_id = None
+        self._cols      = 80
+        self._visible   = 1
+        self._row_h     = 1
+        self._char_w    = max(1, font.measure("0"))
+        self._measure_rows()
+        self._reset()
+
+        self._canvas.bind("<Configure>", self._on_configure)
+        self._canvas.bind("<Button-1>",  self._on_click)
+        self._canvas.bind("<Button-3>",  self._on_copy)
+        self._canvas.bind("<MouseWheel>", self._on_wheel)
+        self._canvas.bind("<Button-4>",  lambda e: self.yview("scroll", -3, "units"))
+        self._canvas.bind("<Button-5>",  lambda e: self.yview("scroll", 3, "units"))
+
+    # ── Text-compatible API ───────────────────────────────────────────────────
+    def configure(self, cnf=None, **kw):
+        kw.pop("state", None)       # always read-only; accepted for Text compatibility
+        if cnf or kw:
+            return super().configure(cnf, **kw)
+
+    config = configure
+
+    def tag_config(self, tag: str, foreground: str = None, font=None, **_ignored):
+        opts = self._tags.setdefault(tag, {})
+        if foreground is not None:
+            opts["foreground"] = foreground
+        if font is not None:
+            opts["font"] = font
+            self._measure_rows()
+        self._invalidate(0)
+
+    tag_configure = tag_config
+
+    def insert(self, index: str, *args):
+        """insert("end", text, tag, text, tag, ...) — only appending is supported."""
+        if index != "end":
+            raise ValueError("TrailView only supports insert('end', ...)")
+        first = len(self._lines) - 1
+        for pos in range(0, len(args), 2):
+            text = args[pos]
+            tag  = args[pos + 1] if pos + 1 < len(args) else None
+            if isinstance(tag, (tuple, list)):
+                tag = tag[0] if tag else None
+            parts = text.split("\n")
+            for n, part in enumerate(parts):
+                if n:
+                    self._lines.append([])
+                    self._lengths.append(0)
+                if part:
+                    self._lines[-1].append((part, tag))
+                    self._lengths[-1] += len(part)
+        self._invalidate(first)
+
+    def delete(self, start="1.0", end="end"):
+        """Only clearing everything is supported."""
+        self._reset()
+        self._schedule()
+
+    def get(self, start="1.0", end="end") -> str:
+        """The whole text, newline-terminated like Text.get("1.0", "end")."""
+        return "\n".join(self._line_text(i) for i in range(len(self._lines))) + "\n"
+
+    def see(self, index: str = "end"):
+        if index == "end":
+            self._follow = True
+            self._schedule()
+
+    def yview(self, *args):
+        self._layout()
+        rows = len(self._rows)
+        if args and args[0] == "moveto":
+            self._top = float(args[1]) * rows
+        elif args and args[0] == "scroll":
+            step = int(args[1]) * (self._visible if args[2] == "pages" else 1)
+            self._top += step
+        self._follow = False
+        self._clamp()
+        self._schedule()
+
+    # ── model ─────────────────────────────────────────────────────────────────
+    def _reset(self):
+        self._lines      = [[]]     # each line: [(text, tag), ...] without "\n"
+        self._lengths    = [0]
+        self._collapsed  = set()    # section title lines
+        self._expanded   = set()    # long lines shown in full
+        self._section_of = []       # title line of the section each line is in
+        self._rows       = []       # (line, first column) per screen row
+        self._dirty_from = 0
+        self._top        = 0
+        self._follow     = False
+
+    def _line_text(self, i: int) -> str:
+        return "".join(text for text, _tag in self._lines[i])
+
+    def _is_title(self, i: int) -> bool:
+        line = self._lines[i]
+        return bool(line) and line[0][1] == "section"
+
+    def _ends_section(self, i: int) -> bool:
+        line = self._lines[i]
+        return bool(line) and line[0][0].startswith("═")
+
+    def _invalidate(self, line: int):
+        self._dirty_from = min(self._dirty_from, line)
+        self._schedule()
+
+    def _layout(self):
+        """Recompute screen rows from the first line that changed onwards."""
+        start = self._dirty_from
+        if start >= len(self._lines):
+            return
+        del self._section_of[start:]
+        del self._rows[bisect.bisect_left(self._rows, (start, -1)):]
+
+        section = self._section_of[-1] if self._section_of else None
+        for i in range(start, len(self._lines)):
+            if self._is_title(i):
+                section = i
+            elif self._ends_section(i):
+                section = None
+            self._section_of.append(section)
+            if section is not None and section != i and section in self._collapsed:
+                continue
+            self._rows.extend((i, col) for col in range(0, self._line_rows(i) * self._cols,
+                                                        self._cols))
+        self._dirty_from = len(self._lines)
+
+    def _line_rows(self, i: int) -> int:
+        n = self._lengths[i]
+        if n > LONG_LINE and i not in self._expanded:
+            return 1
+        return max(1, -(-n // self._cols))
+
+    def _measure_rows(self):
+        fonts       = [self._font] + [o["font"] for o in self._tags.values() if "font" in o]
+        self._row_h = max(f.metrics("linespace") for f in fonts)
+
+    # ── drawing ───────────────────────────────────────────────────────────────
+    def _schedule(self):
+        if self._redraw_id is None:
+            self._redraw_id = self.after_idle(self._redraw)
+
+    def _clamp(self):
+        self._top = max(0, min(int(self._top), len(self._rows) - self._visible))
+
+    def _redraw(self):
+        self._redraw_id = None
+        self._layout()
+        if self._follow:
+            self._top = len(self._rows)
+        self._clamp()
+
+        canvas = self._canvas
+        canvas.delete("all")
+        top    = self._top
+        for r in range(top, min(top + self._visible + 1, len(self._rows))):
+            line, col = self._rows[r]
+            y = self._pady + (r - top) * self._row_h
+            if col == 0 and self._is_title(line):
+                glyph = "▸" if line in self._collapsed else "▾"
+                canvas.create_text(2, y, text=glyph, anchor="nw", fill=self._fg,
+                                   font=self._font)
+            self._draw_row(line, col, y)
+
+        rows = max(1, len(self._rows))
+        self._scroll.set(top / rows, min(1.0, (top + self._visible) / rows))
+
+    def _draw_row(self, line: int, col: int, y: int):
+        width  = self._cols
+        folded = self._lengths[line] > LONG_LINE and line not in self._expanded
+        mark   = ""
+        if folded:
+            width = max(1, width - len(FOLD_MARK.format(n=self._lengths[line])))
+            mark  = FOLD_MARK.format(n=self._lengths[line] - width)
+        x_col = 0
+        pos   = 0
+        for text, tag in self._lines[line]:
+            end = pos + len(text)
+            if end > col and pos < col + width:
+                piece = text[max(0, col - pos):col + width - pos]
+                self._draw_text(x_col, y, piece, tag)
+                x_col += len(piece)
+            pos = end
+            if pos >= col + width:
+                break
+        if folded:
+            self._draw_text(x_col, y, mark, "dim")
+
+    def _draw_text(self, x_col: int, y: int, text: str, tag):
+        opts = self._tags.get(tag, {})
+        self._canvas.create_text(self._padx + x_col * self._char_w, y, text=text, anchor="nw",
+                                 fill=opts.get("foreground", self._fg),
+                                 font=opts.get("font", self._font))
+
+    # ── events ────────────────────────────────────────────────────────────────
+    def _on_configure(self, event):
+        cols          = max(MIN_COLS, (event.width - 2 * self._padx) // self._char_w)
+        self._visible = max(1, (event.height - self._pady) // self._row_h)
+        if cols != self._cols:
+            self._cols = cols
+            self._invalidate(0)
+        self._schedule()
+
+    def _line_at(self, y: int):
+        r = self._top + (y - self._pady) // self._row_h
+        return self._rows[r][0] if 0 <= r < len(self._rows) else None
+
+    def _on_click(self, event):
+        line = self._line_at(event.y)
+        if line is None:
+            return
+        if self._is_title(line):
+            self._collapsed ^= {line}
+        elif self._lengths[line] > LONG_LINE:
+            self._expanded ^= {line}
+        else:
+            return
+        self._follow = False
+        self._invalidate(line)
+
+    def _on_copy(self, event):
+        line = self._line_at(event.y)
+        if line is not None:
+            self.clipboard_clear()
+            self.clipboard_append(self._line_text(line))
+
+    def _on_wheel(self, event):
+        self.yview("scroll", -3 if event.delta > 0 else 3, "units")
@@ -0,0 +1,256 @@
+import multiprocessing
+import queue
+import subprocess
+import sys
+import threading
+import time
+
+THREAD  = "thread"
+PROCESS = "process"
+LOADED  = None          # job id of the "engines are loaded" message
+
+_engines      = {}
+_engines_lock = threading.Lock()
+
+
+def ensure_sympy(install: bool = True) -> bool:
+    """Import SymPy, pip-installing it first if it is missing and `install` is set."""
+    try:
+        import sympy  # noqa: F401
+        return True
+    except ImportError:
+        if not install:
+            return False
+    try:
+        subprocess.check_call(
+            [sys.executable, "-m", "pip", "install", "sympy"],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        import sympy  # noqa: F401
+        return True
+    except Exception:
+        return False
+
+
+def _engine(method: str):
+    """The process-wide engine for `method`; SymPy is imported on first use."""
+    engine = _engines.get(method)
+    if engine is None:
+        with _engines_lock:
+            engine = _engines.get(method)
+            if engine is None:
+                ensure_sympy()
+                if method == "numerical":
+                    from numerical_engine import NumericalEngine
+                    engine = NumericalEngine()
+                elif method == "automatic":
+                    from autodiff_engine import AutoDiffEngine
+                    engine = AutoDiffEngine()
+                else:
+                    from engine import DerivativeEngine
+                    engine = DerivativeEngine()
+                _engines[method] = engine
+    return engine
+
+
+def preload() -> float:
+    """Import SymPy and build every engine now; returns the seconds it took."""
+    start = time.perf_counter()
+    _engine("symbolic")
+    _engine("numerical")
+    _engine("automatic")
+    return time.perf_counter() - start
+
+
+def run_engine(method: str, kwargs: dict) -> dict:
+    """Run one validate_and_compute call; engines are created once per process."""
+    return _engine(method).validate_and_compute(**kwargs)
+
+
+def _serve(conn, announce: bool = False):
+    """
+    Child-process loop: receive (job_id, method, kwargs), send (job_id, ok, payload).
+    All engines are built before the first job; with `announce` the child
+    then sends (LOADED, True, seconds) once.
+    """
+    seconds = preload()
+    if announce:
+        conn.send((LOADED, True, seconds))
+    while True:
+        try:
+            msg = conn.recv()
+        except (EOFError, OSError):
+            return
+        if msg is None:
+            return
+        job_id, method, kwargs = msg
+        try:
+            conn.send((job_id, True, run_engine(method, kwargs)))
+        except Exception as exc:
+            conn.send((job_id, False, f"{type(exc).__name__}: {exc}"))
+
+
+class ComputeWorker:
+    """
+    Runs engine computations off the Tk main loop, one job at a time.
+
+    mode="thread"  — a daemon thread; cancel() abandons the job (the thread
+                     finishes in the background and its result is dropped).
+    mode="process" — a long-lived child process that keeps its caches warm;
+                     cancel() terminates it, so a hung simplify/integrate is
+                     actually stopped. A fresh child is started on demand.
+
+    `schedule(ms, fn)` is the event-loop timer (Tk's widget.after); results
+    are delivered to on_done(result) / on_error(message) from that loop.
+
+    start() loads SymPy and the engines in the background (the child
+    process, or a preload thread in thread mode) so the caller's window can
+    paint meanwhile; on_loaded(seconds) is then called once from the loop.
+    """
+
+    def __init__(self, schedule, mode: str = PROCESS, poll_ms: int = 25, on_loaded=None):
+        self._schedule  = schedule
+        self.mode       = mode
+        self._poll_ms   = poll_ms
+        self._job_id    = 0
+        self._active    = None       # (job_id, on_done, on_error)
+        self._results   = queue.Queue()
+        self._proc      = None
+        self._conn      = None
+        self._polling   = False
+        self.on_loaded  = on_loaded
+        self.loaded     = False
+        self.load_secs  = None
+
+    @property
+    def busy(self) -> bool:
+        return self._active is not None
+
+    def start(self):
+        """Start loading the engines in the background; returns immediately."""
+        if self.mode == PROCESS:
+            self._ensure_process()
+        else:
+            threading.Thread(target=self._preload_thread, daemon=True,
+                             name="sdsolver-preload").start()
+        self._start_polling()
+
+    def submit(self, method: str, kwargs: dict, on_done, on_error=None):
+        if self.busy:
+            raise RuntimeError("A computation is already running.")
+        self._job_id += 1
+        job_id        = self._job_id
+        self._active  = (job_id, on_done, on_error)
+        if self.mode == PROCESS:
+            self._ensure_process()
+            self._conn.send((job_id, method, kwargs))
+        else:
+            threading.Thread(target=self._run_thread, args=(job_id, method, kwargs),
+                             daemon=True).start()
+        self._start_polling()
+
+    def cancel(self):
+        """Drop the in-flight job; in process mode also kill the child."""
+        self._active = None
+        if self.mode == PROCESS:
+            self._stop_process(kill=True)
+
+    def shutdown(self):
+        self._active = None
+        self._stop_process(kill=False)
+
+    # ── internals ─────────────────────────────────────────────────────────────
+    def _run_thread(self, job_id, method, kwargs):
+        try:
+            self._results.put((job_id, True, run_engine(method, kwargs)))
+        except Exception as exc:
+            self._results.put((job_id, False, f"{type(exc).__name__}: {exc}"))
+
+    def _preload_thread(self):
+        try:
+            self._results.put((LOADED, True, preload()))
+        except Exception as exc:
+            self._results.put((LOADED, False, f"{type(exc).__name__}: {exc}"))
+
+    def _start_polling(self):
+        if not self._polling:
+            self._polling = True
+            self._schedule(self._poll_ms, self._poll)
+
+    def _poll(self):
+        # idle, or idle with no child left to announce LOADED (cancelled
+        # while loading): submit()/start() restart polling with a new child
+        if self._active is None and (self.loaded or (self.mode == PROCESS and self._conn is None)):
+            self._polling = False
+            return
+        job_id = self._active[0] if self._active else LOADED
+        msg    = None
+        if self.mode == PROCESS:
+            try:
+                if self._conn is None:
+                    pass
+                elif self._conn.poll():
+                    msg = self._conn.recv()
+                elif not self._proc.is_alive():
+                    msg = (job_id, False, "Worker process exited unexpectedly.")
+                    self._stop_process(kill=True)
+            except (EOFError, OSError) as exc:
+                msg = (job_id, False, f"Worker connection lost: {exc}")
+                self._stop_process(kill=True)
+        else:
+            try:
+                msg = self._results.get_nowait()
+            except queue.Empty:
+                pass
+
+        if msg is not None and msg[0] is LOADED:
+            if not self.loaded:
+                self.loaded    = True
+                self.load_secs = msg[2] if msg[1] else None
+                if self.on_loaded is not None:
+                    self.on_loaded(self.load_secs)
+            msg = None
+        if self._active is None or msg is None or msg[0] != self._active[0]:
+            self._schedule(self._poll_ms, self._poll)
+            return
+        _, on_done, on_error = self._active
+        self._active = None
+        self._schedule(self._poll_ms, self._poll)     # the guard above stops or keeps polling
+        _, ok, payload = msg
+        if ok:
+            on_done(payload)
+        elif on_error is not None:
+            on_error(payload)
+
+    def _ensure_process(self):
+        if self._proc is not None and self._proc.is_alive():
+            return
+        ctx           = multiprocessing.get_context("spawn")
+        parent, child = ctx.Pipe()
+        self._proc = ctx.Process(target=_serve, args=(child, True), daemon=True)
+        self._proc.start()
+        child.close()
+        self._conn = parent
+
+    def _stop_process(self, kill: bool):
+        proc, conn  = self._proc, self._conn
+        self._proc  = None
+        self._conn  = None
+        if proc is None:
+            return
+        try:
+            if kill:
+                proc.terminate()
+            else:
+                conn.send(None)
+            proc.join(timeout=1.0)
+            if proc.is_alive():
+                proc.kill()
+        except Exception:
+            pass
+        finally:
+            try:
+                conn.close()
+            except Exception:
+                pass